@@ -0,0 +1,66 @@
+"""
+Run time precision benchmark.
+
+Runs a task with a sub-second period and reports lateness of runs, the
+time between the scheduled time and the start of the job, with and
+without `precise=True`.
+
+Usage::
+
+    $ python benchmarks/precision.py --period 0.05 --seconds 10
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# C0413: wrong-import-position
+# pylint: disable=C0413
+from schedule_manager import Task
+
+
+def percentile(values, percent):
+    """Nearest-rank percentile of sorted values."""
+    index = max(0, int(round(percent / 100 * len(values))) - 1)
+    return values[index]
+
+
+def measure(period, seconds, precise):
+    """Returns sorted lateness of runs in milliseconds."""
+    runs = int(seconds / period) + 10
+    task = Task(job=lambda: None, precise=precise, keep_results=runs)
+    task.period(period)
+    task.start()
+    time.sleep(seconds)
+    task.stop()
+    task.join()
+
+    # The first run starts as soon as the task starts.
+    return sorted((result.started - result.scheduled).total_seconds() * 1000
+                  for result in task.results()[1:])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--period", type=float, default=0.05,
+                        help="Period of the task in seconds.")
+    parser.add_argument("--seconds", type=float, default=10,
+                        help="Duration of every measurement.")
+    args = parser.parse_args()
+
+    print("Period {} s, {} s per mode".format(args.period, args.seconds))
+    print("{:>8} {:>6} {:>9} {:>9} {:>9}".format(
+        "mode", "runs", "p50 ms", "p99 ms", "max ms"))
+
+    for precise in (False, True):
+        lateness = measure(args.period, args.seconds, precise)
+        print("{:>8} {:>6} {:>9.3f} {:>9.3f} {:>9.3f}".format(
+            "precise" if precise else "sleep", len(lateness),
+            percentile(lateness, 50), percentile(lateness, 99),
+            lateness[-1]))
+
+
+if __name__ == "__main__":
+    main()
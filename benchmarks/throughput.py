@@ -0,0 +1,83 @@
+"""
+Job throughput benchmark.
+
+Every task runs a CPU-bound job in its own thread. Jobs only run in
+parallel if the interpreter lets threads run truly in parallel, so job
+throughput scales with cores on a free-threaded build and stays flat on a
+build with the GIL.
+
+Usage::
+
+    $ python benchmarks/throughput.py
+    $ python3.13t -X gil=0 benchmarks/throughput.py
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# C0413: wrong-import-position
+# pylint: disable=C0413
+from schedule_manager import ScheduleManager
+
+
+def burn(counts, index, stop):
+    """Job doing CPU-bound work until `stop` is set."""
+    while not stop.is_set():
+        total = 0
+        for value in range(10000):
+            total += value * value
+        counts[index] += 1
+
+
+def measure(tasks, seconds):
+    """Returns chunks of work done per second by `tasks` tasks."""
+    manager = ScheduleManager()
+    counts = [0] * tasks
+    stop = threading.Event()
+
+    for index in range(tasks):
+        task = manager.register_task(job=burn, args=(counts, index, stop))
+        task.period(60).nonperiodic(1).start()
+
+    time.sleep(seconds)
+    stop.set()
+
+    while manager.count:
+        time.sleep(0.1)
+
+    return sum(counts) / seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--seconds", type=float, default=5,
+                        help="Duration of every measurement.")
+    parser.add_argument("--max-tasks", type=int,
+                        default=2 * (os.cpu_count() or 1),
+                        help="Maximum number of tasks.")
+    args = parser.parse_args()
+
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print("Python {} ({}), {} CPUs".format(
+        sys.version.split()[0], "GIL" if gil else "free-threaded",
+        os.cpu_count()))
+    print("{:>6} {:>14} {:>8}".format("tasks", "chunks/s", "speedup"))
+
+    tasks = 1
+    base = None
+    while tasks <= args.max_tasks:
+        throughput = measure(tasks, args.seconds)
+        if base is None:
+            base = throughput
+
+        print("{:>6} {:>14.1f} {:>7.2f}x".format(tasks, throughput,
+                                                 throughput / base))
+        tasks *= 2
+
+
+if __name__ == "__main__":
+    main()
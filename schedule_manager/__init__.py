@@ -9,3 +9,7 @@ __version__ = '.'.join(__version_info__)
 from .manager import ScheduleManager
 from .manager import TaskGroup
 from .manager import Task
+from .manager import CancellationToken
+from .manager import RetryPolicy
+from .manager import LoadSheddingPolicy
+from .manager import RunResult
@@ -0,0 +1,274 @@
+"""
+Admin module.
+
+An HTTP server exposing a schedule manager as JSON, built on the standard
+library only. Reads are served from the task snapshot of the manager, so
+they never wait for tasks being registered or dispatched.
+"""
+import hmac
+import json
+import logging
+import socketserver
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from .exceptions import OperationFailError
+from .exceptions import TaskNotFoundError
+
+_logger = logging.getLogger(__name__)
+
+_ACTIONS = ("pause", "resume", "stop", "run")
+
+
+class AdminServer:
+    """HTTP admin API of a schedule manager.
+
+    The following endpoints are available:
+
+    * `GET /tasks`: Summary of all tasks. Filter by `?tag=<tag>`.
+    * `GET /tasks/<name>`: Detail of a task, with its stats, last result
+      and upcoming run times.
+    * `GET /tags`: Names of tasks by tag.
+    * `GET /metrics`: Number of tasks, sum of task stats, dropped events
+      and load shedding state.
+    * `POST /tasks/<name>/pause`: Pause a task.
+    * `POST /tasks/<name>/resume`: Start a paused task.
+    * `POST /tasks/<name>/stop`: Stop a task.
+    * `POST /tasks/<name>/run`: Run the job once besides scheduled runs.
+
+    Errors are returned as `{"error": <message>}` with status 404 for an
+    unknown task or endpoint, and 409 for an operation which is not
+    allowed in the current state of the task.
+
+    Args:
+        manager (ScheduleManager): Schedule manager.
+        host (str): Host to listen on.
+            Defaults to "127.0.0.1".
+        port (int): Port to listen on. Set 0 to pick a free port.
+            Defaults to 8080.
+        token (str): Token required in `Authorization: Bearer <token>`
+            header of every request.
+            Defaults to None (no authorization).
+    """
+
+    def __init__(self, manager, host="127.0.0.1", port=8080, token=None):
+        self._manager = manager
+        self._token = token
+
+        self._server = _Server((host, port), _Handler)
+        self._server.admin = self
+        self._thread = None
+
+    def __repr__(self):
+        return "AdminServer<({}:{})>".format(*self.address)
+
+    @property
+    def address(self):
+        """tuple: Host and port the server listens on."""
+        return self._server.server_address[:2]
+
+    def start(self):
+        """Start serving requests in a daemon thread.
+
+        Returns:
+            AdminServer: Invoked server instance.
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._server.serve_forever,
+                                            name="AdminServer",
+                                            daemon=True)
+            self._thread.start()
+
+        return self
+
+    def close(self):
+        """Stop serving requests and close the socket."""
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+
+        self._server.server_close()
+
+    def handle(self, method, path, authorization=None):
+        """Handle a request.
+
+        Called by the request handler.
+
+        Args:
+            method (str): `GET` or `POST`.
+            path (str): Request path with query.
+            authorization (str): Value of `Authorization` header.
+
+        Returns:
+            tuple: HTTP status and JSON serializable body.
+        """
+        if self._token is not None and not hmac.compare_digest(
+                authorization or "", "Bearer {}".format(self._token)):
+            return 401, {"error": "Unauthorized."}
+
+        url = urlsplit(path)
+        parts = [unquote(part) for part in url.path.split("/") if part]
+
+        try:
+            if method == "GET":
+                if parts == ["tasks"]:
+                    return 200, self._tasks(parse_qs(url.query).get("tag"))
+                if len(parts) == 2 and parts[0] == "tasks":
+                    return 200, self._task(parts[1])
+                if parts == ["tags"]:
+                    return 200, self._tags()
+                if parts == ["metrics"]:
+                    return 200, self._metrics()
+            elif (method == "POST" and len(parts) == 3
+                  and parts[0] == "tasks" and parts[2] in _ACTIONS):
+                return 200, self._control(parts[1], parts[2])
+        except TaskNotFoundError:
+            return 404, {"error": "Task <{}> is not found.".format(parts[1])}
+        except (OperationFailError, RuntimeError) as error:
+            return 409, {"error": str(error)}
+
+        return 404, {"error": "Unknown endpoint <{} {}>.".format(method,
+                                                                  url.path)}
+
+    def _view(self):
+        return self._manager._view()    # pylint: disable=W0212
+
+    def _tasks(self, tags):
+        view = self._view()
+        tasks = view.tasks if not tags else view.tagged(tags[0])
+
+        return [_summary(task) for task in tasks]
+
+    def _task(self, name):
+        task = self._view().get(name)
+        if task is None:
+            raise TaskNotFoundError
+
+        detail = _summary(task)
+        detail.update({
+            "misfire_policy": task.misfire_policy,
+            "upstream": list(task.upstream),
+            "stats": task.stats,
+            "last_result": _result(task.last_result),
+            "upcoming": list(task.upcoming(5)) if task.is_running else [],
+        })
+        return detail
+
+    def _tags(self):
+        return {str(tag): [task.name for task in tasks]
+                for tag, tasks in self._view().tags().items()}
+
+    def _metrics(self):
+        # W0212: protected-access
+        # pylint: disable=W0212
+        tasks = self._view().tasks
+
+        stats = dict()
+        for task in tasks:
+            for key, value in task.stats.items():
+                stats[key] = stats.get(key, 0) + value
+
+        shedding = self._manager._shedding
+        if shedding is not None:
+            shedding = {"active": shedding.active, "lag": shedding.lag}
+
+        return {
+            "tasks": len(tasks),
+            "running": sum(1 for task in tasks if task.is_running),
+            "stats": stats,
+            "events_dropped": self._manager._events.dropped,
+            "shedding": shedding,
+        }
+
+    def _control(self, name, action):
+        task = self._manager.task(name)
+
+        if action == "run":
+            return {"name": name, "scheduled": task.run_now()}
+
+        if action == "pause":
+            task.pause()
+        elif action == "resume":
+            if not task._paused:    # pylint: disable=W0212
+                raise OperationFailError("Task is not paused.")
+            task.start()
+        else:
+            task.stop()
+
+        return {"name": name, "action": action}
+
+
+def _summary(task):
+    # W0212: protected-access
+    # pylint: disable=W0212
+    return {
+        "name": task.name,
+        "running": task.is_running,
+        "schedule": task._periodic_unit,
+        "next_run": task.next_run,
+        "tags": [str(tag) for tag in task.tag],
+        "priority": task.priority,
+    }
+
+
+def _result(result):
+    if result is None:
+        return None
+
+    return {
+        "scheduled": result.scheduled,
+        "attempt": result.attempt,
+        "started": result.started,
+        "finished": result.finished,
+        "succeeded": result.succeeded,
+        "timed_out": result.timed_out,
+        "exception": (None if result.exception is None
+                      else repr(result.exception)),
+    }
+
+
+def _default(value):
+    # Datetime and other values which are not JSON serializable.
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+class _Server(socketserver.ThreadingMixIn, HTTPServer):
+    """HTTP server handling requests in daemon threads.
+
+    Same as `http.server.ThreadingHTTPServer`, which is not available
+    before Python 3.7.
+    """
+
+    daemon_threads = True
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Request handler of :class:`AdminServer`."""
+
+    server_version = "ScheduleManagerAdmin"
+
+    def do_GET(self):    # pylint: disable=C0103
+        """Handle GET request."""
+        self._respond("GET")
+
+    def do_POST(self):    # pylint: disable=C0103
+        """Handle POST request."""
+        self._respond("POST")
+
+    def _respond(self, method):
+        status, data = self.server.admin.handle(
+            method, self.path, self.headers.get("Authorization"))
+        body = json.dumps(data, default=_default).encode("utf-8")
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):    # pylint: disable=W0622
+        _logger.debug(format, *args)
@@ -0,0 +1,168 @@
+"""
+Run claim module.
+
+A claim store records keys of runs which are already dispatched, so a run
+scheduled by multiple schedule managers is done at most once.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+
+class _ClaimStore:
+    """Base class of claim stores.
+
+    Args:
+        ttl (Union[int, float]): Time to keep a claim in seconds.
+            Expired claims are purged from time to time.
+    """
+
+    def __init__(self, ttl):
+        self._ttl = ttl
+        self._next_purge = time.time() + ttl
+
+    def claim(self, key):
+        """Claim a run atomically.
+
+        Args:
+            key (str): Run key.
+
+        Returns:
+            bool: True if the run is claimed by this call, False if it has
+            been claimed already.
+        """
+        now = time.time()
+        if now >= self._next_purge:
+            self._next_purge = now + self._ttl
+            self.purge(now - self._ttl)
+
+        return self._claim(key, now)
+
+    def _claim(self, key, now):
+        raise NotImplementedError
+
+    def purge(self, before):
+        """Remove claims made before a time.
+
+        Args:
+            before (float): Timestamp as returned by `time.time()`.
+        """
+        raise NotImplementedError
+
+
+class MemoryClaimStore(_ClaimStore):
+    """Keep claims in memory.
+
+    Shared by schedule managers in the same process.
+
+    Args:
+        ttl (Union[int, float]): Time to keep a claim in seconds.
+            Defaults to 86400.
+    """
+
+    def __init__(self, ttl=86400):
+        super().__init__(ttl)
+        self._claims = dict()
+
+    def __repr__(self):
+        return "MemoryClaimStore<(Claims: {})>".format(len(self._claims))
+
+    def _claim(self, key, now):
+        # dict.setdefault is atomic, so no lock is needed.
+        return self._claims.setdefault(key, now) is now
+
+    def purge(self, before):
+        for key, claimed in list(self._claims.items()):
+            if claimed < before:
+                self._claims.pop(key, None)
+
+
+class SQLiteClaimStore(_ClaimStore):
+    """Keep claims in a SQLite database.
+
+    Shared by schedule managers in different processes on the same host.
+    Every thread uses its own connection and relies on SQLite locking.
+
+    Args:
+        path (str): Path of database file.
+        ttl (Union[int, float]): Time to keep a claim in seconds.
+            Defaults to 86400.
+    """
+
+    def __init__(self, path, ttl=86400):
+        super().__init__(ttl)
+        self._path = path
+        self._local = threading.local()
+
+        db = self._db()
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("CREATE TABLE IF NOT EXISTS claims ("
+                   "key TEXT PRIMARY KEY, "
+                   "claimed REAL NOT NULL)")
+
+    def __repr__(self):
+        return "SQLiteClaimStore<({})>".format(self._path)
+
+    def _db(self):
+        # Connection of current thread.
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self._path, timeout=30,
+                                 isolation_level=None)
+            self._local.db = db
+
+        return db
+
+    def _claim(self, key, now):
+        cursor = self._db().execute("INSERT OR IGNORE INTO claims "
+                                    "VALUES (?, ?)", (key, now))
+        return cursor.rowcount == 1
+
+    def purge(self, before):
+        self._db().execute("DELETE FROM claims WHERE claimed < ?", (before,))
+
+
+class FileClaimStore(_ClaimStore):
+    """Keep claims as files in a local directory.
+
+    Shared by schedule managers in different processes on the same host.
+    A claim is made by creating a file exclusively.
+
+    Args:
+        directory (str): Directory of claim files.
+        ttl (Union[int, float]): Time to keep a claim in seconds.
+            Defaults to 86400.
+    """
+
+    def __init__(self, directory, ttl=86400):
+        super().__init__(ttl)
+        self._directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def __repr__(self):
+        return "FileClaimStore<({})>".format(self._directory)
+
+    def _claim(self, key, now):
+        name = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        path = os.path.join(self._directory, name)
+
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return False
+
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            file.write(key)
+
+        return True
+
+    def purge(self, before):
+        for entry in os.scandir(self._directory):
+            try:
+                if entry.stat().st_mtime < before:
+                    os.remove(entry.path)
+            except FileNotFoundError:
+                # Removed by another process.
+                pass
@@ -0,0 +1,196 @@
+"""
+Task event module.
+"""
+import collections
+import logging
+import threading
+from datetime import datetime
+
+from .exceptions import OperationFailError
+
+_logger = logging.getLogger(__name__)
+
+EVENTS = (
+    "start",    # Task is started.
+    "run_started",    # Job is started.
+    "run_succeeded",    # Job returns.
+    "run_failed",    # Job raises an exception or is timed out.
+    "skipped",    # Missed runs are skipped.
+    "shed",    # Run is skipped by load shedding.
+    "shedding_started",    # Load shedding is started by the lag of a run.
+    "shedding_stopped",    # Load shedding is stopped by the lag of a run.
+    "paused",    # Task is paused.
+    "stopped",    # Task is stopped.
+    "unregistered",    # Task is unregistered from the schedule manager.
+)
+
+
+class TaskEvent:
+    """Event of a task passed to listeners.
+
+    Attributes:
+        name (str): Event name.
+        task (Task): Task emitting the event.
+        time (datetime): Datetime when the event is emitted.
+        scheduled (datetime): Datetime when the run is scheduled.
+            Available for `run_*`, `shed` and `shedding_*` events.
+        attempt (int): Attempt number of the run.
+            Available for `run_*` events.
+        result (RunResult): Result of the run.
+            Available for `run_succeeded` and `run_failed` events.
+        count (int): Number of skipped runs.
+            Available for `skipped` event.
+    """
+
+    def __init__(self, name, task, scheduled=None, attempt=None,
+                 result=None, count=None):
+        self.name = name
+        self.task = task
+        self.time = datetime.now()
+        self.scheduled = scheduled
+        self.attempt = attempt
+        self.result = result
+        self.count = count
+
+    def __repr__(self):
+        return "TaskEvent<({}, {})>".format(self.name, self.task.name)
+
+
+class EventBus:
+    """Dispatch task events to listeners in a dedicated thread.
+
+    Emitting an event only puts it into a bounded queue, so listeners can
+    not slow down tasks. The oldest event is dropped if the queue is full.
+
+    Args:
+        maxsize (int): Maximum number of events waiting for dispatch.
+            Defaults to 1000.
+    """
+
+    def __init__(self, maxsize=1000):
+        # Event name -> tuple of listeners. Replaced instead of mutated, so
+        # emitting needs no lock.
+        self._listeners = dict()
+        self._listeners_lock = threading.Lock()
+
+        self._queue = collections.deque(maxlen=maxsize)
+        self._ready = threading.Condition(threading.Lock())
+        self._dispatching = False
+        self._closed = False
+        self._thread = None
+
+        self.dropped = 0    # Number of events dropped by a full queue.
+
+    def __repr__(self):
+        return "EventBus<(Pending: {}, Dropped: {})>".format(
+            len(self._queue), self.dropped)
+
+    def on(self, event, callback):
+        """Add a listener of an event.
+
+        Args:
+            event (str): Event name.
+            callback (callable): Called with a :class:`TaskEvent`.
+
+        Raises:
+            OperationFailError: Unknown event name.
+        """
+        if event not in EVENTS:
+            raise OperationFailError("Unknown event <{}>.".format(event))
+
+        with self._listeners_lock:
+            self._listeners[event] = (self._listeners.get(event, ())
+                                      + (callback,))
+
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._dispatch_loop,
+                                                name="EventBus-dispatcher",
+                                                daemon=True)
+                self._thread.start()
+
+    def off(self, event, callback):
+        """Remove a listener of an event.
+
+        Args:
+            event (str): Event name.
+            callback (callable): Listener added by :meth:`on`.
+        """
+        with self._listeners_lock:
+            listeners = list(self._listeners.get(event, ()))
+            if callback in listeners:
+                listeners.remove(callback)
+
+            if listeners:
+                self._listeners[event] = tuple(listeners)
+            else:
+                self._listeners.pop(event, None)
+
+    def listened(self, event):
+        """Check if an event has listeners.
+
+        Args:
+            event (str): Event name.
+
+        Returns:
+            bool: True if the event has listeners.
+        """
+        return event in self._listeners
+
+    def emit(self, event):
+        """Put an event into the queue.
+
+        Args:
+            event (TaskEvent): Event to be dispatched.
+        """
+        with self._ready:
+            if self._closed:
+                return
+
+            if len(self._queue) == self._queue.maxlen:
+                self.dropped += 1
+
+            self._queue.append(event)
+            self._ready.notify()
+
+    def join(self, timeout=None):
+        """Wait until all queued events are dispatched.
+
+        Args:
+            timeout (float): Time to wait in seconds.
+                Defaults to None (wait forever).
+
+        Returns:
+            bool: True if all events are dispatched.
+        """
+        with self._ready:
+            return self._ready.wait_for(
+                lambda: not self._queue and not self._dispatching, timeout)
+
+    def close(self):
+        """Stop dispatching events. Queued events are dropped."""
+        with self._ready:
+            self._closed = True
+            self._queue.clear()
+            self._ready.notify_all()
+
+    def _dispatch_loop(self):
+        while True:
+            with self._ready:
+                self._dispatching = False
+                self._ready.notify_all()
+
+                while not self._queue and not self._closed:
+                    self._ready.wait()
+
+                if self._closed:
+                    return
+
+                event = self._queue.popleft()
+                self._dispatching = True
+
+            for callback in self._listeners.get(event.name, ()):
+                try:
+                    callback(event)
+                except Exception:    # pylint: disable=W0703
+                    _logger.exception("Listener of event <%s> failed.",
+                                      event.name)
@@ -0,0 +1,186 @@
+"""
+Executor module.
+
+:class:`PriorityThreadPoolExecutor` starts runs of important tasks first
+when all of its workers are busy.
+"""
+import heapq
+import itertools
+import threading
+from concurrent.futures import Executor, Future
+from datetime import datetime
+
+from .exceptions import OperationFailError
+
+
+class PriorityThreadPoolExecutor(Executor):
+    """Thread pool running queued calls by priority.
+
+    Pass it as `executor` of tasks. Runs are ordered by the priority of
+    their task, then by their scheduled time. A smaller number is a higher
+    priority.
+
+    A queued run ages by one priority level every `aging` seconds, so runs
+    of low priority are not starved by a steady stream of important runs.
+
+    Args:
+        max_workers (int): Number of worker threads.
+            Defaults to 4.
+        aging (Union[int, float]): Seconds waited which are worth one
+            priority level.
+            Defaults to 60.
+
+    Raises:
+        OperationFailError: Invalid argument.
+    """
+
+    def __init__(self, max_workers=4, aging=60):
+        if max_workers < 1:
+            raise OperationFailError("Invalid max workers <{}>."
+                                     .format(max_workers))
+        if aging <= 0:
+            raise OperationFailError("Invalid aging <{}>.".format(aging))
+
+        self._max_workers = max_workers
+        self._aging = aging
+
+        # Heap of (sort key, sequence, priority, scheduled, future, call).
+        self._queue = list()
+        self._sequence = itertools.count()
+        self._ready = threading.Condition(threading.Lock())
+        self._shutdown = False
+        self._threads = list()
+
+        # Priority -> (runs, total lateness, max lateness) in seconds.
+        self._lateness = dict()
+
+    def __repr__(self):
+        return "PriorityThreadPoolExecutor<(Workers: {}, Queued: {})>".format(
+            self._max_workers, len(self._queue))
+
+    @property
+    def lateness(self):
+        """dict: Lateness of started runs by priority.
+
+        Lateness is the time between the scheduled time of a run and the
+        time a worker starts it. Every priority maps to a dict of:
+
+        * `runs`: Number of started runs.
+        * `mean`: Mean lateness in seconds.
+        * `max`: Maximum lateness in seconds.
+        """
+        with self._ready:
+            return {
+                priority: {"runs": runs, "mean": total / runs, "max": max_}
+                for priority, (runs, total, max_) in self._lateness.items()
+            }
+
+    def submit(self, fn, *args, **kwargs):
+        """Submit a call with priority 0 scheduled now.
+
+        Args:
+            fn (callable): Callable to be called.
+            *args: Arguments of the call.
+            **kwargs: Keyword arguments of the call.
+
+        Returns:
+            concurrent.futures.Future: Future of the call.
+
+        Raises:
+            RuntimeError: The executor is shut down.
+        """
+        return self.submit_run(0, datetime.now(), fn, *args, **kwargs)
+
+    def submit_run(self, priority, scheduled, fn, *args, **kwargs):
+        """Submit a call of a run.
+
+        Called by :class:`Task`.
+
+        Args:
+            priority (int): Priority of the run.
+            scheduled (datetime): Datetime when the run is scheduled.
+            fn (callable): Callable to be called.
+            *args: Arguments of the call.
+            **kwargs: Keyword arguments of the call.
+
+        Returns:
+            concurrent.futures.Future: Future of the call.
+
+        Raises:
+            RuntimeError: The executor is shut down.
+        """
+        future = Future()
+        key = priority * self._aging + scheduled.timestamp()
+
+        with self._ready:
+            if self._shutdown:
+                raise RuntimeError("Executor is shut down.")
+
+            heapq.heappush(self._queue, (key, next(self._sequence), priority,
+                                         scheduled, future,
+                                         (fn, args, kwargs)))
+            self._ready.notify()
+
+            if len(self._threads) < self._max_workers:
+                thread = threading.Thread(
+                    target=self._work,
+                    name="PriorityThreadPoolExecutor-{}".format(
+                        len(self._threads)),
+                    daemon=True)
+                self._threads.append(thread)
+                thread.start()
+
+        return future
+
+    def shutdown(self, wait=True, *, cancel_futures=False):
+        """Stop accepting calls.
+
+        Args:
+            wait (bool): Set True to wait for queued calls to be done.
+                Defaults to True.
+            cancel_futures (bool): Set True to cancel queued calls.
+                Defaults to False.
+        """
+        with self._ready:
+            self._shutdown = True
+
+            if cancel_futures:
+                for item in self._queue:
+                    item[4].cancel()
+                self._queue.clear()
+
+            self._ready.notify_all()
+            threads = list(self._threads)
+
+        if wait:
+            for thread in threads:
+                thread.join()
+
+    def _work(self):
+        while True:
+            with self._ready:
+                while not self._queue and not self._shutdown:
+                    self._ready.wait()
+
+                if not self._queue:
+                    return
+
+                _, _, priority, scheduled, future, call = heapq.heappop(
+                    self._queue)
+
+                if not future.set_running_or_notify_cancel():
+                    continue
+
+                lateness = max(
+                    (datetime.now() - scheduled).total_seconds(), 0)
+                runs, total, max_ = self._lateness.get(priority, (0, 0, 0))
+                self._lateness[priority] = (runs + 1, total + lateness,
+                                            max(max_, lateness))
+
+            fn, args, kwargs = call
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException as error:    # pylint: disable=W0703
+                future.set_exception(error)
+            else:
+                future.set_result(result)
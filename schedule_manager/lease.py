@@ -0,0 +1,126 @@
+"""
+Leader election module.
+"""
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:    # pragma: no cover
+    fcntl = None
+
+from .exceptions import OperationFailError
+
+
+class FileLease:
+    """Leadership lease held by an exclusive lock on a local file.
+
+    Schedule managers sharing the same lease file contend for the lock.
+    Only the manager holding the lock is the leader and runs jobs. The
+    others are standby: they keep calculating next run time of tasks
+    without running jobs, so a standby takes over without recalculating
+    anything.
+
+    The lock is released by the operating system when the leader process
+    dies, and a standby acquires it within one heartbeat.
+
+    Use it by :class:`ScheduleManager(lease=lease) <ScheduleManager>`.
+    Available on Unix only.
+
+    Args:
+        path (str): Path of lock file.
+        heartbeat (Union[int, float]): Time between two attempts of
+            acquiring the lock in seconds.
+            Defaults to 1.
+
+    Raises:
+        OperationFailError: File lock is not available on the platform.
+    """
+
+    def __init__(self, path, heartbeat=1):
+        if fcntl is None:
+            raise OperationFailError("File lock is not available.")
+
+        self._path = path
+        self._heartbeat = heartbeat
+
+        self._lock = threading.Lock()
+        self._file = None
+        self._is_leader = False
+        self._thread = None
+        self._closed = threading.Event()
+
+    def __repr__(self):
+        return "FileLease<({}, {})>".format(
+            self._path, "leader" if self._is_leader else "standby")
+
+    @property
+    def is_leader(self):
+        """bool: Return True if the lease is held."""
+        return self._is_leader
+
+    def acquire(self):
+        """Try to acquire the lease without blocking.
+
+        Returns:
+            bool: True if the lease is held.
+        """
+        with self._lock:
+            if self._is_leader or self._closed.is_set():
+                return self._is_leader
+
+            if self._file is None:
+                self._file = open(self._path, "a+", encoding="utf-8")
+
+            try:
+                fcntl.flock(self._file.fileno(),
+                            fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                return False
+
+            # Leave pid of the leader for debugging.
+            self._file.seek(0)
+            self._file.truncate()
+            self._file.write(str(os.getpid()))
+            self._file.flush()
+
+            self._is_leader = True
+
+            return True
+
+    def release(self):
+        """Release the lease."""
+        with self._lock:
+            if self._file is None:
+                return
+
+            if self._is_leader:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+                self._is_leader = False
+
+            self._file.close()
+            self._file = None
+
+    def start(self):
+        """Start contending for the lease.
+
+        Called by :class:`ScheduleManager` constructor.
+        """
+        if self._thread is not None:
+            return
+
+        self.acquire()
+
+        self._thread = threading.Thread(target=self._heartbeat_loop,
+                                        name="FileLease-heartbeat",
+                                        daemon=True)
+        self._thread.start()
+
+    def _heartbeat_loop(self):
+        while not self._closed.wait(self._heartbeat):
+            self.acquire()
+
+    def close(self):
+        """Stop contending and release the lease."""
+        self._closed.set()
+        self.release()
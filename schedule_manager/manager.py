@@ -1,37 +1,115 @@
 """
 Schedule management module.
 """
+import sys
 import threading
+import multiprocessing
+import collections
+import heapq
+import inspect
+import itertools
+import logging
+import random
 import uuid
 import re
 import time
 from datetime import datetime, timedelta
-import math
+from concurrent.futures import CancelledError, Future
 
 from .exceptions import TaskNameDuplicateError
 from .exceptions import TaskNotFoundError
 from .exceptions import TimeFormatError
 from .exceptions import OperationFailError
+from .events import EventBus, TaskEvent
+from .executors import PriorityThreadPoolExecutor
+from . import timezone
+
+_logger = logging.getLogger(__name__)
 
 
 class ScheduleManager:
-    """Task schedule manager."""
+    """Task schedule manager.
 
-    def __init__(self):
+    Args:
+        store (Union[FileStateStore, SQLiteJobStore]): Store used to
+            persist schedule state.
+            Tasks saved in the store are restored, and tasks which were
+            running are started again.
+            See :class:`schedule_manager.persistence.FileStateStore` and
+            :class:`schedule_manager.persistence.SQLiteJobStore`.
+            Defaults to None (no persistence).
+        lease (FileLease): Leadership lease shared with other schedule
+            managers. Only the manager holding the lease runs jobs.
+            See :class:`schedule_manager.lease.FileLease`.
+            Defaults to None (always run jobs).
+        claims (Union[MemoryClaimStore, SQLiteClaimStore, FileClaimStore]):
+            Store of run claims shared with other schedule managers.
+            A run is identified by task name and scheduled time, and it is
+            done only by the manager claiming it first.
+            See :mod:`schedule_manager.claims`.
+            Defaults to None (no claim).
+        event_queue_size (int): Maximum number of task events waiting for
+            listeners. The oldest event is dropped if the queue is full.
+            Defaults to 1000.
+        tracer (OpenTelemetryTracer): Tracer wrapping every run in a span.
+            See :class:`schedule_manager.tracing.OpenTelemetryTracer`.
+            Defaults to None (no tracing).
+        shedding (LoadSheddingPolicy): Policy shedding runs while tasks
+            fall behind their schedule.
+            Defaults to None (no shedding).
+    """
+
+    def __init__(self, store=None, lease=None, claims=None,
+                 event_queue_size=1000, tracer=None, shedding=None):
+        # R0913: too-many-arguments
+        # pylint: disable=R0913
         self._tasks = dict()
+        # Guards `_tasks`. Reentrant because stores may register tasks
+        # while restoring.
+        self._lock = threading.RLock()
+        # Read-only view of `_tasks`, rebuilt after a change.
+        self._snapshot = None
+        # (job, scheduled second) -> batch waiting for runs.
+        self._batches = dict()
+        self._batches_lock = threading.Lock()
+        # Tag -> token bucket. Replaced instead of mutated, so reading
+        # needs no lock.
+        self._rate_limits = dict()
+        self._claims = claims
+        self._tracer = tracer
+        self._shedding = shedding
+        self._events = EventBus(event_queue_size)
+
+        self._lease = lease
+        if lease is not None:
+            lease.start()
+
+        self._store = store
+        if store is not None:
+            store.restore(self)
 
     def __del__(self):
         """Destructor"""
+        # Stopping tasks is not a change of schedule state.
+        if self._store is not None:
+            self._store.close()
+
+        if self._lease is not None:
+            self._lease.close()
+
+        self._events.close()
+
         # Make sure all tasks are not running.
         self.running_tasks.stop()
 
     def __contains__(self, name):
         """Returns True if task name is registered."""
-        return name in self._tasks
+        with self._lock:
+            return name in self._tasks
 
     def __iter__(self):
         """Iterate over tasks name."""
-        return iter(self._tasks)
+        return iter(self._view().names)
 
     def __repr__(self):
         return ("ScheduleManager<("
@@ -43,21 +121,51 @@ class ScheduleManager:
     @property
     def count(self):
         """int: Number of tasks registered in the schedule manager."""
-        return len(self._tasks)
+        with self._lock:
+            return len(self._tasks)
+
+    @property
+    def is_leader(self):
+        """bool: Return True if the manager runs jobs.
+
+        Always True if the manager has no lease.
+        """
+        return self._lease is None or self._lease.is_leader
+
+    def _view(self):
+        # Snapshot of registered tasks. Safe to iterate while tasks are
+        # registered or unregistered by other threads, and shared by all
+        # queries until the next change.
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock:
+                snapshot = self._snapshot
+                if snapshot is None:
+                    snapshot = _Snapshot(self._tasks.values())
+                    self._snapshot = snapshot
+
+        return snapshot
+
+    def _invalidate(self):
+        # Drop the snapshot after tasks or their tags are changed.
+        # Waits for a snapshot being built, so it is never built from
+        # outdated tasks.
+        with self._lock:
+            self._snapshot = None
 
     @property
     def all_tasks(self):
         """TaskGroup: Get all tasks."""
-        return TaskGroup(list(self._tasks.values()))
+        return TaskGroup(self._view().tasks)
 
     @property
     def running_tasks(self):
         """TaskGroup: Get all running tasks."""
         task_list = list()
 
-        for name in self._tasks:
-            if self._tasks[name].is_running:
-                task_list.append(self._tasks[name])
+        for task in self._view().tasks:
+            if task.is_running:
+                task_list.append(task)
 
         return TaskGroup(task_list)
 
@@ -66,9 +174,9 @@ class ScheduleManager:
         """TaskGroup: Get all pending tasks."""
         task_list = list()
 
-        for name in self._tasks:
-            if not self._tasks[name].is_running:
-                task_list.append(self._tasks[name])
+        for task in self._view().tasks:
+            if not task.is_running:
+                task_list.append(task)
 
         return TaskGroup(task_list)
 
@@ -84,24 +192,58 @@ class ScheduleManager:
         Raises:
             TaskNotFoundError: Task is not registered in schedule manager.
         """
-        if name not in self._tasks:
-            raise TaskNotFoundError
+        with self._lock:
+            if name not in self._tasks:
+                raise TaskNotFoundError
+
+            return self._tasks[name]
 
-        return self._tasks[name]
+    def upcoming(self, until=None):
+        """Preview upcoming runs of running tasks.
+
+        Run times of every task are computed lazily by
+        :meth:`Task.upcoming` and merged in time order.
+
+        Args:
+            until (Union[datetime, timedelta, int, float]): End of the
+                preview, included.
+                A :obj:`datetime`, or a :obj:`timedelta` or a number in
+                seconds from now.
+                Defaults to None (no end).
+
+        Returns:
+            iterator: Tuples of run time and :class:`Task`, in ascending
+            order of run time.
+
+        Raises:
+            TimeFormatError: Invalid time format.
+        """
+        if isinstance(until, (int, float)):
+            until = timedelta(seconds=until)
+        if isinstance(until, timedelta):
+            until = datetime.now() + until
+        elif until is not None and not isinstance(until, datetime):
+            raise TimeFormatError
+
+        runs = heapq.merge(*(zip(task.upcoming(), itertools.repeat(task))
+                             for task in self._view().tasks
+                             if task.is_running),
+                           key=lambda run: run[0])
+        if until is None:
+            return runs
+        return itertools.takewhile(lambda run: run[0] <= until, runs)
 
     def _task_list(self, tag):
-        task_list = list()
+        snapshot = self._view()
 
-        if isinstance(tag, list):
-            for tag_ in tag:
-                for name in self._tasks:
-                    if tag_ in self._tasks[name].tag:
-                        if self._tasks[name] not in task_list:
-                            task_list.append(self._tasks[name])
-        else:
-            for name in self._tasks:
-                if tag in self._tasks[name].tag:
-                    task_list.append(self._tasks[name])
+        if not isinstance(tag, list):
+            return snapshot.tagged(tag)
+
+        task_list = list()
+        for tag_ in tag:
+            for task in snapshot.tagged(tag_):
+                if task not in task_list:
+                    task_list.append(task)
 
         return task_list
 
@@ -129,18 +271,26 @@ class ScheduleManager:
 
         Raises:
             TaskNameDuplicateError: Duplicate task name.
+            OperationFailError: Task can not be saved in the store, or its
+                dependency makes a cycle.
         """
-        if task.name in self._tasks:
-            raise TaskNameDuplicateError
-
-        self._tasks[task.name] = task
+        with self._lock:
+            if task.name in self._tasks:
+                raise TaskNameDuplicateError
+            if task._periodic_unit == "after":
+                self._check_dependency(task.name, task._upstream)
 
-        task.manager = self
+            self._add(task)
 
         return task
 
     def register_task(self, job, name=None, args=(), kwargs=None,
-                      ignore_skipped=True, daemon=True):
+                      ignore_skipped=True, daemon=True, misfire_policy=None,
+                      misfire_grace_time=None, timeout=None, executor=None,
+                      retry=None, keep_results=10,
+                      profile_slower_than=None, precise=False,
+                      batch=False, max_instances=1, overflow_policy="skip",
+                      priority=0):
         """Create and register a task.
 
         Args:
@@ -157,25 +307,74 @@ class ScheduleManager:
                 Defaults to True.
             daemon (bool): Set True to use as a daemon task.
                 Defaults to True.
+            misfire_policy (str): Behavior of runs which are missed.
+                See :class:`Task` for detail.
+                Defaults to None.
+            misfire_grace_time (Union[timedelta, int, float]): How late a
+                run is allowed to start.
+                See :class:`Task` for detail.
+                Defaults to None.
+            timeout (Union[timedelta, int, float]): Time limit of a run.
+                See :class:`Task` for detail.
+                Defaults to None.
+            executor (Union[str, concurrent.futures.Executor]): Where the
+                job runs.
+                See :class:`Task` for detail.
+                Defaults to None.
+            retry (RetryPolicy): Retry policy for failed runs.
+                Defaults to None (no retry).
+            keep_results (int): Number of run results kept by the task.
+                Defaults to 10.
+            profile_slower_than (Union[timedelta, int, float]): Sample
+                stacks of runs taking longer than this.
+                See :class:`Task` for detail.
+                Defaults to None (no profiling).
+            precise (bool): Set True to wake up exactly at run time.
+                See :class:`Task` for detail.
+                Defaults to False.
+            batch (bool): Set True to share a call of the job with other
+                tasks due at the same time.
+                See :class:`Task` for detail.
+                Defaults to False.
+            max_instances (int): Maximum number of runs of the task in
+                flight at the same time.
+                Defaults to 1.
+            overflow_policy (str): Behavior of runs exceeding
+                `max_instances`.
+                See :class:`Task` for detail.
+                Defaults to "skip".
+            priority (int): Priority of runs in the executor.
+                See :class:`Task` for detail.
+                Defaults to 0.
 
         Returns:
             Task: Registered task instance.
 
         Raises:
             TaskNameDuplicateError: Duplicate task name.
+            OperationFailError: Task can not be saved in the store.
         """
-        if name is None:
-            name = "Task-{}".format(uuid.uuid4().hex)
-            while name in self._tasks:
+        with self._lock:
+            if name is None:
                 name = "Task-{}".format(uuid.uuid4().hex)
-        elif name in self._tasks:
-            raise TaskNameDuplicateError
-
-        task = Task(name=name, job=job, args=args, kwargs=kwargs)
-
-        self._tasks[name] = task
-
-        task.manager = self
+                while name in self._tasks:
+                    name = "Task-{}".format(uuid.uuid4().hex)
+            elif name in self._tasks:
+                raise TaskNameDuplicateError
+
+            task = Task(name=name, job=job, args=args, kwargs=kwargs,
+                        ignore_skipped=ignore_skipped, daemon=daemon,
+                        misfire_policy=misfire_policy,
+                        misfire_grace_time=misfire_grace_time,
+                        timeout=timeout, executor=executor, retry=retry,
+                        keep_results=keep_results,
+                        profile_slower_than=profile_slower_than,
+                        precise=precise, batch=batch,
+                        max_instances=max_instances,
+                        overflow_policy=overflow_policy,
+                        priority=priority)
+
+            self._add(task)
 
         return task
 
@@ -187,19 +386,210 @@ class ScheduleManager:
             tag (Union[obj, list]): Unregister tasks by tag or by
                 a list of tags.
         """
-        if name:
-            if name in self._tasks:
-                task = self._tasks[name]
+        with self._lock:
+            if name:
+                if name in self._tasks:
+                    task = self._tasks[name]
+
+                    del self._tasks[name]
+                    self._snapshot = None
+                    self._unregistered(task)
+
+            if tag:
+                task_list = self._task_list(tag)
+
+                for task in task_list:
+                    if self._tasks.get(task.name) is task:
+                        del self._tasks[task.name]
+                        self._snapshot = None
+                        self._unregistered(task)
+
+    def _unregistered(self, task):
+        # Action after the task is removed.
+        # Paused task is registered again, which is not an event.
+        # W0212: protected-access
+        # pylint: disable=W0212
+        if not task._pause_task:
+            self._emit("unregistered", task)
+
+        task.manager = None
+        self._record("unregister", task)
+
+    def set_rate_limit(self, tag, rate=None, burst=1):
+        """Limit the rate of runs of tasks having a tag.
+
+        Runs are limited by a token bucket which holds up to `burst` tokens
+        and gains `rate` tokens every second. Every run takes a token of
+        every limited tag of its task. A run without token is delayed until
+        the token is available, not dropped, and the delay is reported by
+        :attr:`RunResult.throttled`.
+
+        Args:
+            tag (obj): Tag of tasks.
+            rate (Union[int, float]): Number of runs per second.
+                Defaults to None (remove the limit).
+            burst (int): Number of runs allowed at once.
+                Defaults to 1.
+
+        Raises:
+            OperationFailError: Invalid rate or burst.
+        """
+        if rate is not None and rate <= 0:
+            raise OperationFailError("Invalid rate <{}>.".format(rate))
+        if burst < 1:
+            raise OperationFailError("Invalid burst <{}>.".format(burst))
+
+        with self._lock:
+            rate_limits = dict(self._rate_limits)
+            if rate is None:
+                rate_limits.pop(tag, None)
+            else:
+                rate_limits[tag] = _TokenBucket(rate, burst)
+            self._rate_limits = rate_limits
+
+    def _reserve(self, task):
+        # Take tokens of the task tags. Returns seconds to wait for them,
+        # and the buckets the tokens are taken from.
+        rate_limits = self._rate_limits
+        if not rate_limits:
+            return 0, []
+
+        wait = 0
+        buckets = list()
+        for tag in task.tag:
+            try:
+                bucket = rate_limits.get(tag)
+            except TypeError:
+                # Unhashable tag is never limited.
+                continue
+
+            if bucket is not None:
+                wait = max(wait, bucket.reserve())
+                buckets.append(bucket)
+
+        return wait, buckets
+
+    def on(self, event, callback):
+        """Add a listener of task events.
+
+        Listeners are called with a
+        :class:`TaskEvent <schedule_manager.events.TaskEvent>` in a
+        dedicated thread, so they never block tasks.
+
+        The following events are available:
+        `start`, `run_started`, `run_succeeded`, `run_failed`, `skipped`,
+        `shed`, `shedding_started`, `shedding_stopped`, `paused`,
+        `stopped` and `unregistered`.
 
-                del self._tasks[name]
-                task.manager = None
+        Args:
+            event (str): Event name.
+            callback (callable): Listener of the event.
 
-        if tag:
-            task_list = self._task_list(tag)
+        Raises:
+            OperationFailError: Unknown event name.
+        """
+        self._events.on(event, callback)
 
-            for task in task_list:
-                del self._tasks[task.name]
-                task.manager = None
+    def off(self, event, callback):
+        """Remove a listener of task events.
+
+        Args:
+            event (str): Event name.
+            callback (callable): Listener added by :meth:`on`.
+        """
+        self._events.off(event, callback)
+
+    def _emit(self, event, task, **data):
+        # Emit task event if it is listened.
+        if self._events.listened(event):
+            self._events.emit(TaskEvent(event, task, **data))
+
+    def _join_batch(self, key, job, args):
+        # Add arguments of a run to the open batch of the key.
+        # Returns the batch and True if the batch is opened by this run.
+        with self._batches_lock:
+            batch = self._batches.get(key)
+            opened = batch is None
+            if opened:
+                batch = _Batch(job, self._batch_size(key))
+                self._batches[key] = batch
+
+            batch.join(args)
+
+        return batch, opened
+
+    def _batch_size(self, key):
+        # Number of batch tasks due at the time of the key.
+        # Batch tasks run the job in the task thread, so the next run time
+        # of a task is kept until its run is done. Tasks which are not
+        # running are counted as well, as they may be starting.
+        # W0212: protected-access
+        # pylint: disable=W0212
+        job, scheduled = key
+        size = 0
+        for task in self._view().tasks:
+            next_run = task._next_run
+            if (task._batch and next_run is not None
+                    and getattr(task, "_target", None) is job
+                    and next_run.replace(microsecond=0) == scheduled):
+                size += 1
+
+        return size
+
+    def _close_batch(self, key):
+        # No more runs join the batch.
+        with self._batches_lock:
+            self._batches.pop(key, None)
+
+    def _check_dependency(self, name, upstream):
+        # Raise if running task `name` after `upstream` makes a cycle.
+        # Called with the lock held.
+        pending = list(upstream)
+        visited = set()
+        while pending:
+            current = pending.pop()
+            if current == name:
+                raise OperationFailError("Dependency of task <{}> makes a "
+                                         "cycle.".format(name))
+            if current in visited:
+                continue
+            visited.add(current)
+
+            task = self._tasks.get(current)
+            if task is not None and task._periodic_unit == "after":
+                pending.extend(task._upstream)
+
+    def _upstream_succeeded(self, name, scheduled):
+        # Trigger tasks running after task `name`.
+        for task in self._view().downstream(name):
+            task._trigger(name, scheduled)    # pylint: disable=W0212
+
+    def _claim(self, task, scheduled):
+        # Claim a run of the task. Returns True if the run should be done.
+        if self._claims is None:
+            return True
+
+        return self._claims.claim(task.run_key(scheduled))
+
+    def _add(self, task):
+        # Add the task before recording it, so a snapshot of the store
+        # compacted by the record includes the task.
+        self._tasks[task.name] = task
+        self._snapshot = None
+
+        try:
+            self._record("register", task)
+        except OperationFailError:
+            del self._tasks[task.name]
+            self._snapshot = None
+            raise
+
+        task.manager = self
+
+    def _record(self, event, task):
+        # Record change of schedule state.
+        if self._store is not None:
+            self._store.record(event, task)
 
 
 class Task(threading.Thread):
@@ -224,6 +614,99 @@ class Task(threading.Thread):
             Defaults to True.
         daemon (bool): Set True to use as a daemon task.
             Defaults to True.
+        misfire_policy (str): Behavior of runs which are missed because the
+            job or the host was late.
+            Overrides `ignore_skipped` if given.
+            Defaults to None.
+            The following policy is available:
+            1. `coalesce`: Run the job once, and collapse all missed runs.
+            Same as `ignore_skipped=True`.
+            2. `run_all`: Run the job once for every missed run.
+            Same as `ignore_skipped=False`.
+            3. `skip`: Do not run the job if the run is later than
+            `misfire_grace_time`, and wait for the next run.
+            4. `run_all_max=N`: Like `run_all`, but keep at most N missed
+            runs. Older missed runs are skipped.
+        misfire_grace_time (Union[timedelta, int, float]): How late a run is
+            allowed to start and still be considered on time.
+            A :obj:`timedelta` or a number in seconds.
+            Defaults to the check interval of the task.
+        timeout (Union[timedelta, int, float]): Time limit of a run.
+            A :obj:`timedelta` or a number in seconds.
+            A run exceeding the limit is marked as timed out, its
+            :class:`CancellationToken` is cancelled and the task goes on
+            with the next run. A worker process is terminated.
+            Defaults to None (no limit).
+        executor (Union[str, concurrent.futures.Executor]): Where the job
+            runs.
+            Defaults to None.
+            The following value is available:
+            1. None: Run the job in the task thread. A helper thread is
+            used if `timeout` is set.
+            2. `"process"`: Run the job in a new process for every run.
+            3. :class:`concurrent.futures.Executor`: Submit the job to the
+            executor. The task does not wait for the run to be finished.
+        retry (RetryPolicy): Retry policy for runs raising an exception.
+            Retries are scheduled by the task instead of sleeping in the job.
+            Timed out runs are not retried.
+            Defaults to None (no retry).
+        keep_results (int): Number of :class:`RunResult` kept by the task.
+            Older results are dropped.
+            Defaults to 10.
+        profile_slower_than (Union[timedelta, int, float]): Threshold of
+            profiling.
+            A :obj:`timedelta` or a number in seconds.
+            Once a run takes longer than the threshold, the stack of the
+            thread running the job is sampled until the run is finished.
+            Samples are aggregated in :attr:`profile`. Runs in a process
+            are not profiled.
+            Defaults to None (no profiling).
+        precise (bool): Set True to start runs as close to their run time as
+            possible.
+            The task sleeps until shortly before the run time, then spins
+            for the rest of :attr:`PRECISE_SPIN`. It costs CPU time, so use
+            it only for tasks with tight timing.
+            Defaults to False.
+        batch (bool): Set True to collapse runs of tasks sharing the same
+            job into a single call.
+            Runs of batch tasks in the same :class:`ScheduleManager`, which
+            are due in the same second and start within
+            :attr:`BATCH_WINDOW`, call the job once with the list of their
+            `args` tuples. The first run waits for other batch tasks due
+            in the same second only. Every run of the batch gets the
+            return value or the exception of the call. The job is called
+            with a list of one tuple if the task runs alone.
+            `kwargs` and executors are not available for batch tasks.
+            Defaults to False.
+        max_instances (int): Maximum number of runs of the task in flight
+            at the same time.
+            Runs only overlap if they are submitted to an executor, because
+            the task waits for runs in the task thread or in a process.
+            A timed out run counts until its job returns.
+            Defaults to 1.
+        overflow_policy (str): Behavior of a run which is due while
+            `max_instances` runs are in flight.
+            Defaults to "skip".
+            The following policy is available:
+            1. `skip`: Do not run the job, and wait for the next run.
+            2. `queue_one`: Keep the run, and start it once a run in flight
+            is finished. Only one run is kept, later runs are skipped.
+            3. `replace`: Cancel the oldest run in flight and start the new
+            run. The cancelled run gets a :class:`CancelledError`, its
+            job is only stopped if it watches its cancel token.
+        priority (int): Priority of runs submitted to a
+            :class:`~schedule_manager.executors.PriorityThreadPoolExecutor`.
+            A smaller number is a higher priority. Ignored by other
+            executors.
+            Defaults to 0.
+
+    If the job accepts a `cancel_token` keyword argument, a
+    :class:`CancellationToken` is passed to it for every run which is not
+    running in a process.
+
+    If the job accepts a `trace_context` keyword argument, trace context of
+    the run is passed to it. It is None if tracing is not enabled by the
+    schedule manager.
 
     Attributes:
         name (str): Task name.
@@ -234,8 +717,16 @@ class Task(threading.Thread):
     """
 
     def __init__(self, job, name=None, args=(), kwargs=None,
-                 ignore_skipped=True, daemon=True):
+                 ignore_skipped=True, daemon=True, misfire_policy=None,
+                 misfire_grace_time=None, timeout=None, executor=None,
+                 retry=None, keep_results=10, profile_slower_than=None,
+                 precise=False, batch=False, max_instances=1,
+                 overflow_policy="skip", priority=0):
         self.CHECK_INTERVAL = 1
+        self.PRECISE_SPIN = 0.002    # Time spinning before a precise run
+        self.BATCH_WINDOW = 0.1    # Time waiting for runs joining a batch
+        self.PROFILE_INTERVAL = 0.01    # Time between two stack samples
+        self.PROFILE_MAX_STACKS = 1000    # Distinct stacks kept in profile
 
         # Flag (start task): Set to True is start() is called.
         self._start = False
@@ -248,10 +739,107 @@ class Task(threading.Thread):
         #     be started once
         self._pause_task = False
 
+        # Flag (paused task): Set to True if the task is registered again
+        # by pause(), until it is started.
+        self._paused = False
+
+        # Guards changes of flags. Flags are read without the lock.
+        self._state_lock = threading.Lock()
+
+        self._precise = precise
+
         self._manager = None
         self._tag = list()    # Tag list
 
-        self._ignore_skipped = ignore_skipped    # Ignore skipped job activity.
+        # Misfire policy: behavior of missed runs.
+        if misfire_policy is None:
+            misfire_policy = "coalesce" if ignore_skipped else "run_all"
+        self._misfire_policy, self._misfire_max = (
+            self._parse_misfire_policy(misfire_policy))
+
+        if misfire_grace_time is None:
+            self._misfire_grace_time = None
+        elif isinstance(misfire_grace_time, timedelta):
+            self._misfire_grace_time = misfire_grace_time
+        elif isinstance(misfire_grace_time, (int, float)):
+            self._misfire_grace_time = timedelta(seconds=misfire_grace_time)
+        else:
+            raise TimeFormatError
+
+        if timeout is None or isinstance(timeout, timedelta):
+            self._timeout = timeout
+        elif isinstance(timeout, (int, float)):
+            self._timeout = timedelta(seconds=timeout)
+        else:
+            raise TimeFormatError
+
+        if (profile_slower_than is None
+                or isinstance(profile_slower_than, timedelta)):
+            self._profile_slower_than = profile_slower_than
+        elif isinstance(profile_slower_than, (int, float)):
+            self._profile_slower_than = timedelta(seconds=profile_slower_than)
+        else:
+            raise TimeFormatError
+
+        # Collapsed stack -> number of samples.
+        self._profile = dict()
+        self._profile_lock = threading.Lock()
+
+        if executor not in (None, "process") and not hasattr(executor,
+                                                             "submit"):
+            raise OperationFailError("Invalid executor <{}>."
+                                     .format(executor))
+        self._executor = executor
+
+        self._in_flight = list()    # Runs which are not finished.
+
+        if not isinstance(max_instances, int) or max_instances < 1:
+            raise OperationFailError("Invalid max instances <{}>."
+                                     .format(max_instances))
+        if overflow_policy not in ("skip", "queue_one", "replace"):
+            raise OperationFailError("Invalid overflow policy <{}>."
+                                     .format(overflow_policy))
+        self._max_instances = max_instances
+        self._overflow_policy = overflow_policy
+        self._queued_run = None    # Run waiting for a free instance: _Run
+        self._priority = priority
+        self._shed_seq = 0    # Due runs of a sheddable task while shedding
+
+        self._retry = retry    # Retry policy
+        self._retry_run = None    # Pending retry: (time.monotonic(), _Run)
+        self._accept_token = _accept_keyword(job, "cancel_token")
+        self._accept_context = _accept_keyword(job, "trace_context")
+
+        if batch:
+            if kwargs or executor is not None:
+                raise OperationFailError("Batch task does not support "
+                                         "kwargs and executor.")
+            # Job receives the batch only.
+            self._accept_token = self._accept_context = False
+        self._batch = batch
+
+        self._results = collections.deque(maxlen=keep_results)
+        self._futures = list()    # Futures waiting for the next run.
+        self._results_lock = threading.Lock()
+
+        # Run counters
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "coalesced": 0,    # Missed runs collapsed into a single run.
+            "skipped": 0,    # Missed runs which are not run.
+            "timed_out": 0,    # Runs exceeding the time limit.
+            "failed": 0,    # Runs raising an exception.
+            "retried": 0,    # Retries of failed runs.
+            "standby": 0,    # Runs left to the leader manager.
+            "deduplicated": 0,    # Runs claimed by other managers.
+            "profiled": 0,    # Runs exceeding the profiling threshold.
+            "batched": 0,    # Runs done by a call of another task.
+            "overlapped": 0,    # Runs skipped by the instance limit.
+            "queued": 0,    # Runs waiting for a free instance.
+            "replaced": 0,    # Runs cancelled for a newer run.
+            "throttled": 0,    # Runs delayed by rate limits.
+            "shed": 0,    # Runs skipped by load shedding.
+        }
 
         self._next_run = None    # datetime when the job run at next time
 
@@ -265,6 +853,13 @@ class Task(threading.Thread):
         self._at_time = None
         self._at_week_day = None
         self._at_day = None
+        self._zone = None    # Time zone of calendar schedule
+
+        self._upstream = ()    # Name of tasks triggering the task.
+        self._upstream_done = set()    # Upstream succeeded since last run.
+        self._triggers = collections.deque()    # Scheduled time of triggers
+        self._trigger_event = threading.Event()
+        self._adhoc = collections.deque()    # Scheduled time of run_now()
 
         if name is None:
             name = "Task-{}".format(uuid.uuid4().hex)
@@ -312,11 +907,187 @@ class Task(threading.Thread):
 
         return returns
 
+    def upcoming(self, n=None):
+        """Preview upcoming run times.
+
+        Run times are computed lazily from the schedule without changing the
+        task. A task which is not started is previewed as if it is started
+        now. Runs triggered by other tasks are not predictable, and runs
+        skipped by the misfire policy are not predicted.
+
+        Args:
+            n (int): Maximum number of run times.
+                Defaults to None (no limit other than the runs left of a
+                non-periodic task).
+
+        Yields:
+            datetime: Run time in ascending order.
+        """
+        if self._stop_task or self._periodic_unit in (None, "after"):
+            return
+
+        limit = n
+        if not self._is_periodic:
+            count = self._nonperiod_count
+            limit = count if limit is None else min(limit, count)
+
+        run_time = self._next_run
+        if run_time is None:
+            time_now = datetime.now()
+            if self._start_at is not None:
+                time_now = max(time_now, self._start_at)
+            elif self._delay:
+                time_now += self._delay
+            run_time = self._first_run(time_now)
+
+        for _ in itertools.count() if limit is None else range(limit):
+            yield run_time
+            run_time = self._step_run(run_time)
+
     @property
     def is_running(self):
         """bool: Return True if the task is running."""
         return self._start
 
+    @property
+    def misfire_policy(self):
+        """str: Behavior of missed runs."""
+        if self._misfire_max is not None:
+            return "run_all_max={}".format(self._misfire_max)
+        return self._misfire_policy
+
+    @property
+    def max_instances(self):
+        """int: Maximum number of runs in flight at the same time."""
+        return self._max_instances
+
+    @property
+    def overflow_policy(self):
+        """str: Behavior of runs exceeding :attr:`max_instances`."""
+        return self._overflow_policy
+
+    @property
+    def priority(self):
+        """int: Priority of runs in the executor."""
+        return self._priority
+
+    @property
+    def stats(self):
+        """dict: Run counters of the task.
+
+        * `coalesced`: Number of missed runs collapsed into a single run.
+        * `skipped`: Number of missed runs which are not run.
+        * `timed_out`: Number of runs exceeding the time limit.
+        * `failed`: Number of runs raising an exception.
+        * `retried`: Number of retries of failed runs.
+        * `standby`: Number of runs left to the leader because the manager
+          is standby.
+        * `deduplicated`: Number of runs claimed by other managers.
+        * `profiled`: Number of runs exceeding the profiling threshold.
+        * `batched`: Number of runs done by a batch call of another task.
+        * `overlapped`: Number of runs skipped because `max_instances` runs
+          are in flight.
+        * `queued`: Number of runs waiting for a run in flight to finish.
+        * `replaced`: Number of runs cancelled for a newer run.
+        * `throttled`: Number of runs delayed by rate limits of the schedule
+          manager.
+        * `shed`: Number of runs skipped by load shedding of the schedule
+          manager.
+        """
+        with self._stats_lock:
+            return dict(self._stats)
+
+    def _count(self, counter, value=1):
+        # Counters are updated by task, job and profiler threads.
+        with self._stats_lock:
+            self._stats[counter] += value
+
+    def run_key(self, scheduled):
+        """Get idempotency key of a run.
+
+        Args:
+            scheduled (datetime): Time the run is scheduled at.
+
+        Returns:
+            str: Key made of task name and scheduled time, including
+            microseconds, so runs of sub-second periods have their own key.
+        """
+        return "{}@{}".format(self.name, scheduled.isoformat())
+
+    @property
+    def timeout(self):
+        """timedelta: Time limit of a run. None if there is no limit."""
+        return self._timeout
+
+    @property
+    def profile(self):
+        """dict: Stack samples of slow runs.
+
+        Maps a collapsed stack, frames from the job to the innermost call
+        joined by `;`, to the number of samples. The format is accepted by
+        flame graph tools. Stacks beyond :attr:`PROFILE_MAX_STACKS` are
+        counted as `[other]`.
+        """
+        with self._profile_lock:
+            return dict(self._profile)
+
+    def _add_sample(self, stack):
+        # Aggregate a collapsed stack sample.
+        with self._profile_lock:
+            if (stack not in self._profile
+                    and len(self._profile) >= self.PROFILE_MAX_STACKS):
+                stack = "[other]"
+
+            self._profile[stack] = self._profile.get(stack, 0) + 1
+
+    @property
+    def last_result(self):
+        """RunResult: Result of the latest finished run. None if no run is
+        finished."""
+        with self._results_lock:
+            if not self._results:
+                return None
+            return self._results[-1]
+
+    def results(self, n=None):
+        """Get results of the latest finished runs.
+
+        Every attempt of a retried run has its own result.
+
+        Args:
+            n (int): Number of results.
+                Defaults to None (all kept results).
+
+        Returns:
+            list: :class:`RunResult` list from the oldest to the latest.
+        """
+        with self._results_lock:
+            results = list(self._results)
+
+        if n is None:
+            return results
+        if n <= 0:
+            return list()
+        return results[-n:]
+
+    def next_future(self):
+        """Get a future of the next run.
+
+        The future is resolved with the return value of the job, or the
+        exception raised by the job, after the next run and all its retries
+        are finished. :obj:`TimeoutError` is set if the run is timed out.
+        The future is cancelled if the task stops before the run.
+
+        Returns:
+            concurrent.futures.Future: Future of the next run.
+        """
+        future = Future()
+
+        with self._results_lock:
+            self._futures.append(future)
+
+        return future
+
     @property
     def manager(self):
         """ScheduleManager: Schedule manager which manages current task."""
@@ -369,6 +1140,8 @@ class Task(threading.Thread):
         """
         if tag not in self._tag:
             self._tag.append(tag)
+            self._tags_changed()
+            self._record("update")
 
         return self
 
@@ -397,6 +1170,8 @@ class Task(threading.Thread):
         """
         if tag in self._tag:
             self._tag.remove(tag)
+            self._tags_changed()
+            self._record("update")
 
         return self
 
@@ -431,15 +1206,18 @@ class Task(threading.Thread):
             if tag not in self._tag:
                 self._tag.append(tag)
 
+        self._tags_changed()
+        self._record("update")
+
         return self
 
     def delay(self, interval=None):
         """Delay task start time.
 
         Args:
-            interval (Union[str, timedelta, int]): Time interval.
-                A string with format `HH:MM:SS` or :obj:`timedelta` or int in
-                seconds.
+            interval (Union[str, timedelta, int, float]): Time interval.
+                A string with format `HH:MM:SS` or :obj:`timedelta` or a
+                number in seconds.
                 Or set None to cancel task delay time.
                 Defaults to None.
 
@@ -458,7 +1236,7 @@ class Task(threading.Thread):
             if isinstance(interval, timedelta):
                 self._start_at = None    # Use delay instead of start time.
                 self._delay = interval
-            elif isinstance(interval, int):
+            elif isinstance(interval, (int, float)):
                 self._start_at = None    # Use delay instead of start time.
                 self._delay = timedelta(seconds=interval)
             else:
@@ -472,6 +1250,8 @@ class Task(threading.Thread):
                 else:
                     raise TimeFormatError
 
+        self._record("update")
+
         return self
 
     def start_at(self, at_time=None):
@@ -527,8 +1307,77 @@ class Task(threading.Thread):
                 else:
                     raise TimeFormatError
 
+        self._record("update")
+
         return self
 
+    def after(self, *tasks):
+        """Run the task after other tasks succeed.
+
+        The task is triggered by runs of upstream tasks in the same
+        :class:`ScheduleManager` instead of a timer. It runs once every
+        upstream task has succeeded since its last run, and the run is
+        scheduled at the time of the last upstream run. Independent
+        downstream tasks run in parallel.
+
+        Upstream runs finished while the task is not running are ignored.
+        A trigger arriving while another one is pending is coalesced, unless
+        the misfire policy is `run_all`.
+
+        Args:
+            *tasks (Union[Task, TaskGroup, str]): Upstream tasks or their
+                names.
+
+        Returns:
+            Task: Invoked task instance.
+
+        Raises:
+            OperationFailError: No upstream task is given, or the dependency
+                makes a cycle.
+        """
+        if self._start:
+            raise OperationFailError("Task is already running.")
+
+        upstream = list()
+        for task in tasks:
+            if isinstance(task, TaskGroup):
+                upstream.extend(member.name for member in task)
+            elif isinstance(task, str):
+                upstream.append(task)
+            else:
+                upstream.append(task.name)
+        upstream = tuple(upstream)
+
+        if not upstream:
+            raise OperationFailError("Upstream task is required.")
+
+        manager = self._manager
+        if isinstance(manager, ScheduleManager):
+            # W0212: protected-access
+            # pylint: disable=W0212
+            with manager._lock:
+                manager._check_dependency(self.name, upstream)
+                self._periodic_unit = "after"
+                self._upstream = upstream
+                manager._invalidate()
+        elif self.name in upstream:
+            raise OperationFailError("Dependency of task <{}> makes a "
+                                     "cycle.".format(self.name))
+        else:
+            self._periodic_unit = "after"
+            self._upstream = upstream
+
+        self._record("update")
+
+        return self
+
+    @property
+    def upstream(self):
+        """tuple: Name of tasks which the task runs after."""
+        if self._periodic_unit != "after":
+            return ()
+        return self._upstream
+
     def nonperiodic(self, count):
         """See as an non-periodic task.
 
@@ -547,6 +1396,8 @@ class Task(threading.Thread):
         self._is_periodic = False
         self._nonperiod_count = count
 
+        self._record("update")
+
         return self
 
     def periodic(self):
@@ -560,15 +1411,18 @@ class Task(threading.Thread):
 
         self._is_periodic = True
 
+        self._record("update")
+
         return self
 
     def period(self, interval):
         """Scheduling periodic task.
 
         Args:
-            interval (Union[str, timedelta, int]): Time interval.
-                A string with format `HH:MM:SS` or :obj:`timedelta` or int in
-                seconds.
+            interval (Union[str, timedelta, int, float]): Time interval.
+                A string with format `HH:MM:SS` or :obj:`timedelta` or a
+                number in seconds.
+                Sub-second intervals are allowed.
 
         Returns:
             Task: Invoked task instance.
@@ -579,25 +1433,32 @@ class Task(threading.Thread):
         if self._start:
             raise OperationFailError("Task is already running.")
 
-        self._periodic_unit = "every"
-
         if isinstance(interval, timedelta):
-            self._periodic = interval
-        elif isinstance(interval, int):
-            self._periodic = timedelta(seconds=interval)
+            periodic = interval
+        elif isinstance(interval, (int, float)):
+            periodic = timedelta(seconds=interval)
+        elif (isinstance(interval, str)
+              and re.match(r'^([0-1]?\d|[2][0-3]):[0-5]?\d:[0-5]?\d$',
+                           interval)):
+            tsp = interval.split(":")
+            periodic = timedelta(hours=int(tsp[0]),
+                                 minutes=int(tsp[1]),
+                                 seconds=int(tsp[2]))
         else:
-            if re.match(r'^([0-1]?\d|[2][0-3]):[0-5]?\d:[0-5]?\d$', interval):
-                tsp = interval.split(":")
-                self._periodic = timedelta(hours=int(tsp[0]),
-                                           minutes=int(tsp[1]),
-                                           seconds=int(tsp[2]))
-            else:
-                raise TimeFormatError
+            raise TimeFormatError
+
+        if periodic <= timedelta(0):
+            raise TimeFormatError
+
+        self._periodic_unit = "every"
+        self._periodic = periodic
+
+        self._record("update")
 
         return self
 
     def period_at(self, unit="day", at_time="00:00:00",
-                  week_day="Monday", day=1):
+                  week_day="Monday", day=1, tz=None):
         """Scheduling periodic task.
 
         Specify a particular time that the job should be run at.
@@ -623,16 +1484,26 @@ class Task(threading.Thread):
                 This argument will only be used is unit is `month`.
                 Value should be in 1 ~ 31.
                 Job will be skipped if specific date is not available.
+            tz (Union[str, datetime.tzinfo]): Time zone of `at_time`,
+                such as `"Europe/Berlin"`.
+                Runs follow the wall clock of the zone across daylight
+                saving time changes. A time skipped by the change is run
+                as late as the skipped time, and a repeated time is run
+                once.
+                Defaults to None (local time).
 
         Returns:
             Task: Invoked task instance.
 
         Raises:
             TimeFormatError: Invalid time format.
+            OperationFailError: Unknown time zone.
         """
         if self._start:
             raise OperationFailError("Task is already running.")
 
+        zone = None if tz is None else timezone.get_zone(tz)
+
         time_pattern = r'^([0-1]?\d|[2][0-3]):[0-5]?\d:[0-5]?\d$'
 
         week_day_list = {
@@ -681,9 +1552,19 @@ class Task(threading.Thread):
         else:
             raise TimeFormatError
 
+        self._zone = zone
+
+        self._record("update")
+
         return self
 
-    def period_day_at(self, at_time="00:00:00"):
+    @property
+    def tz(self):
+        """datetime.tzinfo: Time zone of calendar schedule. None if it
+        follows local time."""
+        return self._zone
+
+    def period_day_at(self, at_time="00:00:00", tz=None):
         """Scheduling periodic task.
 
         Specify a particular time that the job should be run at.
@@ -694,6 +1575,9 @@ class Task(threading.Thread):
                 A string with format `HH:MM:SS`.
                 Defaults to `00:00:00`.
             week_day (str): Week to do the job.
+            tz (Union[str, datetime.tzinfo]): Time zone of `at_time`.
+                See :meth:`period_at` for detail.
+                Defaults to None (local time).
 
         Returns:
             Task: Invoked task instance.
@@ -701,11 +1585,12 @@ class Task(threading.Thread):
         Raises:
             TimeFormatError: Invalid time format.
         """
-        self.period_at(unit="day", at_time=at_time)
+        self.period_at(unit="day", at_time=at_time, tz=tz)
 
         return self
 
-    def period_week_at(self, at_time="00:00:00", week_day="Monday"):
+    def period_week_at(self, at_time="00:00:00", week_day="Monday",
+                       tz=None):
         """Scheduling periodic task.
 
         Specify a particular time that the job should be run at.
@@ -720,6 +1605,9 @@ class Task(threading.Thread):
                 A string should be one of following value:
                 [`"Monday"`, `"Tuesday"`, `"Wednesday"`, `"Thursday"`,
                 `"Friday"`, `"Saturday"`, `"Sunday"`]
+            tz (Union[str, datetime.tzinfo]): Time zone of `at_time`.
+                See :meth:`period_at` for detail.
+                Defaults to None (local time).
 
         Returns:
             Task: Invoked task instance.
@@ -727,11 +1615,12 @@ class Task(threading.Thread):
         Raises:
             TimeFormatError: Invalid time format.
         """
-        self.period_at(unit="week", at_time=at_time, week_day=week_day)
+        self.period_at(unit="week", at_time=at_time, week_day=week_day,
+                       tz=tz)
 
         return self
 
-    def period_month_at(self, at_time="00:00:00", day=1):
+    def period_month_at(self, at_time="00:00:00", day=1, tz=None):
         """Scheduling periodic task.
 
         Specify a particular time that the job should be run at.
@@ -745,6 +1634,9 @@ class Task(threading.Thread):
                 Defaults to 1.
                 Value should be in 1 ~ 31.
                 Job will be skipped if specific date is not available.
+            tz (Union[str, datetime.tzinfo]): Time zone of `at_time`.
+                See :meth:`period_at` for detail.
+                Defaults to None (local time).
 
         Returns:
             Task: Invoked task instance.
@@ -752,35 +1644,50 @@ class Task(threading.Thread):
         Raises:
             TimeFormatError: Invalid time format.
         """
-        self.period_at(unit="month", at_time=at_time, day=day)
+        self.period_at(unit="month", at_time=at_time, day=day, tz=tz)
 
         return self
 
     def _set_next_run_init(self):
         # First time the job run at.
-        if self._periodic_unit == "every":
-            self._next_run = datetime.now()
-        elif self._periodic_unit == "day":
-            self._set_next_run_init_day()
-        elif self._periodic_unit == "week":
-            self._set_next_run_init_week()
-        elif self._periodic_unit == "month":
-            self._set_next_run_init_month()
-
-    def _set_next_run_init_day(self):
-        run_time = datetime.now().replace(hour=self._at_time[0],
-                                          minute=self._at_time[1],
-                                          second=self._at_time[2])
-
-        if run_time < datetime.now():
-            self._next_run = run_time + timedelta(days=1)
-        else:
-            self._next_run = run_time
+        self._next_run = self._first_run(datetime.now())
 
-    def _set_next_run_init_week(self):
-        tmp_runtime = datetime.now().replace(hour=self._at_time[0],
-                                             minute=self._at_time[1],
-                                             second=self._at_time[2])
+    def _first_run(self, time_now):
+        # First run time if the task starts at `time_now`.
+        if self._periodic_unit == "every":
+            return time_now
+        if self._zone is None:
+            return self._first_calendar_run(time_now)
+
+        # Calendar of the time zone.
+        wall = self._first_calendar_run(timezone.to_wall(self._zone,
+                                                         time_now))
+        return None if wall is None else timezone.to_local(self._zone, wall)
+
+    def _first_calendar_run(self, time_now):
+        if self._periodic_unit == "day":
+            return self._first_run_day(time_now)
+        if self._periodic_unit == "week":
+            return self._first_run_week(time_now)
+        if self._periodic_unit == "month":
+            return self._first_run_month(time_now)
+        return None
+
+    def _first_run_day(self, time_now):
+        run_time = time_now.replace(hour=self._at_time[0],
+                                    minute=self._at_time[1],
+                                    second=self._at_time[2],
+                                    microsecond=0)
+
+        if run_time < time_now:
+            return run_time + timedelta(days=1)
+        return run_time
+
+    def _first_run_week(self, time_now):
+        tmp_runtime = time_now.replace(hour=self._at_time[0],
+                                       minute=self._at_time[1],
+                                       second=self._at_time[2],
+                                       microsecond=0)
 
         now_weekday = tmp_runtime.date().weekday()
         if now_weekday < self._at_week_day:
@@ -788,19 +1695,20 @@ class Task(threading.Thread):
         elif now_weekday > self._at_week_day:
             tmp_runtime += timedelta(days=7+self._at_week_day-now_weekday)
         else:
-            if tmp_runtime < datetime.now():
+            if tmp_runtime < time_now:
                 tmp_runtime += timedelta(days=7)
 
-        self._next_run = tmp_runtime
+        return tmp_runtime
 
-    def _set_next_run_init_month(self):
+    def _first_run_month(self, time_now):
         try:
-            tmp_runtime = datetime.now().replace(day=self._at_day,
-                                                 hour=self._at_time[0],
-                                                 minute=self._at_time[1],
-                                                 second=self._at_time[2])
+            tmp_runtime = time_now.replace(day=self._at_day,
+                                           hour=self._at_time[0],
+                                           minute=self._at_time[1],
+                                           second=self._at_time[2],
+                                           microsecond=0)
 
-            if datetime.now().day > self._at_day:
+            if time_now.day > self._at_day:
                 if tmp_runtime.month == 12:
                     tmp_runtime = tmp_runtime.replace(year=tmp_runtime.year+1,
                                                       month=1)
@@ -812,8 +1720,8 @@ class Task(threading.Thread):
                         # Because day is out of range in next month.
                         tmp_runtime = tmp_runtime.replace(month=(tmp_runtime
                                                                  .month)+2)
-            elif datetime.now().day == self._at_day:
-                if tmp_runtime < datetime.now():
+            elif time_now.day == self._at_day:
+                if tmp_runtime < time_now:
                     if tmp_runtime.month == 12:
                         tmp_runtime = tmp_runtime.replace(year=(tmp_runtime
                                                                 .year)+1,
@@ -827,261 +1735,807 @@ class Task(threading.Thread):
                             tmp_runtime = (tmp_runtime
                                            .replace(month=tmp_runtime.month+2))
 
-            self._next_run = tmp_runtime
+            return tmp_runtime
         except ValueError:
             # Because day is out of range in this month.
-            self._next_run = datetime.now().replace(month=(datetime
-                                                           .now()
-                                                           .month)+1,
-                                                    day=self._at_day,
-                                                    hour=self._at_time[0],
-                                                    minute=self._at_time[1],
-                                                    second=self._at_time[2])
-
-    def _set_next_run(self):
+            return time_now.replace(month=time_now.month+1,
+                                    day=self._at_day,
+                                    hour=self._at_time[0],
+                                    minute=self._at_time[1],
+                                    second=self._at_time[2],
+                                    microsecond=0)
+
+    @staticmethod
+    def _parse_misfire_policy(policy):
+        if policy in ("coalesce", "run_all", "skip"):
+            return policy, None
+
+        match = re.match(r'^run_all_max=(\d+)$', str(policy))
+        if match:
+            return "run_all", int(match.group(1))
+
+        raise OperationFailError("Invalid misfire policy <{}>."
+                                 .format(policy))
+
+    def _run_interval(self):
+        # Fixed interval between runs. None if interval is not fixed.
         if self._periodic_unit == "every":
-            self._set_next_run_every()
-        elif self._periodic_unit == "day":
-            self._set_next_run_day()
-        elif self._periodic_unit == "week":
-            self._set_next_run_week()
-        elif self._periodic_unit == "month":
-            self._set_next_run_month()
+            return self._periodic
+        if self._zone is not None:
+            # Days of a time zone may be shorter or longer.
+            return None
+        if self._periodic_unit == "day":
+            return timedelta(days=1)
+        if self._periodic_unit == "week":
+            return timedelta(days=7)
+        return None
+
+    def _step_run(self, run_time):
+        # Run time right after `run_time`.
+        interval = self._run_interval()
+        if interval is not None:
+            return run_time + interval
+        if self._zone is None:
+            return self._step_calendar(run_time)
+
+        # Step on the wall clock of the time zone. Time of day is set
+        # again, since a run skipped by daylight saving time is moved.
+        wall = self._step_calendar(timezone.to_wall(self._zone, run_time))
+        wall = wall.replace(hour=self._at_time[0], minute=self._at_time[1],
+                            second=self._at_time[2], microsecond=0)
+        return timezone.to_local(self._zone, wall)
+
+    def _step_calendar(self, run_time):
+        # Same time of the next day, week or month.
+        if self._periodic_unit == "day":
+            return run_time + timedelta(days=1)
+        if self._periodic_unit == "week":
+            return run_time + timedelta(days=7)
+
+        # Month
+        if run_time.month == 12:
+            return run_time.replace(year=run_time.year+1, month=1)
 
-    def _set_next_run_every(self):
-        if self._ignore_skipped:
-            next_ = self._next_run + self._periodic
+        try:
+            return run_time.replace(month=run_time.month+1)
+        except ValueError:
+            # Because day is out of range in next month.
+            return run_time.replace(month=run_time.month+2)
 
-            if next_ < datetime.now():
-                rate = (datetime.now() - self._next_run) / self._periodic
-                next_ = self._next_run + math.ceil(rate) * self._periodic
+    def _count_missed(self, next_, time_now):
+        # Number of runs from `next_` (included) which are already overdue.
+        if next_ > time_now:
+            return 0
 
-            if next_ == datetime.now():
-                next_ += self._periodic
+        interval = self._run_interval()
+        if interval is not None:
+            return (time_now - next_) // interval + 1
 
-            self._next_run = next_
-        else:
-            self._next_run += self._periodic
+        missed = 0
+        while next_ <= time_now:
+            next_ = self._step_run(next_)
+            missed += 1
 
-    def _set_next_run_day(self):
-        if self._ignore_skipped:
-            next_ = self._next_run + timedelta(days=1)
+        return missed
 
-            if next_ < datetime.now():
-                # Record current datetime to avoid 23:59:XX situation.
-                time_now = datetime.now()
+    def _skip_runs(self, run_time, count):
+        # Move forward `count` runs from `run_time`.
+        interval = self._run_interval()
+        if interval is not None:
+            return run_time + count * interval
 
-                next_ = next_.replace(month=time_now.month,
-                                      day=time_now.day)
+        for _ in range(count):
+            run_time = self._step_run(run_time)
 
-            if next_ <= datetime.now():
-                next_ += timedelta(days=1)
+        return run_time
 
-            self._next_run = next_
-        else:
-            self._next_run += timedelta(days=1)
-
-    def _set_next_run_week(self):
-        if self._ignore_skipped:
-            next_ = self._next_run + timedelta(days=7)
-
-            if next_ < datetime.now():
-                next_ = datetime.now().replace(hour=self._at_time[0],
-                                               minute=self._at_time[1],
-                                               second=self._at_time[2])
-
-                weekday_ = next_.date().weekday()
-                if weekday_ < self._at_week_day:
-                    next_ += timedelta(days=self._at_week_day-weekday_)
-                elif weekday_ > self._at_week_day:
-                    next_ += timedelta(days=7+self._at_week_day-weekday_)
-                else:
-                    if next_ < datetime.now():
-                        next_ += timedelta(days=7)
+    def _is_misfired(self, time_now):
+        # Run is later than grace time.
+        if self._periodic_unit == "after":
+            # Triggered runs are never late.
+            return False
 
-            if next_ <= datetime.now():
-                next_ += timedelta(days=7)
+        grace = self._misfire_grace_time
+        if grace is None:
+            grace = timedelta(seconds=self.CHECK_INTERVAL)
 
-            self._next_run = next_
-        else:
-            self._next_run += timedelta(days=7)
+        return time_now - self._next_run > grace
 
-    def _set_next_run_month(self):
-        if self._ignore_skipped:
-            if self._next_run.month == 12:
-                next_ = self._next_run.replace(year=self._next_run.year+1,
-                                               month=1)
-            else:
-                try:
-                    next_ = self._next_run.replace(month=(self
-                                                          ._next_run
-                                                          .month)+1)
-                except ValueError:
-                    # Because day is out of range in next month.
-                    next_ = self._next_run.replace(month=(self
-                                                          ._next_run
-                                                          .month)+2)
-
-            if next_ < datetime.now():
-                try:
-                    next_ = datetime.now().replace(day=self._at_day,
-                                                   hour=self._at_time[0],
-                                                   minute=self._at_time[1],
-                                                   second=self._at_time[2])
-
-                    if datetime.now().day > self._at_day:
-                        if next_.month == 12:
-                            next_ = next_.replace(year=next_.year+1,
-                                                  month=1)
-                        else:
-                            try:
-                                next_ = next_.replace(month=next_.month+1)
-                            except ValueError:
-                                # Because day is out of range in next month.
-                                next_ = next_.replace(month=next_.month+2)
-                    elif datetime.now().day == self._at_day:
-                        if next_ < datetime.now():
-                            if next_.month == 12:
-                                next_ = next_.replace(year=next_.year+1,
-                                                      month=1)
-                            else:
-                                try:
-                                    next_ = next_.replace(month=next_.month+1)
-                                except ValueError:
-                                    # Because day is out of range in next
-                                    # month.
-                                    next_ = next_.replace(month=next_.month+2)
-                except ValueError:
-                    next_ = datetime.now().replace(month=(datetime
-                                                          .now()
-                                                          .month)+1,
-                                                   day=self._at_day,
-                                                   hour=self._at_time[0],
-                                                   minute=self._at_time[1],
-                                                   second=self._at_time[2])
-
-            if next_ <= datetime.now():
-                if next_.month == 12:
-                    next_ = next_.replace(year=next_.year+1,
-                                          month=1)
-                else:
-                    try:
-                        next_ = next_.replace(month=next_.month+1)
-                    except ValueError:
-                        # Because day is out of range in next month.
-                        next_ = next_.replace(month=next_.month+2)
+    def _skip_misfired(self):
+        # Skip current run and all missed runs.
+        time_now = datetime.now()
+        next_ = self._step_run(self._next_run)
+        missed = self._count_missed(next_, time_now)
+
+        self._count("skipped", missed + 1)
+        self._emit("skipped", count=missed + 1)
+        self._next_run = self._skip_runs(next_, missed)
 
+    def _set_next_run(self):
+        next_ = self._step_run(self._next_run)
+
+        if self._misfire_policy == "run_all" and self._misfire_max is None:
             self._next_run = next_
+            return
+
+        missed = self._count_missed(next_, datetime.now())
+
+        if self._misfire_policy == "run_all":
+            if missed > self._misfire_max:
+                dropped = missed - self._misfire_max
+                self._count("skipped", dropped)
+                self._emit("skipped", count=dropped)
+                next_ = self._skip_runs(next_, dropped)
+        elif self._misfire_policy == "coalesce":
+            self._count("coalesced", missed)
+            next_ = self._skip_runs(next_, missed)
         else:
-            if self._next_run.month == 12:
-                self._next_run = self._next_run.replace(year=(self
-                                                              ._next_run
-                                                              .year)+1,
-                                                        month=1)
-            else:
-                try:
-                    month_next = self._next_run.month+1
-                    self._next_run = self._next_run.replace(month=month_next)
-                except ValueError:
-                    # Because day is out of range in next month.
-                    month_next = self._next_run.month+2
-                    self._next_run = self._next_run.replace(month=month_next)
+            self._count("skipped", missed)
+            if missed:
+                self._emit("skipped", count=missed)
+            next_ = self._skip_runs(next_, missed)
+
+        self._next_run = next_
 
     def _next_run_at(self):
+        if self._periodic_unit == "after":
+            # Next run is set by triggers.
+            return
         if self._next_run is None:
             self._set_next_run_init()
         else:
             self._set_next_run()
 
     def start(self):
-        """Start the Task's activity."""
-        if not self._periodic_unit:
-            raise OperationFailError("Please set period first.")
+        """Start the Task's activity.
+
+        Raises:
+            OperationFailError: Period is not set, or the task is already
+                started.
+        """
+        with self._state_lock:
+            if not self._periodic_unit:
+                raise OperationFailError("Please set period first.")
+            if self._start or self._stop_task:
+                # Thread can only be started once.
+                raise OperationFailError("Task is already started.")
 
-        self._start = True
+            self._start = True
+            self._paused = False
 
-        # Set start at by delay time
-        if self._delay:
-            self._start_at = datetime.now() + self._delay
+            # Set start at by delay time
+            if self._delay:
+                self._start_at = datetime.now() + self._delay
+
+        self._record("start")
+        self._emit("start")
 
         super().start()
 
     def stop(self):
         """Stop the Task's activity."""
-        if not self._start:
-            raise OperationFailError("Task is not running.")
+        with self._state_lock:
+            if not self._start:
+                raise OperationFailError("Task is not running.")
 
-        self._start = False
-        self._stop_task = True
+            self._start = False
+            self._stop_task = True
+            self._adhoc.clear()
+
+        self._record("stop")
 
     def pause(self):
         """Pause the Task's activity.
 
         Works only the task is registered into :class:`ScheduleManager`.
         """
-        if not self._start:
-            raise OperationFailError("Task is not running.")
-        if not self._manager:
-            raise OperationFailError("Register task into "
-                                     "ScheduleManager first.")
+        with self._state_lock:
+            if not self._start or self._stop_task:
+                raise OperationFailError("Task is not running.")
+            if not self._manager:
+                raise OperationFailError("Register task into "
+                                         "ScheduleManager first.")
 
-        self._start = False
-        self._stop_task = True
-        self._pause_task = True
+            self._start = False
+            self._pause_task = True
+            self._stop_task = True
+            self._adhoc.clear()
+
+        self._record("pause")
+
+    def run_now(self):
+        """Run the job once besides scheduled runs.
+
+        The run is dispatched at the next check of the task, even if the
+        task is waiting for its delay or `start_at` time, and the schedule
+        is not changed. Requested runs which are not dispatched yet are
+        dropped when the task is stopped or paused.
+
+        Returns:
+            datetime: Scheduled time of the run.
+
+        Raises:
+            OperationFailError: Task is not running.
+        """
+        with self._state_lock:
+            if not self._start or self._stop_task:
+                raise OperationFailError("Task is not running.")
+
+            scheduled = datetime.now()
+            self._adhoc.append(scheduled)
+
+        # Triggered task waits for the event.
+        self._trigger_event.set()
+
+        return scheduled
+
+    def _is_leader(self):
+        # Task runs jobs if its manager is the leader.
+        manager = self._manager
+        if isinstance(manager, ScheduleManager):
+            return manager.is_leader
+        return True
+
+    def _shed(self, time_now):
+        # Report lag of the due run, and check if it is shed.
+        manager = self._manager
+        if not isinstance(manager, ScheduleManager):
+            return False
+
+        # W0212: protected-access
+        # pylint: disable=W0212
+        policy = manager._shedding
+        if policy is None:
+            return False
+
+        if self._periodic_unit != "after":
+            # Triggered runs are late by upstream runs, not by the host.
+            change = policy.observe(
+                (time_now - self._next_run).total_seconds())
+            if change is not None:
+                self._emit(change, scheduled=self._next_run)
+
+        if not policy.active:
+            self._shed_seq = 0
+            return False
+
+        if (policy.min_priority is not None
+                and self._priority >= policy.min_priority):
+            shed = True
+        elif policy.tag in self._tag:
+            # Run once every `stretch` runs.
+            self._shed_seq += 1
+            shed = self._shed_seq % policy.stretch != 0
+        else:
+            shed = False
+
+        if shed:
+            self._count("shed")
+            self._emit("shed", scheduled=self._next_run)
+
+        return shed
+
+    def _claim_run(self):
+        # Claim the run scheduled at next run time.
+        manager = self._manager
+        if isinstance(manager, ScheduleManager):
+            # W0212: protected-access
+            # pylint: disable=W0212
+            return manager._claim(self, self._next_run)
+        return True
+
+    def _trigger(self, name, scheduled):
+        # Upstream task `name` succeeded.
+        with self._state_lock:
+            if not self._start or self._stop_task:
+                return
+
+            self._upstream_done.add(name)
+            if not self._upstream_done.issuperset(self._upstream):
+                return
+            self._upstream_done.clear()
+
+            if self._triggers and self._misfire_policy != "run_all":
+                self._count("coalesced", len(self._triggers))
+                self._triggers.clear()
+
+            self._triggers.append(scheduled)
+            self._trigger_event.set()
+
+    def _pop_trigger(self):
+        # Take the next run triggered by upstream tasks.
+        with self._state_lock:
+            if not self._triggers:
+                self._trigger_event.clear()
+                return False
+
+            self._next_run = self._triggers.popleft()
+            return True
+
+    def _trigger_downstream(self, scheduled):
+        # Trigger tasks running after this task.
+        manager = self._manager
+        if isinstance(manager, ScheduleManager):
+            # W0212: protected-access
+            # pylint: disable=W0212
+            manager._upstream_succeeded(self.name, scheduled)
+
+    def _tags_changed(self):
+        # Tag index of schedule manager is outdated.
+        manager = self._manager
+        if isinstance(manager, ScheduleManager):
+            manager._invalidate()    # pylint: disable=W0212
+
+    def _record(self, event):
+        # Record change of schedule state in schedule manager.
+        manager = self._manager
+        if isinstance(manager, ScheduleManager):
+            manager._record(event, self)    # pylint: disable=W0212
+
+    def _emit(self, event, **data):
+        # Emit task event in schedule manager.
+        manager = self._manager
+        if isinstance(manager, ScheduleManager):
+            manager._emit(event, self, **data)    # pylint: disable=W0212
+
+    def _dispatch(self, scheduled=None, attempt=1):
+        # Run the job once.
+        if attempt == 1:
+            # New run replaces pending retry of the previous one.
+            self._retry_run = None
+
+        run = _Run(scheduled or self._next_run, attempt)
+        if not self._admit(run) or not self._throttle(run):
+            return
+        self._in_flight.append(run)
+
+        kwargs = self._kwargs
+        if self._accept_token and self._executor != "process":
+            kwargs = dict(kwargs, cancel_token=run.token)
+        call = (self._target, self._args, kwargs)
+        if self._batch:
+            call = (self._call_batch, (run,), {})
+
+        if self._timeout is not None:
+            run.deadline = time.monotonic() + self._timeout.total_seconds()
+
+        if self._executor is None:
+            if self._timeout is None:
+                self._execute(run, *call)
+            else:
+                threading.Thread(target=self._execute,
+                                 args=(run,) + call,
+                                 daemon=True).start()
+                self._wait_run(run)
+        elif self._executor == "process":
+            self._execute_process(run, *call)
+        elif isinstance(self._executor, PriorityThreadPoolExecutor):
+            run.future = self._executor.submit_run(
+                self._priority, run.scheduled, self._execute, run, *call)
+        else:
+            run.future = self._executor.submit(self._execute, run, *call)
+
+        self._check_in_flight()
+
+    def _admit(self, run):
+        # Apply overflow policy if the run exceeds the instance limit.
+        if len(self._in_flight) < self._max_instances:
+            return True
+
+        if self._overflow_policy == "replace":
+            # Timed out runs are cancelled already.
+            for in_flight in self._in_flight:
+                if not in_flight.timed_out:
+                    self._replace(in_flight)
+                    return True
+
+        if self._overflow_policy == "queue_one" and self._queued_run is None:
+            self._count("queued")
+            self._queued_run = run
+        else:
+            self._count("overlapped")
+        return False
+
+    def _replace(self, run):
+        # Cancel the run for a newer one.
+        self._in_flight.remove(run)
+        run.token.cancel()
+        if run.future is not None:
+            run.future.cancel()
+
+        run.exception = CancelledError("Run of task <{}> is replaced."
+                                       .format(self.name))
+        self._count("replaced")
+        self._complete(run)
+
+    def _throttle(self, run):
+        # Wait for rate limits of the task tags. Returns False if the task
+        # is stopped while waiting.
+        manager = self._manager
+        if not isinstance(manager, ScheduleManager):
+            return True
+
+        wait, buckets = manager._reserve(self)    # pylint: disable=W0212
+        if wait <= 0:
+            return True
+
+        self._count("throttled")
+        started = time.monotonic()
+        deadline = started + wait
+        while not self._stop_task:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                run.throttled = timedelta(
+                    seconds=time.monotonic() - started)
+                return True
+
+            time.sleep(min(remaining, self.CHECK_INTERVAL))
+
+        # The run is abandoned, so its tokens are left to other runs.
+        for bucket in buckets:
+            bucket.refund()
+        return False
+
+    def _check_queued(self):
+        # Start the queued run once an instance is free.
+        run = self._queued_run
+        if run is None or len(self._in_flight) >= self._max_instances:
+            return
+
+        self._queued_run = None
+        self._dispatch(scheduled=run.scheduled, attempt=run.attempt)
+
+    def _call_batch(self, run):
+        # Call the job once for runs of batch tasks due at the same time.
+        manager = self._manager
+        if not isinstance(manager, ScheduleManager) or run.attempt > 1:
+            # Retry is not shared.
+            return self._target([self._args])
+
+        key = (self._target, run.scheduled.replace(microsecond=0))
+        # W0212: protected-access
+        # pylint: disable=W0212
+        batch, opened = manager._join_batch(key, self._target, self._args)
+
+        if opened:
+            # Wait for other batch tasks due at the same time only.
+            batch.full.wait(self.BATCH_WINDOW)
+            manager._close_batch(key)
+            batch.call()
+        else:
+            self._count("batched")
+            batch.done.wait()
+
+        if batch.exception is not None:
+            raise batch.exception
+        return batch.value
+
+    def _execute(self, run, job, args, kwargs):
+        run.started = datetime.now()
+        self._emit("run_started", scheduled=run.scheduled,
+                   attempt=run.attempt)
+        if run.deadline is None and self._timeout is not None:
+            run.deadline = time.monotonic() + self._timeout.total_seconds()
+
+        if self._profile_slower_than is not None:
+            _Profiler(self, run, threading.get_ident()).start()
+
+        try:
+            with self._trace(run) as context:
+                if self._accept_context:
+                    kwargs = dict(kwargs, trace_context=context)
+
+                try:
+                    run.value = job(*args, **kwargs)
+                except Exception as error:    # pylint: disable=W0703
+                    run.exception = error
+        finally:
+            run.finished = datetime.now()
+            run.done.set()
+
+    def _execute_process(self, run, job, args, kwargs):
+        run.started = datetime.now()
+        self._emit("run_started", scheduled=run.scheduled,
+                   attempt=run.attempt)
+
+        with self._trace(run) as context:
+            if self._accept_context:
+                kwargs = dict(kwargs, trace_context=context)
+
+            reader, writer = multiprocessing.Pipe(duplex=False)
+            run.process = multiprocessing.Process(
+                target=_process_job,
+                args=(writer, job, args, kwargs),
+                daemon=True)
+            run.process.start()
+            writer.close()
+
+            if run.deadline is None:
+                run.process.join()
+            else:
+                run.process.join(max(run.deadline - time.monotonic(), 0))
+
+            if run.process.is_alive():
+                self._expire(run)
+            else:
+                if reader.poll():
+                    status, payload = reader.recv()
+                    if status == "value":
+                        run.value = payload
+                    else:
+                        run.exception = payload
+
+                run.finished = datetime.now()
+                run.done.set()
+
+            reader.close()
+
+    def _trace(self, run):
+        # Span around the run if tracing is enabled.
+        manager = self._manager
+        if isinstance(manager, ScheduleManager):
+            # W0212: protected-access
+            # pylint: disable=W0212
+            tracer = manager._tracer
+            if tracer is not None:
+                return tracer.span(self, run)
+
+        return _NO_TRACE
+
+    def _wait_run(self, run):
+        # Wait until the run is finished or timed out.
+        if not run.done.wait(max(run.deadline - time.monotonic(), 0)):
+            self._expire(run)
+
+    def _expire(self, run):
+        # Mark the run as timed out and cancel it.
+        if run.timed_out:
+            return
+
+        run.timed_out = True
+        run.token.cancel()
+        self._count("timed_out")
+
+        if run.future is not None:
+            run.future.cancel()
+        if run.process is not None:
+            run.process.terminate()
+            run.process.join()
+
+            run.finished = datetime.now()
+            run.done.set()
+
+        self._complete(run)
+
+    def _finish_run(self, run):
+        # Action after the run is finished.
+        retrying = False
+
+        if run.exception is not None:
+            self._count("failed")
+            _logger.error("Job of task <%s> failed.", self.name,
+                          exc_info=run.exception)
+
+            retry = self._retry
+            if (retry is not None and not self._stop_task
+                    and retry.should_retry(run.attempt, run.exception)):
+                delay = retry.delay(run.attempt)
+                self._retry_run = (time.monotonic() + delay, run)
+                retrying = True
+
+        self._complete(run, resolve=not retrying)
+
+    def _complete(self, run, resolve=True):
+        # Keep result of the run and resolve futures waiting for it.
+        result = RunResult(run)
+        self._emit("run_succeeded" if result.succeeded else "run_failed",
+                   scheduled=run.scheduled, attempt=run.attempt,
+                   result=result)
+
+        if result.succeeded:
+            self._trigger_downstream(run.scheduled)
+
+        with self._results_lock:
+            self._results.append(result)
+
+            if not resolve:
+                return
+
+            futures, self._futures = self._futures, list()
+
+        for future in futures:
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            if result.timed_out:
+                future.set_exception(TimeoutError(
+                    "Run of task <{}> timed out.".format(self.name)))
+            elif result.exception is not None:
+                future.set_exception(result.exception)
+            else:
+                future.set_result(result.value)
+
+    def _release_futures(self):
+        # Futures are resolved by a run still in flight, or cancelled.
+        for run in self._in_flight:
+            if run.future is not None and not run.timed_out:
+                run.future.add_done_callback(
+                    lambda _, run=run: self._finish_run(run))
+                return
+
+        with self._results_lock:
+            futures, self._futures = self._futures, list()
+
+        for future in futures:
+            future.cancel()
+
+    def _check_retry(self):
+        # Run pending retry if it is due.
+        if self._retry_run is None:
+            return
+
+        due, run = self._retry_run
+        if time.monotonic() >= due:
+            self._retry_run = None
+            if not self._is_leader():
+                return
+
+            self._count("retried")
+            self._dispatch(scheduled=run.scheduled, attempt=run.attempt+1)
+
+    def _check_runs(self):
+        # Handle runs besides the scheduled run.
+        self._check_in_flight()
+        self._check_queued()
+        self._check_retry()
+        self._check_adhoc()
+
+    def _check_adhoc(self):
+        # Dispatch runs requested by run_now().
+        while self._adhoc:
+            scheduled = self._adhoc.popleft()
+            if self._is_leader():
+                self._dispatch(scheduled=scheduled)
+
+    def _check_in_flight(self):
+        # Forget finished runs and expire runs exceeding the time limit.
+        in_flight = list()
+
+        for run in self._in_flight:
+            if run.timed_out:
+                # Job of a timed out run may still hang in its thread. It
+                # counts against max_instances until it returns, so hung
+                # jobs do not pile up threads.
+                if not run.done.is_set() and not (
+                        run.future is not None and run.future.cancelled()):
+                    in_flight.append(run)
+                continue
+
+            if run.done.is_set():
+                self._finish_run(run)
+                continue
+
+            if run.deadline is not None and time.monotonic() >= run.deadline:
+                self._expire(run)
+                continue
+
+            in_flight.append(run)
+
+        self._in_flight = in_flight
 
     def _action_after_finish(self):
         # Remove task from manager
-        if self._manager:
-            # Keep ScheduleManager instance
-            manager = self._manager
+        manager = self._manager
+        if not isinstance(manager, ScheduleManager):
+            return
+
+        # Other threads must not see the paused task missing, or take its
+        # name before it is registered again.
+        # W0212: protected-access
+        # pylint: disable=W0212
+        with manager._lock:
+            if manager._tasks.get(self.name) is not self:
+                # Unregistered by another thread.
+                return
+
             manager.unregister(self.name)
 
             if self._pause_task:
-                # Thread-based object can only be started once.
-                # So create new task with same action and register task after
-                # delete.
-                # current task to realize pause action.
-
-                kwargs = None if self._kwargs == {} else self._kwargs
-
-                # New task
-                new_task = manager.register_task(name=self.name,
-                                                 job=self._target,
-                                                 args=self._args,
-                                                 kwargs=kwargs)
-                new_task.set_tags(self.tag)
-
-                # schedule task
-                if self._periodic_unit == "every":
-                    new_task.period(self._periodic)
-                else:
-                    ref_week = {
-                        0: "Monday",
-                        1: "Tuesday",
-                        2: "Wednesday",
-                        3: "Thursday",
-                        4: "Friday",
-                        5: "Saturday",
-                        6: "Sunday",
-                        None: None
-                    }
-
-                    time_str = "{}:{}:{}".format(str(self._at_time[0]),
-                                                 str(self._at_time[1]),
-                                                 str(self._at_time[2]))
-                    new_task.period_at(unit=self._periodic_unit,
-                                       at_time=time_str,
-                                       week_day=ref_week[self._at_week_day],
-                                       day=self._at_day)
-
-                if not self._is_periodic:
-                    new_task.nonperiodic(self._nonperiod_count)
-
-                if self._delay:
-                    new_task.delay(self._start_at - datetime.now())
-                elif self._start_at:
-                    if datetime.now() < self._start_at:
-                        new_task.start_at(self._start_at)
+                self._register_again(manager)
+
+    def _register_again(self, manager):
+        # Thread-based object can only be started once.
+        # So create new task with same action and register task after
+        # delete current task to realize pause action.
+        kwargs = None if self._kwargs == {} else self._kwargs
+
+        # New task
+        new_task = manager.register_task(
+            name=self.name,
+            job=self._target,
+            args=self._args,
+            kwargs=kwargs,
+            daemon=self._daemonic,
+            misfire_policy=self.misfire_policy,
+            misfire_grace_time=self._misfire_grace_time,
+            timeout=self._timeout,
+            executor=self._executor,
+            retry=self._retry,
+            keep_results=self._results.maxlen,
+            profile_slower_than=self._profile_slower_than,
+            precise=self._precise,
+            batch=self._batch,
+            max_instances=self._max_instances,
+            overflow_policy=self._overflow_policy,
+            priority=self._priority)
+        new_task._paused = True
+        new_task.set_tags(self.tag)
+        new_task._stats.update(self._stats)
+        new_task._profile.update(self._profile)
+        new_task._results.extend(self._results)
+        new_task._futures.extend(self._futures)
+
+        # schedule task
+        if self._periodic_unit == "every":
+            new_task.period(self._periodic)
+        elif self._periodic_unit == "after":
+            new_task.after(*self._upstream)
+        else:
+            ref_week = {
+                0: "Monday",
+                1: "Tuesday",
+                2: "Wednesday",
+                3: "Thursday",
+                4: "Friday",
+                5: "Saturday",
+                6: "Sunday",
+                None: None
+            }
+
+            time_str = "{}:{}:{}".format(str(self._at_time[0]),
+                                         str(self._at_time[1]),
+                                         str(self._at_time[2]))
+            new_task.period_at(unit=self._periodic_unit,
+                               at_time=time_str,
+                               week_day=ref_week[self._at_week_day],
+                               day=self._at_day,
+                               tz=self._zone)
+
+        if not self._is_periodic:
+            # Run the last run again if its retry is pending.
+            new_task.nonperiodic(max(self._nonperiod_count, 1))
+
+        if self._delay:
+            new_task.delay(self._start_at - datetime.now())
+        elif self._start_at:
+            if datetime.now() < self._start_at:
+                new_task.start_at(self._start_at)
+
+    def _sleep(self):
+        # Sleep until the next check, or until next run time if it comes
+        # first.
+        interval = self.CHECK_INTERVAL
+        if self._periodic_unit == "after":
+            self._trigger_event.wait(interval)
+            return
+
+        next_run = self._next_run
+
+        remaining = (next_run - datetime.now()).total_seconds()
+        if remaining <= 0:
+            # Overdue run starts at once.
+            return
+        if remaining >= interval:
+            time.sleep(interval)
+        elif not self._precise:
+            time.sleep(remaining)
+        else:
+            # Sleep may wake up late, so spin for the last moment.
+            if remaining > self.PRECISE_SPIN:
+                time.sleep(remaining - self.PRECISE_SPIN)
+
+            while datetime.now() < next_run and not self._stop_task:
+                pass
 
     def run(self):
         """Representing the Task's activity.
@@ -1096,27 +2550,78 @@ class Task(threading.Thread):
             # Delay or start at.
             if self._start_at:
                 while not self._stop_task:
+                    # Runs requested by run_now() do not wait.
+                    self._check_runs()
                     if datetime.now() >= self._start_at:
                         break
 
                     time.sleep(self.CHECK_INTERVAL)
 
-            self._next_run_at()
+            if self._next_run is None:
+                self._set_next_run_init()
 
             while not self._stop_task:
+                self._check_runs()
+
+                if not self._is_periodic and self._nonperiod_count <= 0:
+                    # All runs are done. Wait for pending retry only.
+                    if self._retry_run is None:
+                        self._stop_task = True
+                        break
 
-                if datetime.now() >= self._next_run:
-                    self._target(*self._args, **self._kwargs)
+                    time.sleep(self.CHECK_INTERVAL)
+                    continue
+
+                time_now = datetime.now()
+                if self._periodic_unit == "after":
+                    due = self._pop_trigger()
+                else:
+                    due = time_now >= self._next_run
+
+                if due:
+                    if (self._misfire_policy == "skip"
+                            and self._is_misfired(time_now)):
+                        self._skip_misfired()
+                        self._sleep()
+                        continue
+
+                    if not self._is_leader():
+                        # Leader runs the job. Keep next run time updated to
+                        # take over at any time.
+                        self._count("standby")
+                    elif self._shed(time_now):
+                        # Scheduler is falling behind.
+                        pass
+                    elif not self._claim_run():
+                        # Another manager has done the run.
+                        self._count("deduplicated")
+                    else:
+                        self._dispatch()
                     self._next_run_at()
 
                     if not self._is_periodic:
                         self._nonperiod_count -= 1
-                        if self._nonperiod_count <= 0:
-                            self._stop_task = True
-                            break
 
-                time.sleep(self.CHECK_INTERVAL)
+                    self._record("run")
+
+                    if (not self._is_periodic
+                            and self._nonperiod_count <= 0
+                            and self._retry_run is None):
+                        self._stop_task = True
+                        break
+
+                self._sleep()
         finally:
+            with self._state_lock:
+                # Task can not be paused from now on.
+                self._stop_task = True
+
+            if self._pause_task:
+                self._emit("paused")
+            else:
+                self._release_futures()
+                self._emit("stopped")
+
             self._action_after_finish()
 
             # Avoid a refcycle if the thread is running a function with
@@ -1124,6 +2629,500 @@ class Task(threading.Thread):
             del self._target, self._args, self._kwargs
 
 
+class CancellationToken:
+    """Cancellation token of a job run.
+
+    A token is passed to the job if the job accepts a `cancel_token` keyword
+    argument. Long running jobs should check :attr:`cancelled` and return as
+    soon as possible after the run is cancelled.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def __repr__(self):
+        return "CancellationToken<({})>".format(self.cancelled)
+
+    @property
+    def cancelled(self):
+        """bool: Return True if the run is cancelled."""
+        return self._event.is_set()
+
+    def cancel(self):
+        """Cancel the run."""
+        self._event.set()
+
+    def wait(self, timeout=None):
+        """Wait until the run is cancelled.
+
+        Args:
+            timeout (float): Time to wait in seconds.
+                Defaults to None (wait forever).
+
+        Returns:
+            bool: True if the run is cancelled.
+        """
+        return self._event.wait(timeout)
+
+
+class RetryPolicy:
+    """Retry policy for failed runs.
+
+    Delay before the n-th retry is `base_delay * 2 ** (n - 1)`, limited by
+    `max_delay`. With `jitter`, a random delay between 0 and that value is
+    used instead, to avoid retries of many tasks happening at once.
+
+    Args:
+        max_attempts (int): Maximum number of attempts of a run, including
+            the first one.
+            Defaults to 3.
+        base_delay (Union[int, float]): Delay before the first retry in
+            seconds.
+            Defaults to 1.
+        max_delay (Union[int, float]): Maximum delay in seconds.
+            Defaults to 60.
+        jitter (bool): Set True to randomize the delay.
+            Defaults to True.
+        retry_on (tuple): Exception types to retry on.
+            Defaults to (Exception,).
+
+    Raises:
+        OperationFailError: Invalid argument.
+    """
+
+    def __init__(self, max_attempts=3, base_delay=1, max_delay=60,
+                 jitter=True, retry_on=(Exception,)):
+        # R0913: too-many-arguments
+        # pylint: disable=R0913
+        if max_attempts < 1:
+            raise OperationFailError("Number of attempts must be greater "
+                                     "than 0.")
+        if base_delay < 0 or max_delay < 0:
+            raise OperationFailError("Delay must not be negative.")
+
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.retry_on = tuple(retry_on)
+
+    def __repr__(self):
+        return ("RetryPolicy<("
+                "Attempts: {a}, Delay: {b}~{m}, Jitter: {j}"
+                ")>").format(a=self.max_attempts,
+                             b=self.base_delay,
+                             m=self.max_delay,
+                             j=self.jitter)
+
+    def should_retry(self, attempt, error):
+        """Check if a failed attempt should be retried.
+
+        Args:
+            attempt (int): Number of the failed attempt, starting from 1.
+            error (Exception): Exception raised by the job.
+
+        Returns:
+            bool: True if the run should be retried.
+        """
+        return attempt < self.max_attempts and isinstance(error,
+                                                          self.retry_on)
+
+    def delay(self, attempt):
+        """Delay before retrying a failed attempt.
+
+        Args:
+            attempt (int): Number of the failed attempt, starting from 1.
+
+        Returns:
+            float: Delay in seconds.
+        """
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+
+        if self.jitter:
+            delay = random.uniform(0, delay)
+
+        return delay
+
+
+class LoadSheddingPolicy:
+    """Load shedding policy of a schedule manager.
+
+    Lag of a run is the time between its scheduled time and the time its
+    task finds it due. The manager keeps a moving average of the lag of all
+    runs. Shedding starts once the average exceeds `lag_threshold`, and
+    stops once it falls below `recover_threshold`.
+
+    While shedding:
+
+    * Tasks having `tag` run once every `stretch` runs, as if their period
+      is `stretch` times longer.
+    * Runs of tasks whose priority is `min_priority` or lower (a greater
+      number) are skipped.
+
+    Every shed run is counted in :attr:`Task.stats` and emits a `shed`
+    event.
+
+    Args:
+        lag_threshold (Union[int, float]): Average lag to start shedding in
+            seconds.
+            Defaults to 1.
+        recover_threshold (Union[int, float]): Average lag to stop shedding
+            in seconds.
+            Defaults to half of `lag_threshold`.
+        tag (obj): Tag of tasks which can be stretched.
+            Defaults to "sheddable".
+        stretch (int): Factor of periods of stretched tasks.
+            Defaults to 2.
+        min_priority (int): Priority of tasks which are skipped.
+            Defaults to None (no task is skipped).
+        smoothing (float): Weight of the latest lag in the moving average,
+            between 0 and 1.
+            Defaults to 0.2.
+
+    Raises:
+        OperationFailError: Invalid argument.
+    """
+
+    def __init__(self, lag_threshold=1, recover_threshold=None,
+                 tag="sheddable", stretch=2, min_priority=None,
+                 smoothing=0.2):
+        # R0913: too-many-arguments
+        # pylint: disable=R0913
+        if recover_threshold is None:
+            recover_threshold = lag_threshold / 2
+        if not 0 <= recover_threshold <= lag_threshold:
+            raise OperationFailError("Recover threshold must be between 0 "
+                                     "and lag threshold.")
+        if stretch < 1:
+            raise OperationFailError("Stretch must be greater than 0.")
+        if not 0 < smoothing <= 1:
+            raise OperationFailError("Smoothing must be between 0 and 1.")
+
+        self.lag_threshold = lag_threshold
+        self.recover_threshold = recover_threshold
+        self.tag = tag
+        self.stretch = stretch
+        self.min_priority = min_priority
+        self.smoothing = smoothing
+
+        self._lag = 0.0
+        self._active = False
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return "LoadSheddingPolicy<(Lag: {:.3f}, Active: {})>".format(
+            self._lag, self._active)
+
+    @property
+    def lag(self):
+        """float: Moving average of the lag in seconds."""
+        return self._lag
+
+    @property
+    def active(self):
+        """bool: Return True if runs are shed."""
+        return self._active
+
+    def observe(self, lag):
+        """Add the lag of a run to the moving average.
+
+        Called by :class:`Task`.
+
+        Args:
+            lag (float): Lag of the run in seconds.
+
+        Returns:
+            str: `shedding_started` or `shedding_stopped` if shedding is
+            started or stopped by the run, otherwise None.
+        """
+        with self._lock:
+            self._lag += self.smoothing * (max(lag, 0) - self._lag)
+
+            if not self._active and self._lag > self.lag_threshold:
+                self._active = True
+                _logger.warning("Start shedding load, lag is %.3f seconds.",
+                                self._lag)
+                return "shedding_started"
+            if self._active and self._lag < self.recover_threshold:
+                self._active = False
+                _logger.warning("Stop shedding load, lag is %.3f seconds.",
+                                self._lag)
+                return "shedding_stopped"
+
+        return None
+
+
+class _NoTrace:
+    """Context manager used when tracing is disabled.
+
+    Same as `contextlib.nullcontext`, which is not available before
+    Python 3.7.
+    """
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NO_TRACE = _NoTrace()
+
+
+class _Run:
+    """A run of the job."""
+
+    def __init__(self, scheduled, attempt=1):
+        self.scheduled = scheduled    # datetime when the run is scheduled
+        self.attempt = attempt    # Attempt number of the run
+        self.started = None
+        self.finished = None
+        self.deadline = None    # time.monotonic() deadline of the run
+        self.throttled = timedelta(0)    # Time waiting for rate limits
+        self.token = CancellationToken()
+        self.value = None
+        self.exception = None
+        self.timed_out = False
+        self.done = threading.Event()
+        self.future = None    # Future if run by an executor
+        self.process = None    # Process if run in a process
+
+
+class RunResult:
+    """Result of a run of the job.
+
+    Attributes:
+        scheduled (datetime): Datetime when the run is scheduled.
+        attempt (int): Attempt number of the run, starting from 1.
+        started (datetime): Datetime when the job is started. None if the
+            job is not started.
+        finished (datetime): Datetime when the job is finished or timed out.
+        value (obj): Return value of the job.
+        exception (Exception): Exception raised by the job. None if the job
+            returns.
+        timed_out (bool): True if the run exceeds the time limit.
+        throttled (timedelta): Time the run is delayed by rate limits. It
+            is part of the time between `scheduled` and `started`.
+    """
+
+    def __init__(self, run):
+        self.scheduled = run.scheduled
+        self.attempt = run.attempt
+        self.started = run.started
+        self.finished = run.finished or datetime.now()
+        self.value = run.value
+        self.exception = run.exception
+        self.timed_out = run.timed_out
+        self.throttled = run.throttled
+
+    def __repr__(self):
+        if self.timed_out:
+            status = "timed out"
+        elif self.exception is not None:
+            status = "failed"
+        else:
+            status = "succeeded"
+
+        return "RunResult<({}, {})>".format(
+            self.scheduled.strftime("%y-%m-%d %H:%M:%S"), status)
+
+    @property
+    def succeeded(self):
+        """bool: Return True if the job returns in time."""
+        return not self.timed_out and self.exception is None
+
+    @property
+    def duration(self):
+        """timedelta: Time spent on the run. None if the job is not
+        started."""
+        if self.started is None:
+            return None
+        return self.finished - self.started
+
+
+class _TokenBucket:
+    """Token bucket limiting the rate of runs."""
+
+    def __init__(self, rate, burst):
+        self.rate = rate    # Tokens gained every second
+        self.burst = burst    # Maximum number of tokens
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """Take a token, which may be gained in the future.
+
+        Returns:
+            float: Seconds to wait for the token.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens
+                               + (now - self._updated) * self.rate)
+            self._updated = now
+
+            # Tokens go negative, so waiting runs are served in order.
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0
+            return -self._tokens / self.rate
+
+    def refund(self):
+        """Give back a token of a run which is not started."""
+        with self._lock:
+            self._tokens = min(self.burst, self._tokens + 1)
+
+
+class _Batch:
+    """Runs of batch tasks collapsed into a single call of the job."""
+
+    def __init__(self, job, size):
+        self.job = job
+        self.size = size    # Number of runs expected to join
+        self.args = list()    # `args` of every run
+        self.value = None
+        self.exception = None
+        self.full = threading.Event()
+        self.done = threading.Event()
+
+    def join(self, args):
+        """Add arguments of a run."""
+        self.args.append(args)
+        if len(self.args) >= self.size:
+            self.full.set()
+
+    def call(self):
+        """Call the job with arguments of all runs."""
+        try:
+            self.value = self.job(self.args)
+        except Exception as error:    # pylint: disable=W0703
+            self.exception = error
+        finally:
+            self.done.set()
+
+
+class _Profiler(threading.Thread):
+    """Sample stacks of a run exceeding the profiling threshold."""
+
+    def __init__(self, task, run, ident):
+        super().__init__(name="Profiler-{}".format(task.name), daemon=True)
+        self._task = task
+        self._run = run
+        self._job_ident = ident    # Thread running the job
+
+    def run(self):
+        task = self._task
+        # W0212: protected-access
+        # pylint: disable=W0212
+        threshold = task._profile_slower_than.total_seconds()
+        if self._run.done.wait(threshold):
+            return
+
+        task._count("profiled")
+
+        while True:
+            frame = sys._current_frames().get(self._job_ident)
+            if frame is None:
+                break
+
+            stack = _collapse_stack(frame)
+            del frame
+            if stack:
+                task._add_sample(stack)
+
+            if self._run.done.wait(task.PROFILE_INTERVAL):
+                break
+
+
+def _collapse_stack(frame):
+    # Frames called by the job runner, from the outermost one.
+    frames = list()
+
+    while frame is not None and frame.f_code is not _EXECUTE_CODE:
+        code = frame.f_code
+        frames.append("{}:{}".format(code.co_filename, code.co_name))
+        frame = frame.f_back
+
+    return ";".join(reversed(frames))
+
+
+def _accept_keyword(func, name):
+    # Returns True if `func` accepts keyword argument `name`.
+    try:
+        parameters = inspect.signature(func).parameters
+    except (TypeError, ValueError):
+        return False
+
+    kinds = (inspect.Parameter.POSITIONAL_OR_KEYWORD,
+             inspect.Parameter.KEYWORD_ONLY)
+
+    return name in parameters and parameters[name].kind in kinds
+
+
+def _process_job(writer, job, args, kwargs):
+    # Entry point of a job running in a process.
+    try:
+        writer.send(("value", job(*args, **kwargs)))
+    except Exception as error:    # pylint: disable=W0703
+        writer.send(("exception", error))
+    finally:
+        writer.close()
+
+
+_EXECUTE_CODE = Task._execute.__code__
+
+
+class _Snapshot:
+    """Read-only view of tasks registered in a schedule manager."""
+
+    __slots__ = ("tasks", "names", "_by_name", "_by_tag", "_downstream")
+
+    def __init__(self, tasks):
+        self.tasks = tuple(tasks)
+        self.names = tuple(task.name for task in self.tasks)
+        self._by_name = dict(zip(self.names, self.tasks))
+
+        by_tag = dict()
+        for task in self.tasks:
+            for tag in task.tag:
+                try:
+                    by_tag.setdefault(tag, list()).append(task)
+                except TypeError:
+                    # Unhashable tag is found by scanning.
+                    pass
+
+        # Tag -> tasks
+        self._by_tag = {tag: tuple(tasks) for tag, tasks in by_tag.items()}
+
+        # Name -> tasks running after it
+        downstream = dict()
+        for task in self.tasks:
+            for name in task.upstream:
+                downstream.setdefault(name, list()).append(task)
+        self._downstream = {name: tuple(tasks)
+                            for name, tasks in downstream.items()}
+
+    def tagged(self, tag):
+        """Tasks having the tag."""
+        try:
+            return self._by_tag.get(tag, ())
+        except TypeError:
+            return tuple(task for task in self.tasks if tag in task.tag)
+
+    def downstream(self, name):
+        """Tasks running after the task."""
+        return self._downstream.get(name, ())
+
+    def get(self, name):
+        """Task of the name. None if it is not registered."""
+        return self._by_name.get(name)
+
+    def tags(self):
+        """Hashable tags of tasks, and tasks having them."""
+        return dict(self._by_tag)
+
+
 class TaskGroup:
     """Task group.
 
@@ -1141,7 +3140,10 @@ class TaskGroup:
         else:
             self._tasks = list()
 
-            if isinstance(tasks, list):
+            if isinstance(tasks, tuple):
+                # Immutable, so it is shared instead of copied.
+                self._tasks = tasks
+            elif isinstance(tasks, list):
                 self._tasks = tasks[:]
             else:
                 for task in tasks:
@@ -1162,7 +3164,7 @@ class TaskGroup:
 
     def __add__(self, other):
         if isinstance(other, TaskGroup):
-            task_list = self._tasks + other._tasks
+            task_list = list(self._tasks) + list(other._tasks)
             return TaskGroup(task_list)
         return NotImplemented
 
@@ -1278,9 +3280,9 @@ class TaskGroup:
         """Delay task start time.
 
         Args:
-            interval (Union[str, timedelta, int]): Time interval.
-                A string with format `HH:MM:SS` or :obj:`timedelta` or int in
-                seconds.
+            interval (Union[str, timedelta, int, float]): Time interval.
+                A string with format `HH:MM:SS` or :obj:`timedelta` or a
+                number in seconds.
                 Or set None to cancel task delay time.
                 Defaults to None.
 
@@ -1319,6 +3321,27 @@ class TaskGroup:
 
         return self
 
+    def after(self, *tasks):
+        """Run tasks after other tasks succeed.
+
+        See :meth:`Task.after` for detail.
+
+        Args:
+            *tasks (Union[Task, TaskGroup, str]): Upstream tasks or their
+                names.
+
+        Returns:
+            TaskGroup: Invoked TaskGroup instance.
+
+        Raises:
+            OperationFailError: No upstream task is given, or the dependency
+                makes a cycle.
+        """
+        for task in self._tasks:
+            task.after(*tasks)
+
+        return self
+
     def nonperiodic(self, count):
         """See as non-periodic tasks.
 
@@ -1348,9 +3371,9 @@ class TaskGroup:
         """Scheduling periodic tasks.
 
         Args:
-            interval (Union[str, timedelta, int]): Time interval.
-                A string with format `HH:MM:SS` or :obj:`timedelta` or int
-                in seconds.
+            interval (Union[str, timedelta, int, float]): Time interval.
+                A string with format `HH:MM:SS` or :obj:`timedelta` or a
+                number in seconds.
 
         Returns:
             TaskGroup: Invoked TaskGroup instance.
@@ -1365,7 +3388,7 @@ class TaskGroup:
 
     def period_at(self,
                   unit="day", at_time="00:00:00",
-                  week_day="Monday", day=1):
+                  week_day="Monday", day=1, tz=None):
         """Scheduling periodic tasks.
 
         Specify a particular time that the job should be run at.
@@ -1391,6 +3414,9 @@ class TaskGroup:
                 This argument will only be used is unit is `month`.
                 Value should be in 1 ~ 31.
                 Job will be skipped if specific date is not available.
+            tz (Union[str, datetime.tzinfo]): Time zone of `at_time`.
+                See :meth:`Task.period_at` for detail.
+                Defaults to None (local time).
 
         Returns:
             TaskGroup: Invoked TaskGroup instance.
@@ -1402,11 +3428,12 @@ class TaskGroup:
             task.period_at(unit=unit,
                            at_time=at_time,
                            week_day=week_day,
-                           day=day)
+                           day=day,
+                           tz=tz)
 
         return self
 
-    def period_day_at(self, at_time="00:00:00"):
+    def period_day_at(self, at_time="00:00:00", tz=None):
         """Scheduling periodic tasks.
 
         Specify a particular time that the job should be run at.
@@ -1417,6 +3444,9 @@ class TaskGroup:
                 A string with format `HH:MM:SS`.
                 Defaults to `00:00:00`.
             week_day (str): Week to do the job.
+            tz (Union[str, datetime.tzinfo]): Time zone of `at_time`.
+                See :meth:`Task.period_at` for detail.
+                Defaults to None (local time).
 
         Returns:
             TaskGroup: Invoked TaskGroup instance.
@@ -1425,11 +3455,12 @@ class TaskGroup:
             TimeFormatError: Invalid time format.
         """
         for task in self._tasks:
-            task.period_day_at(at_time=at_time)
+            task.period_day_at(at_time=at_time, tz=tz)
 
         return self
 
-    def period_week_at(self, at_time="00:00:00", week_day="Monday"):
+    def period_week_at(self, at_time="00:00:00", week_day="Monday",
+                       tz=None):
         """Scheduling periodic tasks.
 
         Specify a particular time that the job should be run at.
@@ -1444,6 +3475,9 @@ class TaskGroup:
                 A string should be one of following value:
                 [`"Monday"`, `"Tuesday"`, `"Wednesday"`, `"Thursday"`,
                 `"Friday"`, `"Saturday"`, `"Sunday"`]
+            tz (Union[str, datetime.tzinfo]): Time zone of `at_time`.
+                See :meth:`Task.period_at` for detail.
+                Defaults to None (local time).
 
         Returns:
             TaskGroup: Invoked TaskGroup instance.
@@ -1452,11 +3486,11 @@ class TaskGroup:
             TimeFormatError: Invalid time format.
         """
         for task in self._tasks:
-            task.period_week_at(at_time=at_time, week_day=week_day)
+            task.period_week_at(at_time=at_time, week_day=week_day, tz=tz)
 
         return self
 
-    def period_month_at(self, at_time="00:00:00", day=1):
+    def period_month_at(self, at_time="00:00:00", day=1, tz=None):
         """Scheduling periodic tasks.
 
         Specify a particular time that the job should be run at.
@@ -1470,6 +3504,9 @@ class TaskGroup:
                 Defaults to 1.
                 Value should be in 1 ~ 31.
                 Job will be skipped if specific date is not available.
+            tz (Union[str, datetime.tzinfo]): Time zone of `at_time`.
+                See :meth:`Task.period_at` for detail.
+                Defaults to None (local time).
 
         Returns:
             TaskGroup: Invoked TaskGroup instance.
@@ -1478,7 +3515,7 @@ class TaskGroup:
             TimeFormatError: Invalid time format.
         """
         for task in self._tasks:
-            task.period_month_at(at_time=at_time, day=day)
+            task.period_month_at(at_time=at_time, day=day, tz=tz)
 
         return self
 
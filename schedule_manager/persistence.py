@@ -0,0 +1,702 @@
+"""
+Schedule state persistence module.
+"""
+import importlib
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+from .exceptions import OperationFailError
+from .manager import Task, RetryPolicy
+
+
+_DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%S.%f"
+
+_WEEK_DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday",
+              "Friday", "Saturday", "Sunday"]
+
+
+def _dump_datetime(value):
+    if value is None:
+        return None
+    return value.strftime(_DATETIME_FORMAT)
+
+
+def _load_datetime(value):
+    if value is None:
+        return None
+    return datetime.strptime(value, _DATETIME_FORMAT)
+
+
+def _dump_timedelta(value):
+    if value is None:
+        return None
+    return value.total_seconds()
+
+
+def _load_timedelta(value):
+    if value is None:
+        return None
+    return timedelta(seconds=value)
+
+
+def _resolve_path(path):
+    # Import object by dotted path. e.g. `package.module.Class.method`
+    parts = path.split(".")
+
+    for index in range(len(parts) - 1, 0, -1):
+        try:
+            obj = importlib.import_module(".".join(parts[:index]))
+        except ImportError:
+            continue
+
+        try:
+            for attr in parts[index:]:
+                obj = getattr(obj, attr)
+        except AttributeError:
+            break
+
+        return obj
+
+    raise OperationFailError("Can not import <{}>.".format(path))
+
+
+def _object_path(obj):
+    # Importable dotted path of a function or a class.
+    module = getattr(obj, "__module__", None)
+    qualname = getattr(obj, "__qualname__", None)
+
+    if module and qualname and "<" not in qualname:
+        path = "{}.{}".format(module, qualname)
+        try:
+            if _resolve_path(path) is obj:
+                return path
+        except OperationFailError:
+            pass
+
+    raise OperationFailError("<{!r}> is not importable by dotted path."
+                             .format(obj))
+
+
+def _dump_task(task):
+    # Task definition and state. Used by stores.
+    # W0212: protected-access
+    # pylint: disable=W0212
+    retry = task._retry
+    if retry is not None:
+        retry = {
+            "max_attempts": retry.max_attempts,
+            "base_delay": retry.base_delay,
+            "max_delay": retry.max_delay,
+            "jitter": retry.jitter,
+            "retry_on": [_object_path(error) for error in retry.retry_on],
+        }
+
+    return {
+        "name": task.name,
+        "job": _object_path(task._target),
+        "args": list(task._args),
+        "kwargs": task._kwargs,
+        "daemon": task.daemon,
+        "tags": task.tag,
+        "unit": task._periodic_unit,
+        "period": _dump_timedelta(task._periodic),
+        "at_time": task._at_time,
+        "week_day": task._at_week_day,
+        "day": task._at_day,
+        "tz": getattr(task.tz, "key", None),
+        "periodic": task._is_periodic,
+        "count": task._nonperiod_count,
+        "delay": _dump_timedelta(task._delay),
+        "start_at": _dump_datetime(task._start_at),
+        "misfire_policy": task.misfire_policy,
+        "misfire_grace_time": _dump_timedelta(task._misfire_grace_time),
+        "timeout": _dump_timedelta(task._timeout),
+        "executor": "process" if task._executor == "process" else None,
+        "retry": retry,
+        "keep_results": task._results.maxlen,
+        "profile_slower_than": _dump_timedelta(task._profile_slower_than),
+        "precise": task._precise,
+        "batch": task._batch,
+        "max_instances": task.max_instances,
+        "overflow_policy": task.overflow_policy,
+        "priority": task.priority,
+        "upstream": list(task.upstream),
+        "next_run": _dump_datetime(task._next_run),
+        "running": task.is_running,
+    }
+
+
+def _load_task(data):
+    # Create task from definition and state made by `_dump_task`.
+    # W0212: protected-access
+    # pylint: disable=W0212
+    retry = data["retry"]
+    if retry is not None:
+        retry_on = tuple(_resolve_path(path) for path in retry["retry_on"])
+        retry = RetryPolicy(max_attempts=retry["max_attempts"],
+                            base_delay=retry["base_delay"],
+                            max_delay=retry["max_delay"],
+                            jitter=retry["jitter"],
+                            retry_on=retry_on)
+
+    task = Task(job=_resolve_path(data["job"]),
+                name=data["name"],
+                args=tuple(data["args"]),
+                kwargs=data["kwargs"] or None,
+                daemon=data["daemon"],
+                misfire_policy=data["misfire_policy"],
+                misfire_grace_time=_load_timedelta(data["misfire_grace_time"]),
+                timeout=_load_timedelta(data["timeout"]),
+                executor=data["executor"],
+                retry=retry,
+                keep_results=data.get("keep_results", 10),
+                profile_slower_than=_load_timedelta(
+                    data.get("profile_slower_than")),
+                precise=data.get("precise", False),
+                batch=data.get("batch", False),
+                max_instances=data.get("max_instances", 1),
+                overflow_policy=data.get("overflow_policy", "skip"),
+                priority=data.get("priority", 0))
+    task.set_tags(data["tags"])
+
+    if data["unit"] == "every":
+        task.period(_load_timedelta(data["period"]))
+    elif data["unit"] == "after":
+        task.after(*data["upstream"])
+    elif data["unit"]:
+        week_day = data["week_day"]
+        task.period_at(unit=data["unit"],
+                       at_time="{}:{}:{}".format(*data["at_time"]),
+                       week_day=_WEEK_DAYS[week_day or 0],
+                       day=data["day"] or 1,
+                       tz=data.get("tz"))
+
+    if not data["periodic"]:
+        task.nonperiodic(data["count"])
+
+    next_run = _load_datetime(data["next_run"])
+    if next_run is None:
+        if data["delay"] is not None:
+            task.delay(_load_timedelta(data["delay"]))
+        elif data["start_at"] is not None:
+            task.start_at(_load_datetime(data["start_at"]))
+    else:
+        # Task keeps next run time when it is started.
+        task._next_run = next_run
+
+    return task
+
+
+class FileStateStore:
+    """Persist schedule state in local files.
+
+    State is saved as a snapshot file and an append-only journal file
+    (`<path>.journal`). Registering, unregistering, scheduling, starting,
+    stopping and pausing a task and every finished run are appended to the
+    journal. The journal is merged into a new snapshot after `compact_every`
+    records.
+
+    Use it by :class:`ScheduleManager(store=store) <ScheduleManager>`.
+    Saved tasks are restored into the manager by reading the snapshot and
+    replaying the journal once.
+
+    Jobs are saved by importable dotted path, and arguments and tags must be
+    JSON serializable. An executor instance is not saved, restored task runs
+    its job in the task thread.
+
+    Args:
+        path (str): Path of snapshot file.
+        fsync_every (int): Number of records written to the journal before
+            flushing them to disk by `os.fsync`.
+            Set 0 to leave it to the operating system.
+            Defaults to 1.
+        compact_every (int): Number of records written to the journal before
+            making a new snapshot.
+            Set 0 to make snapshots only by :meth:`compact`.
+            Defaults to 1000.
+    """
+
+    def __init__(self, path, fsync_every=1, compact_every=1000):
+        self._path = path
+        self._journal_path = path + ".journal"
+
+        self._fsync_every = fsync_every
+        self._compact_every = compact_every
+
+        self._lock = threading.RLock()
+        self._manager = None
+        self._journal = None    # Journal file object.
+        self._seq = 0    # Sequence number of the last record.
+        self._unsynced = 0    # Records not flushed to disk yet.
+        self._uncompacted = 0    # Records since the last snapshot.
+        self._restoring = False
+        self._closed = False
+
+    def __repr__(self):
+        return "FileStateStore<({})>".format(self._path)
+
+    def _read(self):
+        # Read snapshot and replay journal.
+        tasks = dict()
+        seq = 0
+
+        if os.path.exists(self._path):
+            with open(self._path, encoding="utf-8") as file:
+                snapshot = json.load(file)
+
+            seq = snapshot["seq"]
+            for data in snapshot["tasks"]:
+                tasks[data["name"]] = data
+
+        if os.path.exists(self._journal_path):
+            with open(self._journal_path, encoding="utf-8") as file:
+                for line in file:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # Incomplete record written when the process died.
+                        break
+
+                    # Skip records already merged into the snapshot.
+                    if record["seq"] <= seq:
+                        continue
+                    seq = record["seq"]
+
+                    event = record["event"]
+                    if event in ("register", "update", "start", "pause"):
+                        tasks[record["task"]["name"]] = record["task"]
+                    elif event == "run":
+                        if record["name"] in tasks:
+                            data = tasks[record["name"]]
+                            data["next_run"] = record["next_run"]
+                            data["count"] = record["count"]
+                    else:
+                        tasks.pop(record["name"], None)
+
+        return tasks, seq
+
+    def restore(self, manager):
+        """Restore saved tasks into schedule manager.
+
+        Called by :class:`ScheduleManager` constructor.
+
+        Args:
+            manager (ScheduleManager): Schedule manager.
+        """
+        # W0212: protected-access
+        # pylint: disable=W0212
+        with manager._lock, self._lock:
+            tasks, self._seq = self._read()
+            self._manager = manager
+
+            self._restoring = True
+            try:
+                for data in tasks.values():
+                    if not data["periodic"] and data["count"] <= 0:
+                        # All runs are done.
+                        continue
+
+                    task = manager.register(_load_task(data))
+                    if data["running"]:
+                        task.start()
+            finally:
+                self._restoring = False
+
+            self.compact()
+
+    def record(self, event, task):
+        """Append a change of schedule state to the journal.
+
+        Called by :class:`ScheduleManager` and :class:`Task`.
+
+        Args:
+            event (str): Event name.
+                One of [`register`, `unregister`, `update`, `start`, `stop`,
+                `pause`, `run`].
+            task (Task): Task.
+
+        Raises:
+            OperationFailError: Task can not be saved.
+        """
+        # W0212: protected-access
+        # pylint: disable=W0212
+        if self._restoring or self._closed:
+            return
+
+        if event in ("register", "update", "start", "pause"):
+            record = {"event": event, "task": _dump_task(task)}
+        elif event == "run":
+            record = {"event": event,
+                      "name": task.name,
+                      "next_run": _dump_datetime(task._next_run),
+                      "count": task._nonperiod_count}
+        else:
+            record = {"event": event, "name": task.name}
+
+        with self._lock:
+            if self._closed or self._journal is None:
+                return
+
+            self._seq += 1
+            record["seq"] = self._seq
+
+            try:
+                line = json.dumps(record, separators=(",", ":"))
+            except TypeError as error:
+                self._seq -= 1
+                raise OperationFailError("Task <{}> can not be saved. {}"
+                                         .format(task.name, error))
+
+            self._journal.write(line + "\n")
+            self._journal.flush()
+
+            self._unsynced += 1
+            if self._fsync_every and self._unsynced >= self._fsync_every:
+                self._sync()
+
+            self._uncompacted += 1
+            compact = self._compact_every and (self._uncompacted
+                                               >= self._compact_every)
+
+        if compact:
+            # Outside the lock of the store, see compact().
+            self.compact()
+
+    def _sync(self):
+        os.fsync(self._journal.fileno())
+        self._unsynced = 0
+
+    def flush(self):
+        """Flush records to disk."""
+        with self._lock:
+            if self._journal is not None and not self._journal.closed:
+                self._sync()
+
+    def compact(self):
+        """Make a new snapshot and clear the journal."""
+        # W0212: protected-access
+        # pylint: disable=W0212
+        manager = self._manager
+        if manager is None:
+            return
+
+        # The manager records changes while holding its lock, so its lock
+        # is always taken before the lock of the store.
+        with manager._lock, self._lock:
+            if self._closed:
+                return
+
+            tasks = [_dump_task(task) for task in list(manager.all_tasks)]
+            snapshot = {"seq": self._seq, "tasks": tasks}
+
+            tmp_path = self._path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                json.dump(snapshot, file, separators=(",", ":"))
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(tmp_path, self._path)
+
+            # Records in the journal are merged into the snapshot.
+            if self._journal is not None:
+                self._journal.close()
+            self._journal = open(self._journal_path, "w", encoding="utf-8")
+
+            self._unsynced = 0
+            self._uncompacted = 0
+
+    def close(self):
+        """Flush records to disk and stop recording."""
+        with self._lock:
+            if self._closed:
+                return
+
+            self._closed = True
+
+            if self._journal is not None and not self._journal.closed:
+                self._sync()
+                self._journal.close()
+
+
+class SQLiteJobStore:
+    """Keep task definitions and next run times in a SQLite database.
+
+    Tasks added by :meth:`add` are saved in an indexed table instead of the
+    schedule manager. Only tasks which are due within `window` are loaded
+    into the manager and started. A loaded task is unloaded again after its
+    next run time moves beyond the window, so the memory used by the manager
+    is bounded by the look-ahead window instead of the number of tasks.
+
+    Use it by :class:`ScheduleManager(store=store) <ScheduleManager>`.
+    Tasks registered into the manager directly are saved as well.
+
+    Jobs are saved by importable dotted path, and arguments and tags must be
+    JSON serializable. An executor instance is not saved, loaded task runs
+    its job in the task thread.
+
+    Args:
+        path (str): Path of database file.
+        window (Union[timedelta, int, float]): Look-ahead window.
+            A :obj:`timedelta` or a number in seconds.
+            Defaults to 60 seconds.
+        interval (Union[int, float]): Time between two loads in seconds.
+            Defaults to 1.
+    """
+
+    def __init__(self, path, window=60, interval=1):
+        if not isinstance(window, timedelta):
+            window = timedelta(seconds=window)
+
+        self._window = window
+        self._interval = interval
+
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS tasks ("
+                         "name TEXT PRIMARY KEY, "
+                         "due TEXT NOT NULL, "
+                         "running INTEGER NOT NULL, "
+                         "next_run TEXT, "
+                         "count INTEGER NOT NULL, "
+                         "data TEXT NOT NULL)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS tasks_due "
+                         "ON tasks (running, due)")
+        self._db.commit()
+
+        self._manager = None
+        self._loaded = set()    # Name of tasks loaded into the manager.
+        self._unloading = set()    # Name of tasks being unloaded.
+        self._loader = None
+        self._closed = threading.Event()
+
+    def __repr__(self):
+        return "SQLiteJobStore<(Tasks: {c}, Loaded: {l})>".format(
+            c=self.count, l=len(self._loaded))
+
+    @property
+    def count(self):
+        """int: Number of tasks saved in the store."""
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+
+    def _save(self, task, running):
+        # W0212: protected-access
+        # pylint: disable=W0212
+        data = _dump_task(task)
+        data["running"] = running
+
+        # Time when the task should be loaded.
+        due = task._next_run or task._start_at or datetime.now()
+        if task._next_run is None and task._delay:
+            due = datetime.now() + task._delay
+
+        try:
+            text = json.dumps(data, separators=(",", ":"))
+        except TypeError as error:
+            raise OperationFailError("Task <{}> can not be saved. {}"
+                                     .format(task.name, error))
+
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO tasks "
+                             "VALUES (?, ?, ?, ?, ?, ?)",
+                             (task.name, _dump_datetime(due), int(running),
+                              data["next_run"], data["count"], text))
+            self._db.commit()
+
+    def add(self, task):
+        """Add a task into the store.
+
+        The task is loaded into the schedule manager and started when it is
+        due within the look-ahead window. Schedule the task before adding it.
+
+        Args:
+            task (Task): Task which is not registered and not running.
+
+        Returns:
+            Task: Added task instance.
+
+        Raises:
+            OperationFailError: Task can not be saved, or it runs after
+                other tasks.
+        """
+        # W0212: protected-access
+        # pylint: disable=W0212
+        if task.is_running or task.manager is not None:
+            raise OperationFailError("Task is already running or "
+                                     "registered.")
+        if not task._periodic_unit:
+            raise OperationFailError("Please set period first.")
+        if task._periodic_unit == "after":
+            raise OperationFailError("Task running after other tasks can "
+                                     "not be added.")
+
+        if task._delay:
+            # Delay is counted from now.
+            task.start_at(datetime.now() + task._delay)
+        if task._start_at is None:
+            task._set_next_run_init()
+
+        self._save(task, running=True)
+
+        return task
+
+    def remove(self, name):
+        """Remove a task from the store.
+
+        The task is stopped if it is loaded into the schedule manager.
+
+        Args:
+            name (str): Task name.
+        """
+        with self._lock:
+            self._db.execute("DELETE FROM tasks WHERE name = ?", (name,))
+            self._db.commit()
+
+            loaded = name in self._loaded
+
+        if loaded and self._manager is not None and name in self._manager:
+            task = self._manager.task(name)
+            if task.is_running:
+                task.stop()
+
+    def restore(self, manager):
+        """Start loading due tasks into schedule manager.
+
+        Called by :class:`ScheduleManager` constructor.
+
+        Args:
+            manager (ScheduleManager): Schedule manager.
+        """
+        self._manager = manager
+
+        self._loader = threading.Thread(target=self._load_loop,
+                                        name="SQLiteJobStore-loader",
+                                        daemon=True)
+        self._loader.start()
+
+    def _load_loop(self):
+        while not self._closed.is_set():
+            self.load()
+            self._closed.wait(self._interval)
+
+    def load(self):
+        """Load tasks due within the look-ahead window.
+
+        Called periodically after the store is used by a schedule manager.
+
+        Returns:
+            int: Number of loaded tasks.
+        """
+        # W0212: protected-access
+        # pylint: disable=W0212
+        manager = self._manager
+        if manager is None:
+            return 0
+
+        limit = _dump_datetime(datetime.now() + self._window)
+        with self._lock:
+            if self._closed.is_set():
+                return 0
+
+            rows = self._db.execute("SELECT name, next_run, count, data "
+                                    "FROM tasks "
+                                    "WHERE running = 1 AND due <= ? "
+                                    "ORDER BY due", (limit,)).fetchall()
+
+        count = 0
+        for name, next_run, run_count, text in rows:
+            if name in self._loaded or name in manager:
+                continue
+
+            data = json.loads(text)
+            data["next_run"] = next_run
+            data["count"] = run_count
+            task = _load_task(data)
+
+            with self._lock:
+                self._loaded.add(name)
+
+            try:
+                manager.register(task)
+            except Exception:
+                with self._lock:
+                    self._loaded.discard(name)
+                raise
+            task.start()
+            count += 1
+
+        return count
+
+    def record(self, event, task):
+        """Save a change of schedule state.
+
+        Called by :class:`ScheduleManager` and :class:`Task`.
+
+        Args:
+            event (str): Event name.
+                One of [`register`, `unregister`, `update`, `start`, `stop`,
+                `pause`, `run`].
+            task (Task): Task.
+
+        Raises:
+            OperationFailError: Task can not be saved.
+        """
+        # W0212: protected-access
+        # pylint: disable=W0212
+        name = task.name
+
+        with self._lock:
+            if self._closed.is_set():
+                return
+
+            if name in self._unloading:
+                # Task is unloaded, not stopped.
+                if event == "unregister":
+                    self._unloading.discard(name)
+                    self._loaded.discard(name)
+                return
+
+            if event == "run":
+                if (not task._is_periodic and task._nonperiod_count <= 0
+                        and task._retry_run is None):
+                    # All runs are done.
+                    self._db.execute("DELETE FROM tasks WHERE name = ?",
+                                     (name,))
+                    self._db.commit()
+                    return
+
+                self._db.execute("UPDATE tasks "
+                                 "SET due = ?, next_run = ?, count = ? "
+                                 "WHERE name = ?",
+                                 (_dump_datetime(task._next_run),
+                                  _dump_datetime(task._next_run),
+                                  task._nonperiod_count, name))
+                self._db.commit()
+
+                unload = (name in self._loaded
+                          and task._next_run > datetime.now() + self._window)
+                if unload:
+                    self._unloading.add(name)
+                    task.stop()
+                return
+
+            if event in ("register", "update", "start"):
+                if name not in self._loaded:
+                    self._save(task, running=task.is_running)
+            elif event == "pause":
+                self._save(task, running=False)
+            else:
+                self._loaded.discard(name)
+                self._db.execute("DELETE FROM tasks WHERE name = ?", (name,))
+                self._db.commit()
+
+    def close(self):
+        """Stop loading tasks and close the database."""
+        with self._lock:
+            if self._closed.is_set():
+                return
+
+            self._closed.set()
+            self._db.close()
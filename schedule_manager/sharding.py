@@ -0,0 +1,538 @@
+"""
+Multi-process schedule management module.
+"""
+import bisect
+import hashlib
+import itertools
+import multiprocessing
+import os
+import threading
+import uuid
+import weakref
+
+from .exceptions import OperationFailError, TaskNotFoundError
+from .manager import ScheduleManager, TaskGroup
+
+
+class _HashRing:
+    """Consistent hash ring mapping task names to shards."""
+
+    def __init__(self, shards, replicas=100):
+        self._points = list()
+        self._shards = list()
+
+        ring = sorted((self._hash("{}-{}".format(shard, replica)), shard)
+                      for shard in range(shards)
+                      for replica in range(replicas))
+        for point, shard in ring:
+            self._points.append(point)
+            self._shards.append(shard)
+
+    @staticmethod
+    def _hash(key):
+        # Stable across processes, unlike built-in hash().
+        return int(hashlib.md5(key.encode("utf-8")).hexdigest()[:16], 16)
+
+    def shard(self, name):
+        """Shard index of the task name."""
+        index = bisect.bisect(self._points, self._hash(name))
+        if index == len(self._points):
+            index = 0
+
+        return self._shards[index]
+
+
+class _Worker:
+    """Schedule manager running in a shard process."""
+
+    def __init__(self):
+        self.manager = ScheduleManager()
+        # Token -> Task. Keeps tasks known by the parent process only.
+        self.tasks = weakref.WeakValueDictionary()
+        # Task -> Token. Tokens are never reused, unlike id() of tasks
+        # which are garbage collected.
+        self._tokens = weakref.WeakKeyDictionary()
+        self._counter = itertools.count()
+
+    def token(self, task):
+        token = self._tokens.get(task)
+        if token is None:
+            token = next(self._counter)
+            self._tokens[task] = token
+            self.tasks[token] = task
+        return token
+
+    def task(self, token):
+        if token not in self.tasks:
+            raise TaskNotFoundError
+
+        return self.tasks[token]
+
+    def tokens(self, group):
+        return [(task.name, self.token(task)) for task in group]
+
+    def register_task(self, kwargs):
+        return self.token(self.manager.register_task(**kwargs))
+
+    def get_task(self, name):
+        return self.token(self.manager.task(name))
+
+    def get_tasks(self, tag):
+        return self.tokens(self.manager.tasks(tag))
+
+    def get_group(self, group):
+        return self.tokens(getattr(self.manager, group))
+
+    def unregister(self, name, tag):
+        self.manager.unregister(name=name, tag=tag)
+
+    def count(self):
+        return self.manager.count
+
+    def names(self):
+        return list(self.manager)
+
+    def contains(self, name):
+        return name in self.manager
+
+    def call(self, token, method, args, kwargs):
+        task = self.task(token)
+        value = getattr(task, method)(*args, **kwargs)
+
+        # Fluent method returns the task itself.
+        return None if value is task else value
+
+    def upcoming(self, token, start, stop):
+        # Generator of run times can not be sent, so a slice is computed.
+        task = self.task(token)
+        return list(itertools.islice(task.upcoming(stop), start, stop))
+
+    def get(self, token, attribute):
+        if attribute == "manager":
+            # Task is released after it is unregistered.
+            task = self.tasks.get(token)
+            return task is not None and task.manager is self.manager
+
+        return getattr(self.task(token), attribute)
+
+
+def _shard_main(conn):
+    # Entry point of a shard process.
+    worker = _Worker()
+
+    while True:
+        try:
+            command, args = conn.recv()
+        except EOFError:
+            break
+
+        if command == "close":
+            for task in list(worker.manager.running_tasks):
+                task.stop()
+            conn.send(("value", None))
+            break
+
+        try:
+            value = getattr(worker, command)(*args)
+        except Exception as error:    # pylint: disable=W0703
+            conn.send(("error", error))
+        else:
+            conn.send(("value", value))
+
+    conn.close()
+
+
+class _Shard:
+    """Connection to a shard process."""
+
+    def __init__(self, index, context):
+        self.index = index
+        self.lock = threading.Lock()
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_shard_main,
+                                       args=(child_conn,),
+                                       name="Shard-{}".format(index),
+                                       daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def send(self, command, *args):
+        self.conn.send((command, args))
+
+    def recv(self):
+        status, value = self.conn.recv()
+        if status == "error":
+            raise value
+
+        return value
+
+    def request(self, command, *args):
+        with self.lock:
+            self.send(command, *args)
+            return self.recv()
+
+
+class ShardedScheduleManager:
+    """Schedule manager running tasks in multiple processes.
+
+    Tasks are assigned to shard processes by consistent hash of task name.
+    Every shard runs its own :class:`ScheduleManager`, so triggering and
+    running jobs are not limited by one interpreter.
+
+    Tasks are controlled through :class:`RemoteTask`, which provides the
+    same interface as :class:`Task`, and can be grouped by
+    :class:`TaskGroup`.
+
+    Jobs, arguments and other task options are sent to shard processes, so
+    they must be picklable.
+
+    Args:
+        shards (int): Number of shard processes.
+            Defaults to number of CPUs.
+    """
+
+    def __init__(self, shards=None):
+        if not shards:
+            shards = os.cpu_count() or 1
+
+        self._ring = _HashRing(shards)
+        self._closed = False
+        self._shards = list()
+
+        context = multiprocessing.get_context()
+        for index in range(shards):
+            self._shards.append(_Shard(index, context))
+
+    def __del__(self):
+        """Destructor"""
+        self.close()
+
+    def __contains__(self, name):
+        """Returns True if task name is registered."""
+        return self._shard(name).request("contains", name)
+
+    def __iter__(self):
+        """Iterate over tasks name."""
+        names = list()
+        for shard_names in self._broadcast("names"):
+            names.extend(shard_names)
+
+        return iter(names)
+
+    def __repr__(self):
+        return ("ShardedScheduleManager<("
+                "Shards: {s}, Tasks: {c}"
+                ")>").format(s=len(self._shards), c=self.count)
+
+    @property
+    def shards(self):
+        """int: Number of shard processes."""
+        return len(self._shards)
+
+    @property
+    def count(self):
+        """int: Number of tasks registered in the schedule manager."""
+        return sum(self._broadcast("count"))
+
+    @property
+    def all_tasks(self):
+        """TaskGroup: Get all tasks."""
+        return self._group("get_group", "all_tasks")
+
+    @property
+    def running_tasks(self):
+        """TaskGroup: Get all running tasks."""
+        return self._group("get_group", "running_tasks")
+
+    @property
+    def pending_tasks(self):
+        """TaskGroup: Get all pending tasks."""
+        return self._group("get_group", "pending_tasks")
+
+    def shard_of(self, name):
+        """Get shard index of a task name.
+
+        Args:
+            name (str): Task name.
+
+        Returns:
+            int: Shard index.
+        """
+        return self._ring.shard(name)
+
+    def _shard(self, name):
+        return self._shards[self._ring.shard(name)]
+
+    def _broadcast(self, command, *args):
+        # Send command to all shards, then collect results.
+        for shard in self._shards:
+            shard.lock.acquire()
+
+        try:
+            for shard in self._shards:
+                shard.send(command, *args)
+
+            results = list()
+            error = None
+            for shard in self._shards:
+                try:
+                    results.append(shard.recv())
+                except Exception as error_:    # pylint: disable=W0703
+                    error = error_
+
+            if error is not None:
+                raise error
+
+            return results
+        finally:
+            for shard in self._shards:
+                shard.lock.release()
+
+    def _group(self, command, *args):
+        task_list = list()
+
+        for shard, tokens in zip(self._shards,
+                                 self._broadcast(command, *args)):
+            for name, token in tokens:
+                task_list.append(RemoteTask(self, shard, name, token))
+
+        return TaskGroup(task_list)
+
+    def task(self, name):
+        """Get task registerd in schedule manager by name.
+
+        Args:
+            name (str): Task name.
+
+        Returns:
+            RemoteTask: Task instance.
+
+        Raises:
+            TaskNotFoundError: Task is not registered in schedule manager.
+        """
+        shard = self._shard(name)
+
+        return RemoteTask(self, shard, name, shard.request("get_task", name))
+
+    def tasks(self, tag):
+        """Get tasks registerd in schedule manager by tag.
+
+        Args:
+            tag (Union[obj, list]): Tag or tag list.
+
+        Returns:
+            TaskGroup: TaskGroup instance.
+        """
+        return self._group("get_tasks", tag)
+
+    def register_task(self, job, name=None, args=(), kwargs=None, **options):
+        """Create and register a task.
+
+        Args:
+            job (callable): Job to be scheduled.
+            name (str): Task name.
+                By default, a unique name is constructed.
+            args (tuple): Argument tuple for the job invocation.
+                Defaults to ().
+            kwargs (dict): Dictionary of keyword arguments for the job
+                invocation.
+                Defaults to {}.
+            **options: Other arguments of
+                :meth:`ScheduleManager.register_task`.
+
+        Returns:
+            RemoteTask: Registered task instance.
+
+        Raises:
+            TaskNameDuplicateError: Duplicate task name.
+        """
+        if name is None:
+            name = "Task-{}".format(uuid.uuid4().hex)
+
+        options.update(job=job, name=name, args=args, kwargs=kwargs)
+
+        shard = self._shard(name)
+        token = shard.request("register_task", options)
+
+        return RemoteTask(self, shard, name, token)
+
+    def unregister(self, name=None, tag=None):
+        """Unregister the task.
+
+        Args:
+            name (str): Unregister task by name.
+            tag (Union[obj, list]): Unregister tasks by tag or by
+                a list of tags.
+        """
+        if name:
+            self._shard(name).request("unregister", name, None)
+
+        if tag:
+            self._broadcast("unregister", None, tag)
+
+    def close(self):
+        """Stop all tasks and shard processes."""
+        if self._closed:
+            return
+
+        self._closed = True
+
+        for shard in self._shards:
+            try:
+                shard.request("close")
+            except (EOFError, OSError):
+                pass
+
+            shard.conn.close()
+            shard.process.join()
+
+
+def _remote_method(method, fluent=True):
+    # Method of RemoteTask forwarded to the task in shard process.
+
+    def forward(self, *args, **kwargs):
+        # W0212: protected-access
+        # pylint: disable=W0212
+        value = self._shard.request("call", self._token, method, args, kwargs)
+
+        return self if fluent else value
+
+    forward.__name__ = method
+    forward.__doc__ = "See :meth:`Task.{}`.".format(method)
+
+    return forward
+
+
+def _remote_property(attribute):
+    # Property of RemoteTask read from the task in shard process.
+
+    def getter(self):
+        # W0212: protected-access
+        # pylint: disable=W0212
+        return self._shard.request("get", self._token, attribute)
+
+    return property(getter, doc="See :attr:`Task.{}`.".format(attribute))
+
+
+class RemoteTask:
+    """Task running in a shard process of :class:`ShardedScheduleManager`.
+
+    Provides the same interface as :class:`Task`, except
+    :meth:`Task.next_future`, since a future can not be passed between
+    processes.
+    """
+
+    # Number of run times fetched by a request of upcoming().
+    UPCOMING_CHUNK = 100
+
+    def __init__(self, manager, shard, name, token):
+        self._manager = manager
+        self._shard = shard
+        self._name = name
+        self._token = token
+
+    def __repr__(self):
+        return "RemoteTask<({}, Shard-{})>".format(self._name,
+                                                   self._shard.index)
+
+    def __eq__(self, other):
+        if isinstance(other, RemoteTask):
+            return (self._shard is other._shard
+                    and self._token == other._token)
+        return NotImplemented
+
+    def __hash__(self):
+        return hash((self._shard.index, self._token))
+
+    @property
+    def name(self):
+        """str: Task name."""
+        return self._name
+
+    @property
+    def manager(self):
+        """ShardedScheduleManager: Schedule manager which manages current
+        task."""
+        if self._shard.request("get", self._token, "manager"):
+            return self._manager
+        return None
+
+    next_run = _remote_property("next_run")
+    is_running = _remote_property("is_running")
+    tag = _remote_property("tag")
+    stats = _remote_property("stats")
+    misfire_policy = _remote_property("misfire_policy")
+    timeout = _remote_property("timeout")
+    max_instances = _remote_property("max_instances")
+    overflow_policy = _remote_property("overflow_policy")
+    priority = _remote_property("priority")
+    last_result = _remote_property("last_result")
+    profile = _remote_property("profile")
+    upstream = _remote_property("upstream")
+    tz = _remote_property("tz")
+
+    add_tag = _remote_method("add_tag")
+    add_tags = _remote_method("add_tags")
+    remove_tag = _remote_method("remove_tag")
+    remove_tags = _remote_method("remove_tags")
+    set_tags = _remote_method("set_tags")
+    results = _remote_method("results", fluent=False)
+    delay = _remote_method("delay")
+    start_at = _remote_method("start_at")
+    nonperiodic = _remote_method("nonperiodic")
+    periodic = _remote_method("periodic")
+    period = _remote_method("period")
+    period_at = _remote_method("period_at")
+    period_day_at = _remote_method("period_day_at")
+    period_week_at = _remote_method("period_week_at")
+    period_month_at = _remote_method("period_month_at")
+    start = _remote_method("start", fluent=False)
+    stop = _remote_method("stop", fluent=False)
+    pause = _remote_method("pause", fluent=False)
+    run_now = _remote_method("run_now", fluent=False)
+
+    def after(self, *tasks):
+        """See :meth:`Task.after`.
+
+        Upstream tasks must be in the same shard, since tasks are triggered
+        by runs in the same :class:`ScheduleManager`.
+
+        Raises:
+            OperationFailError: Upstream task is in another shard.
+        """
+        upstream = list()
+        for task in tasks:
+            if isinstance(task, TaskGroup):
+                upstream.extend(member.name for member in task)
+            elif isinstance(task, str):
+                upstream.append(task)
+            else:
+                upstream.append(task.name)
+
+        for name in upstream:
+            if self._manager.shard_of(name) != self._shard.index:
+                raise OperationFailError("Upstream task <{}> is in another "
+                                         "shard.".format(name))
+
+        self._shard.request("call", self._token, "after", upstream, {})
+
+        return self
+
+    def upcoming(self, n=None):
+        """See :meth:`Task.upcoming`.
+
+        Run times are fetched from the shard process in chunks.
+        """
+        start = 0
+        while n is None or start < n:
+            stop = start + self.UPCOMING_CHUNK
+            if n is not None:
+                stop = min(stop, n)
+
+            run_times = self._shard.request("upcoming", self._token,
+                                            start, stop)
+            yield from run_times
+
+            if len(run_times) < stop - start:
+                return
+            start = stop
@@ -0,0 +1,158 @@
+"""
+Time zone module.
+
+Run times of tasks are naive local datetimes. Calendar schedules in another
+time zone are calculated on the wall clock of that zone, and converted by
+tables of UTC offset transitions. A table is built once for every zone and
+year, so tasks sharing a few zones do not query the zones for every run.
+"""
+import bisect
+import threading
+from datetime import datetime, timezone
+
+from .exceptions import OperationFailError
+
+_DAY = 86400    # Seconds of a day
+
+_tables = dict()    # Time zone -> _Transitions
+_tables_lock = threading.Lock()
+
+
+def get_zone(tz):
+    """Get a time zone.
+
+    Args:
+        tz (Union[str, datetime.tzinfo]): IANA time zone name, such as
+            `"Europe/Berlin"`, or a time zone.
+
+    Returns:
+        datetime.tzinfo: Time zone.
+
+    Raises:
+        OperationFailError: Unknown time zone, or `zoneinfo` is not
+            available.
+    """
+    if not isinstance(tz, str):
+        if not hasattr(tz, "utcoffset"):
+            raise OperationFailError("Invalid time zone <{}>.".format(tz))
+        return tz
+
+    try:
+        # C0415: import-outside-toplevel
+        # pylint: disable=C0415
+        import zoneinfo
+    except ImportError as error:
+        raise OperationFailError("zoneinfo is not available.") from error
+
+    try:
+        return zoneinfo.ZoneInfo(tz)
+    except (zoneinfo.ZoneInfoNotFoundError, ValueError) as error:
+        raise OperationFailError(
+            "Unknown time zone <{}>.".format(tz)) from error
+
+
+def to_wall(zone, local):
+    """Convert local time to wall time of a time zone.
+
+    Args:
+        zone (datetime.tzinfo): Time zone.
+        local (datetime): Naive local time.
+
+    Returns:
+        datetime: Naive wall time of the zone.
+    """
+    stamp = local.timestamp()
+    offset = _transitions(zone).offset(stamp)
+
+    return datetime.fromtimestamp(stamp + offset,
+                                  timezone.utc).replace(tzinfo=None)
+
+
+def to_local(zone, wall):
+    """Convert wall time of a time zone to local time.
+
+    Ambiguous wall time, which is repeated when clocks are turned back, is
+    its first occurrence. Wall time skipped when clocks are turned forward
+    is moved forward by the skipped time.
+
+    Args:
+        zone (datetime.tzinfo): Time zone.
+        wall (datetime): Naive wall time of the zone.
+
+    Returns:
+        datetime: Naive local time.
+    """
+    table = _transitions(zone)
+    base = wall.replace(tzinfo=timezone.utc).timestamp()
+
+    before = table.offset(base - _DAY)
+    after = table.offset(base + _DAY)
+    for offset in sorted({before, after}, reverse=True):
+        if table.offset(base - offset) == offset:
+            return datetime.fromtimestamp(base - offset)
+
+    # Skipped wall time.
+    return datetime.fromtimestamp(base - before)
+
+
+def _transitions(zone):
+    table = _tables.get(zone)
+    if table is None:
+        with _tables_lock:
+            table = _tables.setdefault(zone, _Transitions(zone))
+
+    return table
+
+
+class _Transitions:
+    """UTC offset transitions of a time zone, built by year."""
+
+    def __init__(self, zone):
+        self._zone = zone
+        # Year -> (start timestamps, offsets in seconds)
+        self._years = dict()
+
+    def offset(self, stamp):
+        """UTC offset in seconds at a timestamp."""
+        year = datetime.fromtimestamp(stamp, timezone.utc).year
+
+        table = self._years.get(year)
+        if table is None:
+            table = self._years.setdefault(year, self._build(year))
+
+        stamps, offsets = table
+        return offsets[bisect.bisect_right(stamps, stamp) - 1]
+
+    def _query(self, stamp):
+        return int(datetime.fromtimestamp(stamp, self._zone)
+                   .utcoffset().total_seconds())
+
+    def _build(self, year):
+        # Scan the year by days, and find every transition to the second.
+        # Zones change offset at most once a day.
+        start = int(datetime(year, 1, 1, tzinfo=timezone.utc).timestamp())
+        end = int(datetime(year + 1, 1, 1, tzinfo=timezone.utc).timestamp())
+
+        stamps = [start]
+        offsets = [self._query(start)]
+
+        stamp = start
+        while stamp < end:
+            next_ = min(stamp + _DAY, end)
+            offset = self._query(next_)
+
+            if offset != offsets[-1]:
+                low, high = stamp, next_
+                while high - low > 1:
+                    middle = (low + high) // 2
+                    if self._query(middle) == offsets[-1]:
+                        low = middle
+                    else:
+                        high = middle
+
+                stamps.append(high)
+                offsets.append(offset)
+
+            stamp = next_
+
+        return stamps, offsets
@@ -0,0 +1,111 @@
+"""
+Tracing module.
+
+OpenTelemetry is imported only when :class:`OpenTelemetryTracer` is
+created, so tasks pay nothing if tracing is not enabled.
+"""
+import contextlib
+
+from .exceptions import OperationFailError
+
+
+class OpenTelemetryTracer:
+    """Wrap every run of the job in an OpenTelemetry span.
+
+    Use it by :class:`ScheduleManager(tracer=tracer) <ScheduleManager>`.
+    Requires `opentelemetry-api`.
+
+    A span carries the following attributes:
+
+    * `schedule.task.name`: Task name.
+    * `schedule.task.tags`: Task tags as strings.
+    * `schedule.run.scheduled`: Scheduled time in ISO format.
+    * `schedule.run.attempt`: Attempt number of the run.
+    * `schedule.run.lateness`: Seconds between scheduled time and start
+      time of the run.
+    * `schedule.run.throttled`: Seconds of the lateness spent waiting for
+      rate limits.
+    * `schedule.run.outcome`: `succeeded`, `failed` or `timed_out`.
+
+    If the job accepts a `trace_context` keyword argument, the context of
+    the span is passed to it as a dict of W3C trace context headers, which
+    also works for jobs running in a process.
+
+    Args:
+        tracer_provider (opentelemetry.trace.TracerProvider): Provider of
+            the tracer.
+            Defaults to None (the global provider).
+        name (str): Instrumentation name of the tracer.
+            Defaults to "schedule_manager".
+
+    Raises:
+        OperationFailError: OpenTelemetry is not installed.
+    """
+
+    def __init__(self, tracer_provider=None, name="schedule_manager"):
+        try:
+            # C0415: import-outside-toplevel
+            # pylint: disable=C0415
+            from opentelemetry import propagate
+            from opentelemetry import trace
+        except ImportError as error:
+            raise OperationFailError(
+                "OpenTelemetry is not installed.") from error
+
+        self._propagate = propagate
+        self._trace = trace
+        self._tracer = trace.get_tracer(name, tracer_provider=tracer_provider)
+
+    def __repr__(self):
+        return "OpenTelemetryTracer<({})>".format(self._tracer)
+
+    @contextlib.contextmanager
+    def span(self, task, run):
+        """Context manager of a span around a run.
+
+        Called by :class:`Task`.
+
+        Args:
+            task (Task): Task of the run.
+            run (obj): Run with `scheduled`, `attempt`, `started`,
+                `throttled`, `exception` and `timed_out` attributes.
+
+        Yields:
+            dict: Trace context headers of the span.
+        """
+        attributes = {
+            "schedule.task.name": task.name,
+            "schedule.task.tags": [str(tag) for tag in task.tag],
+            "schedule.run.scheduled": run.scheduled.isoformat(),
+            "schedule.run.attempt": run.attempt,
+        }
+        if run.started is not None:
+            attributes["schedule.run.lateness"] = (
+                run.started - run.scheduled).total_seconds()
+        if run.throttled:
+            attributes["schedule.run.throttled"] = (
+                run.throttled.total_seconds())
+
+        with self._tracer.start_as_current_span(
+                "schedule_manager.run {}".format(task.name),
+                attributes=attributes,
+                record_exception=False,
+                set_status_on_exception=False) as span:
+            context = dict()
+            self._propagate.inject(context)
+
+            try:
+                yield context
+            finally:
+                if run.timed_out:
+                    outcome = "timed_out"
+                elif run.exception is not None:
+                    outcome = "failed"
+                    span.record_exception(run.exception)
+                else:
+                    outcome = "succeeded"
+
+                span.set_attribute("schedule.run.outcome", outcome)
+                if outcome != "succeeded":
+                    span.set_status(self._trace.Status(
+                        self._trace.StatusCode.ERROR, outcome))
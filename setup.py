@@ -5,6 +5,9 @@ from schedule_manager import __version__ as VERSION
 setup(
     name='schedule-manager',
     packages=['schedule_manager'],
+    extras_require={
+        'tracing': ['opentelemetry-api'],
+    },
     version=VERSION,
     license='MIT',
     url='https://github.com/e619003/ScheduleManager',
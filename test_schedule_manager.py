@@ -15,12 +15,37 @@ Unit tests for schedule_manager
 # pylint: disable=R0201, R0903, R0904, R0915
 # pylint: disable=W0212, W0613, W0621
 
+from concurrent.futures import CancelledError, ThreadPoolExecutor
 from datetime import datetime, timedelta
+import contextlib
+import gc
+import itertools
+import json
+import sqlite3
+import sys
+import threading
 import time
+import urllib.error
+import urllib.request
 import pytest
 
 from schedule_manager import manager
+from schedule_manager import timezone
 from schedule_manager import ScheduleManager, Task, TaskGroup
+from schedule_manager import RetryPolicy, LoadSheddingPolicy
+
+from schedule_manager.admin import AdminServer
+from schedule_manager.persistence import FileStateStore
+from schedule_manager.persistence import SQLiteJobStore
+from schedule_manager.sharding import ShardedScheduleManager, _HashRing
+from schedule_manager.sharding import _Worker
+from schedule_manager.lease import FileLease
+from schedule_manager.events import EVENTS, EventBus, TaskEvent
+from schedule_manager.executors import PriorityThreadPoolExecutor
+from schedule_manager.tracing import OpenTelemetryTracer
+from schedule_manager.claims import MemoryClaimStore
+from schedule_manager.claims import SQLiteClaimStore
+from schedule_manager.claims import FileClaimStore
 
 from schedule_manager.exceptions import OperationFailError
 from schedule_manager.exceptions import TaskNameDuplicateError
@@ -537,6 +562,34 @@ class TestTask:
         assert task._start
         assert task.is_running
 
+        with pytest.raises(OperationFailError):
+            task.start()
+
+    def test_start_concurrently(self, mocker):
+        task = Task(job=lambda *args, **kwargs: None).period(10)
+        barrier = threading.Barrier(9)
+        errors = list()
+
+        def start():
+            """Start the task at the same time as other threads."""
+            barrier.wait()
+            try:
+                task.start()
+            except OperationFailError as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=start) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+
+        starts = mocker.patch('threading.Thread.start')
+        barrier.wait()
+        for thread in threads:
+            thread.join()
+
+        assert starts.call_count == 1
+        assert len(errors) == 7
+
     def test_flag_control_with_stop_func(self, mocker):
         task = Task(job=lambda *args, **kwargs: None)
         mocker.patch('threading.Thread.start', return_value=False)
@@ -793,22 +846,22 @@ class TestTask:
                                                   second=0)
                 with FakeDatetime(this_year, 1, 1, 1, 6, 20):
                     time.sleep(1)
-                    assert Monitor.monitor == 3
+                    assert Monitor.monitor == 5
                     assert task._next_run == datetime(year=this_year,
                                                       month=1,
                                                       day=1,
                                                       hour=1,
-                                                      minute=4,
+                                                      minute=7,
                                                       second=30)
                     with FakeDatetime(this_year, 1, 1, 1, 6, 21):
                         time.sleep(1)
-                        assert Monitor.monitor == 4
+                        assert Monitor.monitor == 5
                         assert task._next_run == datetime(year=this_year,
                                                           month=1,
                                                           day=1,
                                                           hour=1,
-                                                          minute=6,
-                                                          second=0)
+                                                          minute=7,
+                                                          second=30)
                         with FakeDatetime(this_year, 1, 1, 1, 6, 22):
                             time.sleep(1)
                             assert Monitor.monitor == 5
@@ -1116,10 +1169,10 @@ class TestTask:
                                                   second=0)
                 with FakeDatetime(this_year, 6, 9, 11, 0, 0):
                     time.sleep(1)
-                    assert Monitor.monitor == 2
+                    assert Monitor.monitor == 3
                     assert task._next_run == datetime(year=this_year,
                                                       month=6,
-                                                      day=8,
+                                                      day=9,
                                                       hour=12,
                                                       minute=0,
                                                       second=0)
@@ -1621,10 +1674,10 @@ class TestTask:
                                                   second=0)
                 with FakeDatetime(this_year, 8, 4, 11, 0, 0):
                     time.sleep(1)
-                    assert Monitor.monitor == 2
+                    assert Monitor.monitor == 3
                     assert task._next_run == datetime(year=this_year,
-                                                      month=7,
-                                                      day=29,
+                                                      month=8,
+                                                      day=5,
                                                       hour=12,
                                                       minute=0,
                                                       second=0)
@@ -2492,9 +2545,9 @@ class TestTask:
                                                   second=0)
                 with FakeDatetime(this_year, 4, 4, 11, 0, 0):
                     time.sleep(1)
-                    assert Monitor.monitor == 2
+                    assert Monitor.monitor == 3
                     assert task._next_run == datetime(year=this_year,
-                                                      month=3,
+                                                      month=4,
                                                       day=5,
                                                       hour=12,
                                                       minute=0,
@@ -2564,18 +2617,18 @@ class TestTask:
                                                   second=0)
                 with FakeDatetime(this_year+1, 6, 4, 11, 0, 0):
                     time.sleep(1)
-                    assert Monitor.monitor == 2
+                    assert Monitor.monitor == 4
                     assert task._next_run == datetime(year=this_year+1,
-                                                      month=3,
+                                                      month=7,
                                                       day=31,
                                                       hour=12,
                                                       minute=0,
                                                       second=0)
                     with FakeDatetime(this_year+1, 6, 4, 11, 0, 1):
                         time.sleep(1)
-                        assert Monitor.monitor == 3
+                        assert Monitor.monitor == 4
                         assert task._next_run == datetime(year=this_year+1,
-                                                          month=5,
+                                                          month=7,
                                                           day=31,
                                                           hour=12,
                                                           minute=0,
@@ -2881,231 +2934,1140 @@ class TestTask:
         task.manager = manager
         assert task._manager == manager
 
+    def test_misfire_policy(self):
+        task = Task(job=lambda *args, **kwargs: None)
+        assert task.misfire_policy == "coalesce"
 
-class TestScheduleManager:
-    """Test ScheduleManager object."""
+        task = Task(job=lambda *args, **kwargs: None, ignore_skipped=False)
+        assert task.misfire_policy == "run_all"
 
-    def test_register_task(self):
-        task = Task(name="test_task", job=lambda *args, **kwargs: None)
-        manager = ScheduleManager()
-        manager.register(task)
+        task = Task(job=lambda *args, **kwargs: None,
+                    ignore_skipped=False, misfire_policy="skip")
+        assert task.misfire_policy == "skip"
 
-        assert "test_task" in manager._tasks
-        assert task is manager._tasks["test_task"]
-        assert task.manager is manager
+        task = Task(job=lambda *args, **kwargs: None,
+                    misfire_policy="run_all_max=3")
+        assert task.misfire_policy == "run_all_max=3"
 
-    def test_register_task_duplicate_name(self):
-        task = Task(name="test_task", job=lambda *args, **kwargs: None)
-        task2 = Task(name="test_task", job=lambda *args, **kwargs: None)
-        manager = ScheduleManager()
-        manager.register(task)
+        for policy in ["all", "run_all_max=", "run_all_max=-1"]:
+            with pytest.raises(OperationFailError):
+                Task(job=lambda *args, **kwargs: None, misfire_policy=policy)
 
-        with pytest.raises(TaskNameDuplicateError):
-            manager.register(task2)
+        with pytest.raises(TimeFormatError):
+            Task(job=lambda *args, **kwargs: None, misfire_grace_time="5")
 
-    def test_register_task_by_name(self):
-        manager = ScheduleManager()
-        manager.register_task(name="test", job=lambda *args, **kwargs: None)
+    @pytest.mark.parametrize('time_tester',
+                             [(this_year, 1, 1, 1, 10, 5)],
+                             indirect=True)
+    def test_misfire_policy_coalesce(self, time_tester):
+        task = Task(job=lambda *args, **kwargs: None,
+                    misfire_policy="coalesce")
+        task.period(60)
+        task._next_run = datetime(this_year, 1, 1, 1, 0, 0)
+        task._set_next_run()
 
-        assert "test" in manager._tasks
-        assert isinstance(manager._tasks["test"], Task)
-        assert manager._tasks["test"].manager is manager
+        assert task._next_run == datetime(this_year, 1, 1, 1, 11, 0)
+        assert task.stats["coalesced"] == 10
+        assert task.stats["skipped"] == 0
 
-    def test_register_task_without_giving_name(self):
-        manager = ScheduleManager()
-        manager.register_task(job=lambda *args, **kwargs: None)
-        task_name = list(manager._tasks.keys())[0]
+    @pytest.mark.parametrize('time_tester',
+                             [(this_year, 1, 1, 1, 10, 5)],
+                             indirect=True)
+    def test_misfire_policy_run_all(self, time_tester):
+        task = Task(job=lambda *args, **kwargs: None,
+                    misfire_policy="run_all")
+        task.period(60)
+        task._next_run = datetime(this_year, 1, 1, 1, 0, 0)
+        task._set_next_run()
 
-        assert task_name.startswith("Task-")
+        assert task._next_run == datetime(this_year, 1, 1, 1, 1, 0)
+        assert task.stats["coalesced"] == 0
+        assert task.stats["skipped"] == 0
 
-    def test_register_task_by_name_duplicate_name(self):
-        manager = ScheduleManager()
-        manager.register_task(name="test", job=lambda *args, **kwargs: None)
+        task = Task(job=lambda *args, **kwargs: None,
+                    misfire_policy="run_all_max=3")
+        task.period(60)
+        task._next_run = datetime(this_year, 1, 1, 1, 0, 0)
+        task._set_next_run()
 
-        with pytest.raises(TaskNameDuplicateError):
-            manager.register_task(name="test",
-                                  job=lambda *args, **kwargs: None)
+        assert task._next_run == datetime(this_year, 1, 1, 1, 8, 0)
+        assert task.stats["skipped"] == 7
 
-    def test_property_count(self):
-        manager = ScheduleManager()
-        manager.register_task(name="test", job=lambda *args, **kwargs: None)
-        manager.register_task(name="test2", job=lambda *args, **kwargs: None)
-        manager.register_task(name="test3", job=lambda *args, **kwargs: None)
+        task._set_next_run()
+        assert task._next_run == datetime(this_year, 1, 1, 1, 9, 0)
+        assert task.stats["skipped"] == 7
 
-        assert manager.count == len(manager._tasks)
+    @pytest.mark.parametrize('time_tester',
+                             [(this_year, 5, 20, 1, 10, 5)],
+                             indirect=True)
+    def test_misfire_policy_calendar_units(self, time_tester):
+        task = Task(job=lambda *args, **kwargs: None,
+                    misfire_policy="coalesce")
+        task.period_day_at("12:00:00")
+        task._next_run = datetime(this_year, 5, 10, 12, 0, 0)
+        task._set_next_run()
 
-    def test_unregister_task_by_name(self):
-        task1 = Task(name="test_task1", job=lambda *args, **kwargs: None)
-        task2 = Task(name="test_task2", job=lambda *args, **kwargs: None)
-        task3 = Task(name="test_task3", job=lambda *args, **kwargs: None)
-        manager = ScheduleManager()
-        manager.register(task1)
-        manager.register(task2)
-        manager.register(task3)
+        assert task._next_run == datetime(this_year, 5, 20, 12, 0, 0)
+        assert task.stats["coalesced"] == 9
 
-        assert manager.count == 3
-        manager.unregister(name="test_task2")
-        assert manager.count == 2
-        assert "test_task1" in manager._tasks
-        assert task1.manager is manager
-        assert "test_task2" not in manager._tasks
-        assert task2.manager is None
-        assert "test_task3" in manager._tasks
-        assert task3.manager is manager
+        task = Task(job=lambda *args, **kwargs: None,
+                    misfire_policy="run_all_max=1")
+        task.period_month_at("12:00:00", day=31)
+        task._next_run = datetime(this_year, 1, 31, 12, 0, 0)
+        task._set_next_run()
 
-    def test_unregister_task_by_tag(self):
-        task1 = Task(name="test_task1", job=lambda *args, **kwargs: None)
-        task2 = Task(name="test_task2", job=lambda *args, **kwargs: None)
-        task3 = Task(name="test_task3", job=lambda *args, **kwargs: None)
-        task4 = Task(name="test_task4", job=lambda *args, **kwargs: None)
-        manager = ScheduleManager()
-        manager.register(task1)
-        manager.register(task2)
-        manager.register(task3)
-        manager.register(task4)
-        task1.add_tag(1)
-        task2.add_tag(2)
-        task3.add_tag(3)
-        task4.add_tag(2)
+        # Missed runs: 03-31 (February is skipped), 05-31 is not overdue.
+        assert task._next_run == datetime(this_year, 3, 31, 12, 0, 0)
+        assert task.stats["skipped"] == 0
 
-        assert manager.count == 4
-        manager.unregister(tag=2)
-        assert manager.count == 2
-        assert "test_task1" in manager._tasks
-        assert task1.manager is manager
-        assert "test_task2" not in manager._tasks
-        assert task2.manager is None
-        assert "test_task3" in manager._tasks
-        assert task3.manager is manager
-        assert "test_task4" not in manager._tasks
-        assert task4.manager is None
+        task._next_run = datetime(this_year-1, 12, 31, 12, 0, 0)
+        task._set_next_run()
 
-    def test_unregister_task_by_tags(self):
-        task1 = Task(name="test_task1", job=lambda *args, **kwargs: None)
-        task2 = Task(name="test_task2", job=lambda *args, **kwargs: None)
-        task3 = Task(name="test_task3", job=lambda *args, **kwargs: None)
-        task4 = Task(name="test_task4", job=lambda *args, **kwargs: None)
-        task5 = Task(name="test_task5", job=lambda *args, **kwargs: None)
-        manager = ScheduleManager()
-        manager.register(task1)
-        manager.register(task2)
-        manager.register(task3)
-        manager.register(task4)
-        manager.register(task5)
-        task1.add_tag(1)
-        task2.add_tag(2)
-        task3.add_tag(3)
-        task4.add_tag(2)
-        task5.add_tag("tag")
+        # Missed runs: 01-31, 03-31. Keep the latest one only.
+        assert task._next_run == datetime(this_year, 3, 31, 12, 0, 0)
+        assert task.stats["skipped"] == 1
 
-        assert manager.count == 5
-        manager.unregister(tag=[2, "tag"])
-        assert manager.count == 2
-        assert "test_task1" in manager._tasks
-        assert task1.manager is manager
-        assert "test_task2" not in manager._tasks
-        assert task2.manager is None
-        assert "test_task3" in manager._tasks
-        assert task3.manager is manager
-        assert "test_task4" not in manager._tasks
-        assert task4.manager is None
-        assert "test_task5" not in manager._tasks
-        assert task5.manager is None
+    @pytest.mark.parametrize('time_tester',
+                             [(this_year, 1, 1, 1, 0, 0)],
+                             indirect=True)
+    def test_run_task__misfire_policy_skip(self, time_tester, monitor_handler):
 
-    def test_unregister_task_by_both_name_tags(self):
-        task1 = Task(name="test_task1", job=lambda *args, **kwargs: None)
-        task2 = Task(name="test_task2", job=lambda *args, **kwargs: None)
-        task3 = Task(name="test_task3", job=lambda *args, **kwargs: None)
-        task4 = Task(name="test_task4", job=lambda *args, **kwargs: None)
-        task5 = Task(name="test_task5", job=lambda *args, **kwargs: None)
-        task6 = Task(name="test_task6", job=lambda *args, **kwargs: None)
-        manager = ScheduleManager()
-        manager.register(task1)
-        manager.register(task2)
-        manager.register(task3)
-        manager.register(task4)
-        manager.register(task5)
-        manager.register(task6)
-        task1.add_tag(1)
-        task2.add_tag(2)
-        task3.add_tag(3)
-        task4.add_tag(2)
-        task5.add_tag("tag")
+        def test_func():
+            """Job used for testing."""
+            Monitor.monitor += 1
 
-        assert manager.count == 6
-        manager.unregister(name="test_task6", tag=[2, "tag"])
-        assert manager.count == 2
-        assert "test_task1" in manager._tasks
-        assert task1.manager is manager
-        assert "test_task2" not in manager._tasks
-        assert task2.manager is None
-        assert "test_task3" in manager._tasks
-        assert task3.manager is manager
-        assert "test_task4" not in manager._tasks
-        assert task4.manager is None
-        assert "test_task5" not in manager._tasks
-        assert task5.manager is None
-        assert "test_task6" not in manager._tasks
-        assert task6.manager is None
+        task = Task(job=test_func, misfire_policy="skip",
+                    misfire_grace_time=timedelta(seconds=10))
+        task.period(60)
+        task.start()
+        time.sleep(0.5)
 
-    def test_get_task(self):
-        task1 = Task(name="test_task1", job=lambda *args, **kwargs: None)
-        task2 = Task(name="test_task2", job=lambda *args, **kwargs: None)
-        task3 = Task(name="test_task3", job=lambda *args, **kwargs: None)
-        manager = ScheduleManager()
-        manager.register(task1)
-        manager.register(task2)
-        manager.register(task3)
-        task1.add_tag(1)
-        task2.add_tag(2)
-        task3.add_tag(3)
+        assert Monitor.monitor == 1
 
-        assert manager.task("test_task3") is task3
+        with FakeDatetime(this_year, 1, 1, 1, 1, 5):
+            time.sleep(1)
+            assert Monitor.monitor == 2
+            assert task.stats["skipped"] == 0
 
-    def test_get_unregistered_task(self):
-        task1 = Task(name="test_task1", job=lambda *args, **kwargs: None)
-        task2 = Task(name="test_task2", job=lambda *args, **kwargs: None)
-        task3 = Task(name="test_task3", job=lambda *args, **kwargs: None)
-        manager = ScheduleManager()
-        manager.register(task1)
-        manager.register(task2)
-        manager.register(task3)
-        task1.add_tag(1)
-        task2.add_tag(2)
-        task3.add_tag(3)
+            with FakeDatetime(this_year, 1, 1, 1, 4, 30):
+                time.sleep(1)
+                assert Monitor.monitor == 2
+                assert task.stats["skipped"] == 3
+                assert task._next_run == datetime(this_year, 1, 1, 1, 5, 0)
 
-        with pytest.raises(TaskNotFoundError):
-            manager.task("test")
+        task.stop()
 
-    def test_get_tasks(self):
-        task1 = Task(name="test_task1", job=lambda *args, **kwargs: None)
-        task2 = Task(name="test_task2", job=lambda *args, **kwargs: None)
-        task3 = Task(name="test_task3", job=lambda *args, **kwargs: None)
-        task4 = Task(name="test_task4", job=lambda *args, **kwargs: None)
-        manager = ScheduleManager()
-        manager.register(task1)
-        manager.register(task2)
-        manager.register(task3)
-        manager.register(task4)
-        task1.add_tag(1)
-        task2.add_tag(2)
-        task3.add_tag(3)
-        task4.add_tag(2)
-        task_list = manager.tasks(2)
+    def test_timeout_and_executor_argument(self):
+        task = Task(job=lambda *args, **kwargs: None, timeout=5)
+        assert task.timeout == timedelta(seconds=5)
 
-        assert len(task_list._tasks) == 2
-        assert task1 not in task_list
-        assert task2 in task_list
-        assert task3 not in task_list
-        assert task4 in task_list
+        task = Task(job=lambda *args, **kwargs: None,
+                    timeout=timedelta(seconds=0.5))
+        assert task.timeout == timedelta(seconds=0.5)
 
-    def test_get_tasks_by_tags(self):
-        task1 = Task(name="test_task1", job=lambda *args, **kwargs: None)
-        task2 = Task(name="test_task2", job=lambda *args, **kwargs: None)
-        task3 = Task(name="test_task3", job=lambda *args, **kwargs: None)
-        task4 = Task(name="test_task4", job=lambda *args, **kwargs: None)
-        manager = ScheduleManager()
-        manager.register(task1)
+        with pytest.raises(TimeFormatError):
+            Task(job=lambda *args, **kwargs: None, timeout="00:00:05")
+
+        with pytest.raises(OperationFailError):
+            Task(job=lambda *args, **kwargs: None, executor="thread")
+
+    def test_cancel_token_argument(self):
+        def job_with_token(cancel_token):
+            """Job used for testing."""
+
+        def job_with_kwargs(**kwargs):
+            """Job used for testing."""
+
+        assert Task(job=job_with_token)._accept_token
+        assert not Task(job=job_with_kwargs)._accept_token
+        assert not Task(job=print)._accept_token
+
+    def test_run_task__timeout(self, monitor_handler):
+        tokens = list()
+
+        def test_func(cancel_token):
+            """Job used for testing."""
+            tokens.append(cancel_token)
+            cancel_token.wait(10)
+            Monitor.monitor += 1
+
+        task = Task(job=test_func, timeout=1)
+        task.period(60)
+        task.start()
+        time.sleep(1.5)
+
+        assert task.stats["timed_out"] == 1
+        assert tokens[0].cancelled
+        assert Monitor.monitor == 1
+        assert task.next_run > datetime.now()
+
+        # Run is forgotten at the next check after the job returns.
+        time.sleep(1)
+        assert task._in_flight == []
+
+        task.stop()
+
+    def test_run_task__timeout_process(self):
+
+        task = Task(job=time.sleep, args=(10,), timeout=1, executor="process")
+        task.period(60)
+        task.start()
+        time.sleep(1.5)
+
+        assert task.stats["timed_out"] == 1
+        assert task.is_alive()
+
+        task.stop()
+
+    def test_run_task__timeout_executor(self):
+        tokens = list()
+
+        def test_func(cancel_token):
+            """Job used for testing."""
+            tokens.append(cancel_token)
+            cancel_token.wait(10)
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            task = Task(job=test_func, timeout=1, executor=executor)
+            task.period(60)
+            task.start()
+            time.sleep(0.5)
+
+            assert len(task._in_flight) == 1
+            assert task.stats["timed_out"] == 0
+
+            time.sleep(1.5)
+            assert task.stats["timed_out"] == 1
+            assert tokens[0].cancelled
+            assert task._in_flight == []
+
+            task.stop()
+
+    def test_load_shedding_policy(self):
+        policy = LoadSheddingPolicy(lag_threshold=2, smoothing=0.5)
+        assert policy.recover_threshold == 1
+
+        policy.observe(6)
+        assert policy.lag == 3
+        assert policy.active
+
+        policy.observe(-1)
+        assert policy.lag == 1.5
+        assert policy.active
+
+        policy.observe(0)
+        assert not policy.active
+
+        with pytest.raises(OperationFailError):
+            LoadSheddingPolicy(lag_threshold=1, recover_threshold=2)
+        with pytest.raises(OperationFailError):
+            LoadSheddingPolicy(stretch=0)
+        with pytest.raises(OperationFailError):
+            LoadSheddingPolicy(smoothing=0)
+
+    def test_retry_policy(self, mocker):
+        policy = RetryPolicy(max_attempts=4, base_delay=2, max_delay=5,
+                             jitter=False, retry_on=(ValueError,))
+
+        assert policy.delay(1) == 2
+        assert policy.delay(2) == 4
+        assert policy.delay(3) == 5
+
+        assert policy.should_retry(1, ValueError())
+        assert policy.should_retry(3, ValueError())
+        assert not policy.should_retry(4, ValueError())
+        assert not policy.should_retry(1, KeyError())
+
+        mocker.patch('random.uniform', return_value=1.5)
+        policy = RetryPolicy(base_delay=2, jitter=True)
+        assert policy.delay(2) == 1.5
+
+        with pytest.raises(OperationFailError):
+            RetryPolicy(max_attempts=0)
+
+        with pytest.raises(OperationFailError):
+            RetryPolicy(base_delay=-1)
+
+    def test_run_task__exception(self, monitor_handler):
+
+        def test_func():
+            """Job used for testing."""
+            Monitor.monitor += 1
+            raise ValueError("Job failed.")
+
+        task = Task(job=test_func)
+        task.period(1)
+        task.start()
+        time.sleep(2.5)
+
+        assert task.is_alive()
+        assert Monitor.monitor == 3
+        assert task.stats["failed"] == 3
+        assert task.stats["retried"] == 0
+
+        task.stop()
+
+    def test_run_task__retry(self, monitor_handler):
+
+        def test_func():
+            """Job used for testing."""
+            Monitor.monitor += 1
+            if Monitor.monitor < 3:
+                raise ValueError("Job failed.")
+
+        task = Task(job=test_func,
+                    retry=RetryPolicy(max_attempts=5, base_delay=0,
+                                      jitter=False))
+        task.period(60)
+        task.start()
+        time.sleep(2.5)
+
+        assert Monitor.monitor == 3
+        assert task.stats["failed"] == 2
+        assert task.stats["retried"] == 2
+        assert task._retry_run is None
+
+        task.stop()
+
+    def test_run_task__retry_nonperiodic(self, monitor_handler):
+
+        def test_func():
+            """Job used for testing."""
+            Monitor.monitor += 1
+            raise KeyError("Job failed.")
+
+        task = Task(job=test_func,
+                    retry=RetryPolicy(max_attempts=2, base_delay=0,
+                                      retry_on=(KeyError,)))
+        task.period(60)
+        task.nonperiodic(1)
+        task.start()
+        time.sleep(2.5)
+
+        assert Monitor.monitor == 2
+        assert task.stats["failed"] == 2
+        assert task.stats["retried"] == 1
+        assert not task.is_alive()
+
+    def test_run_task__results(self, monitor_handler):
+
+        def test_func():
+            """Job used for testing."""
+            Monitor.monitor += 1
+            if Monitor.monitor == 2:
+                raise ValueError("Job failed.")
+            return Monitor.monitor
+
+        task = Task(job=test_func, keep_results=2)
+        assert task.last_result is None
+        assert task.results() == []
+
+        task.period(1)
+        task.start()
+        time.sleep(2.5)
+        task.stop()
+
+        results = task.results()
+        assert len(results) == 2
+        assert task.results(1) == [task.last_result]
+        assert task.results(0) == []
+
+        assert not results[0].succeeded
+        assert isinstance(results[0].exception, ValueError)
+        assert results[1].succeeded
+        assert results[1].value == 3
+        assert results[1].attempt == 1
+        assert results[1].duration >= timedelta(0)
+        assert results[0].scheduled < results[1].scheduled
+
+    def test_run_task__next_future(self):
+        values = iter([1, ValueError("Job failed.")])
+
+        def test_func():
+            """Job used for testing."""
+            value = next(values)
+            if isinstance(value, Exception):
+                raise value
+            return value
+
+        task = Task(job=test_func)
+        future = task.next_future()
+        task.period(1).start_at(datetime.now() + timedelta(seconds=1))
+        task.start()
+
+        assert future.result(timeout=3) == 1
+        with pytest.raises(ValueError):
+            task.next_future().result(timeout=3)
+
+        future = task.next_future()
+        task.stop()
+        time.sleep(1.5)
+        assert future.cancelled()
+
+    def test_run_task__next_future_retry_and_timeout(self, monitor_handler):
+
+        def test_func():
+            """Job used for testing."""
+            Monitor.monitor += 1
+            if Monitor.monitor < 2:
+                raise ValueError("Job failed.")
+            return Monitor.monitor
+
+        task = Task(job=test_func,
+                    retry=RetryPolicy(max_attempts=3, base_delay=0))
+        future = task.next_future()
+        task.period(60).start()
+
+        # Resolved by the successful retry.
+        assert future.result(timeout=3) == 2
+        assert [result.attempt for result in task.results()] == [1, 2]
+        task.stop()
+
+        task = Task(job=time.sleep, args=(10,), timeout=0.5,
+                    executor="process")
+        future = task.next_future()
+        task.period(60).start()
+
+        with pytest.raises(TimeoutError):
+            future.result(timeout=3)
+        assert task.last_result.timed_out
+        task.stop()
+
+    def test_run_task__profile(self):
+
+        def slow_inner(seconds):
+            """Slow part of the job."""
+            time.sleep(seconds)
+
+        durations = iter([0, 0.5])
+
+        def test_func():
+            """Job used for testing."""
+            slow_inner(next(durations))
+
+        task = Task(job=test_func, profile_slower_than=0.2)
+        assert task._profile_slower_than == timedelta(seconds=0.2)
+
+        task.period(1)
+        task.start()
+        time.sleep(2)
+        task.stop()
+
+        assert task.stats["profiled"] == 1
+        profile = task.profile
+        assert len(profile) == 1
+        stack, samples = profile.popitem()
+        assert stack.endswith(":test_func;{}:slow_inner".format(__file__))
+        assert samples >= 10
+
+        with pytest.raises(TimeFormatError):
+            Task(job=test_func, profile_slower_than="1")
+
+    def test_profile_bounded(self):
+        task = Task(job=lambda *args, **kwargs: None)
+        task.PROFILE_MAX_STACKS = 2
+
+        for stack in ("a", "a;b", "a;c", "a;d", "a"):
+            task._add_sample(stack)
+
+        assert task.profile == {"a": 2, "a;b": 1, "[other]": 2}
+
+    def test_concurrent_stop_and_pause(self):
+        manager = ScheduleManager()
+        task = manager.register_task(name="test",
+                                     job=lambda *args, **kwargs: None)
+        task.period(60).start()
+
+        results = list()
+        barrier = threading.Barrier(8)
+
+        def control(method):
+            """Stop or pause the task."""
+            barrier.wait()
+            try:
+                method()
+                results.append(method.__name__)
+            except OperationFailError:
+                pass
+
+        threads = [threading.Thread(target=control,
+                                    args=(task.pause if i % 2 else task.stop,))
+                   for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Only one control takes effect.
+        assert len(results) == 1
+        assert task._pause_task == (results[0] == "pause")
+
+    def test_concurrent_stats(self):
+        task = Task(job=lambda *args, **kwargs: None)
+
+        def count():
+            """Update a counter."""
+            for _ in range(10000):
+                task._count("failed")
+
+        threads = [threading.Thread(target=count) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert task.stats["failed"] == 40000
+
+    def test_period_sub_second(self):
+        task = Task(job=lambda *args, **kwargs: None)
+
+        task.period(0.05)
+        assert task._periodic == timedelta(milliseconds=50)
+
+        task.period(timedelta(milliseconds=200))
+        assert task._periodic == timedelta(milliseconds=200)
+
+        for interval in (0, -1, timedelta(0), None):
+            with pytest.raises(TimeFormatError):
+                task.period(interval)
+        assert task._periodic == timedelta(milliseconds=200)
+
+        task.delay(0.5)
+        assert task._delay == timedelta(milliseconds=500)
+
+    def test_run_task__sub_second(self, monitor_handler):
+
+        def test_func():
+            """Job used for testing."""
+            Monitor.monitor += 1
+
+        task = Task(job=test_func)
+        task.period(0.1)
+        task.start()
+        time.sleep(1.05)
+        task.stop()
+
+        assert 9 <= Monitor.monitor <= 11
+        assert task.stats["coalesced"] == 0
+
+    def test_run_task__catch_up(self, monitor_handler):
+
+        def test_func():
+            """Job used for testing."""
+            Monitor.monitor += 1
+            if Monitor.monitor == 1:
+                time.sleep(0.3)
+
+        task = Task(job=test_func, misfire_policy="run_all")
+        task.period(0.05)
+        task.start()
+        time.sleep(1.05)
+        task.stop()
+
+        # Runs missed by the slow run are started at once.
+        assert Monitor.monitor >= 15
+
+    def test_run_task__precise(self):
+        task = Task(job=lambda *args, **kwargs: None, precise=True,
+                    keep_results=100)
+        task.period(0.05)
+        task.start()
+        time.sleep(1)
+        task.stop()
+
+        results = task.results()
+        assert len(results) >= 15
+
+        lateness = [result.started - result.scheduled
+                    for result in results[1:]]
+        assert min(lateness) >= timedelta(0)
+        assert max(lateness) < timedelta(milliseconds=100)
+        # Run time is anchored, so runs do not drift.
+        for previous, result in zip(results, results[1:]):
+            interval = result.scheduled - previous.scheduled
+            assert interval % timedelta(milliseconds=50) == timedelta(0)
+
+    def test_max_instances(self):
+        release = threading.Event()
+        calls = list()
+
+        def test_func(cancel_token):
+            """Job used for testing."""
+            calls.append(cancel_token)
+            release.wait(10)
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            task = Task(job=test_func, executor=executor, max_instances=2)
+            task.period(0.2)
+            task.start()
+            time.sleep(1.1)
+
+            assert len(calls) == 2
+            assert len(task._in_flight) == 2
+            assert task.stats["overlapped"] >= 2
+
+            release.set()
+            task.stop()
+            task.join()
+
+    def test_max_instances_timed_out(self):
+        release = threading.Event()
+        calls = list()
+
+        def test_func():
+            """Job used for testing."""
+            calls.append(datetime.now())
+            release.wait(10)
+
+        threads = threading.active_count()
+        task = Task(job=test_func, timeout=0.2, max_instances=1)
+        task.period(0.25)
+        task.start()
+        time.sleep(2)
+
+        # Hung job keeps its thread, so no more runs are started.
+        assert len(calls) == 1
+        assert task.stats["timed_out"] == 1
+        assert task.stats["overlapped"] >= 4
+        assert threading.active_count() <= threads + 2
+
+        release.set()
+        time.sleep(1)
+        assert len(calls) >= 2
+
+        task.stop()
+        task.join()
+
+    def test_overflow_policy_queue_one(self):
+        release = threading.Event()
+        calls = list()
+
+        def test_func():
+            """Job used for testing."""
+            calls.append(datetime.now())
+            release.wait(10)
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            task = Task(job=test_func, executor=executor,
+                        overflow_policy="queue_one")
+            task.period(0.2)
+            task.start()
+            time.sleep(1.1)
+
+            assert len(calls) == 1
+            assert task.stats["queued"] == 1
+            assert task.stats["overlapped"] >= 2
+
+            release.set()
+            time.sleep(1.5)
+            assert len(calls) >= 2
+
+            task.stop()
+            task.join()
+
+    def test_overflow_policy_replace(self):
+        tokens = list()
+
+        def test_func(cancel_token):
+            """Job used for testing."""
+            tokens.append(cancel_token)
+            cancel_token.wait(10)
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            task = Task(job=test_func, executor=executor,
+                        overflow_policy="replace")
+            task.period(0.3)
+            task.start()
+            time.sleep(0.5)
+
+            assert len(tokens) == 2
+            assert tokens[0].cancelled
+            assert not tokens[1].cancelled
+            assert len(task._in_flight) == 1
+            assert task.stats["replaced"] == 1
+            assert isinstance(task.last_result.exception, CancelledError)
+
+            tokens[1].cancel()
+            task.stop()
+            task.join()
+
+    def test_max_instances_argument(self):
+        with pytest.raises(OperationFailError):
+            Task(job=print, max_instances=0)
+
+        with pytest.raises(OperationFailError):
+            Task(job=print, overflow_policy="queue_all")
+
+        task = Task(job=print, max_instances=3, overflow_policy="replace")
+        assert task.max_instances == 3
+        assert task.overflow_policy == "replace"
+
+    def test_after(self):
+        calls = list()
+        manager = ScheduleManager()
+
+        def record(name):
+            """Job used for testing."""
+            calls.append(name)
+
+        extract = manager.register_task(name="extract", job=record,
+                                        args=("extract",)).period(60)
+        left = manager.register_task(name="left", job=record,
+                                     args=("left",)).after(extract)
+        right = manager.register_task(name="right", job=record,
+                                      args=("right",)).after("extract")
+        load = manager.register_task(name="load", job=record,
+                                     args=("load",)).after(left, right)
+
+        assert load.upstream == ("left", "right")
+        assert manager._view().downstream("extract") == (left, right)
+
+        for task in (load, left, right):
+            task.start()
+        extract.start()
+        time.sleep(0.5)
+
+        assert calls[0] == "extract"
+        assert sorted(calls[1:3]) == ["left", "right"]
+        assert calls[3:] == ["load"]
+        assert load.next_run == extract.last_result.scheduled
+
+        for task in (extract, left, right, load):
+            task.stop()
+
+    def test_after_failed(self):
+        calls = list()
+        manager = ScheduleManager()
+
+        upstream = manager.register_task(name="upstream", job=int,
+                                         args=("x",)).period(60)
+        downstream = manager.register_task(job=calls.append,
+                                           args=(1,)).after(upstream)
+        downstream.start()
+        upstream.start()
+        time.sleep(0.5)
+
+        assert calls == []
+
+        upstream.stop()
+        downstream.stop()
+
+    def test_after_coalesce(self):
+        release = threading.Event()
+        calls = list()
+
+        def test_func():
+            """Job used for testing."""
+            calls.append(None)
+            release.wait(10)
+
+        manager = ScheduleManager()
+        upstream = manager.register_task(name="upstream", job=int)
+        downstream = manager.register_task(job=test_func).after("upstream")
+        downstream.start()
+
+        scheduled = datetime.now()
+        for index in range(3):
+            downstream._trigger("upstream",
+                                scheduled + timedelta(seconds=index))
+            time.sleep(0.2)
+
+        release.set()
+        time.sleep(0.3)
+
+        assert len(calls) == 2
+        assert downstream.stats["coalesced"] == 1
+        assert downstream.next_run == scheduled + timedelta(seconds=2)
+
+        downstream.stop()
+        assert upstream.upstream == ()
+
+    def test_after_cycle(self):
+        manager = ScheduleManager()
+        first = manager.register_task(name="first", job=int)
+        second = manager.register_task(name="second", job=int).after(first)
+        third = manager.register_task(name="third", job=int).after(second)
+
+        with pytest.raises(OperationFailError):
+            first.after(third)
+        with pytest.raises(OperationFailError):
+            first.after("first")
+        with pytest.raises(OperationFailError):
+            first.after()
+        assert first.upstream == ()
+
+        with pytest.raises(OperationFailError):
+            Task(name="task", job=int).after("task")
+
+        task = Task(name="first", job=int).after("third")
+        manager.unregister("first")
+        with pytest.raises(OperationFailError):
+            manager.register(task)
+
+        group = TaskGroup([manager.register_task(job=int),
+                           manager.register_task(job=int)])
+        group.after(third, "second")
+        for member in group:
+            assert member.upstream == ("third", "second")
+
+    def test_after_pause(self):
+        manager = ScheduleManager()
+        manager.register_task(name="upstream", job=int).period(60)
+        task = manager.register_task(name="downstream",
+                                     job=int).after("upstream")
+        task.start()
+        task.pause()
+        task.join()
+
+        assert manager.task("downstream").upstream == ("upstream",)
+
+    def test_upcoming(self):
+        task = Task(job=int).period(30)
+        with FakeDatetime(2021, 1, 31, 23, 59, 0):
+            assert list(task.upcoming(3)) == [
+                datetime(2021, 1, 31, 23, 59, 0),
+                datetime(2021, 1, 31, 23, 59, 30),
+                datetime(2021, 2, 1, 0, 0, 0)]
+
+            task.delay(60)
+            assert next(task.upcoming()) == datetime(2021, 2, 1, 0, 0, 0)
+
+            task.period_month_at("12:00:00", day=31).nonperiodic(2)
+            assert list(task.upcoming()) == [
+                datetime(2021, 3, 31, 12, 0, 0),
+                datetime(2021, 5, 31, 12, 0, 0)]
+
+            task.period_week_at("08:00:00", week_day="Monday").periodic()
+            assert list(task.upcoming(2)) == [
+                datetime(2021, 2, 1, 8, 0, 0),
+                datetime(2021, 2, 8, 8, 0, 0)]
+
+        assert task._next_run is None
+
+        task._next_run = datetime(2021, 2, 1, 8, 0, 0)
+        assert list(task.upcoming(1)) == [datetime(2021, 2, 1, 8, 0, 0)]
+        assert list(Task(job=int).upcoming()) == []
+        assert list(Task(job=int).after("other").upcoming()) == []
+
+    def test_period_at_timezone(self):
+        zone = timezone.get_zone("Europe/Berlin")
+        task = Task(job=int).period_day_at("02:30:00", tz="Europe/Berlin")
+        assert task.tz is zone
+
+        # Clocks are turned forward at 02:00 on 2024-03-31.
+        task._next_run = timezone.to_local(zone, datetime(2024, 3, 30, 2, 30))
+        runs = list(task.upcoming(3))
+        assert [timezone.to_wall(zone, run) for run in runs] == [
+            datetime(2024, 3, 30, 2, 30),
+            datetime(2024, 3, 31, 3, 30),
+            datetime(2024, 4, 1, 2, 30)]
+
+        # Clocks are turned back at 03:00 on 2024-10-27.
+        task._next_run = timezone.to_local(zone,
+                                           datetime(2024, 10, 26, 2, 30))
+        runs = list(task.upcoming(3))
+        assert [timezone.to_wall(zone, run) for run in runs] == [
+            datetime(2024, 10, 26, 2, 30),
+            datetime(2024, 10, 27, 2, 30),
+            datetime(2024, 10, 28, 2, 30)]
+        assert [later.timestamp() - earlier.timestamp()
+                for earlier, later in zip(runs, runs[1:])] == [
+                    24 * 3600, 25 * 3600]
+
+        task.period_month_at("09:00:00", day=31, tz=zone)
+        run = task._first_run(
+            timezone.to_local(zone, datetime(2024, 4, 1, 12, 0)))
+        assert timezone.to_wall(zone, run) == datetime(2024, 5, 31, 9, 0)
+        assert timezone.to_wall(zone, task._step_run(run)) == datetime(
+            2024, 7, 31, 9, 0)
+
+        task.period_week_at("23:00:00", week_day="Sunday", tz="Asia/Tokyo")
+        run = task._first_run(timezone.to_local(
+            task.tz, datetime(2024, 3, 27, 0, 0)))
+        assert timezone.to_wall(task.tz, run) == datetime(2024, 3, 31, 23, 0)
+
+        with pytest.raises(OperationFailError):
+            task.period_day_at("02:30:00", tz="Mars/Olympus")
+
+    def test_timezone_transitions(self, mocker):
+        zone = timezone.get_zone("America/New_York")
+        table = timezone._transitions(zone)
+        assert timezone._transitions(zone) is table
+
+        timezone.to_local(zone, datetime(2023, 6, 1, 12, 0))
+        stamps, offsets = table._years[2023]
+        assert offsets == [-5 * 3600, -4 * 3600, -5 * 3600]
+        assert len(stamps) == 3
+
+        query = mocker.spy(table, "_query")
+        for day in range(1, 29):
+            local = timezone.to_local(zone, datetime(2023, 2, day, 8, 0))
+            assert timezone.to_wall(zone, local) == datetime(2023, 2, day,
+                                                             8, 0)
+        assert query.call_count == 0
+
+    def test_run_now(self):
+        calls = list()
+        task = Task(job=calls.append, args=(1,)).period(60)
+
+        with pytest.raises(OperationFailError):
+            task.run_now()
+
+        task.start()
+        time.sleep(0.3)
+        next_run = task.next_run
+        scheduled = task.run_now()
+        future = task.next_future()
+        assert future.result(timeout=3) is None
+
+        assert len(calls) == 2
+        assert task.last_result.scheduled == scheduled
+        assert task.next_run == next_run
+
+        task.stop()
+
+    def test_run_now_delayed(self):
+        calls = list()
+        task = Task(job=calls.append, args=(1,)).period(60).delay(60)
+        task.start()
+        time.sleep(0.3)
+
+        task.run_now()
+        time.sleep(1.2)
+        assert calls == [1]
+        assert task._next_run is None
+
+        task.run_now()
+        task.stop()
+        assert not task._adhoc
+        task.join(3)
+        assert calls == [1]
+
+
+class TestScheduleManager:
+    """Test ScheduleManager object."""
+
+    def test_register_task(self):
+        task = Task(name="test_task", job=lambda *args, **kwargs: None)
+        manager = ScheduleManager()
+        manager.register(task)
+
+        assert "test_task" in manager._tasks
+        assert task is manager._tasks["test_task"]
+        assert task.manager is manager
+
+    def test_register_task_duplicate_name(self):
+        task = Task(name="test_task", job=lambda *args, **kwargs: None)
+        task2 = Task(name="test_task", job=lambda *args, **kwargs: None)
+        manager = ScheduleManager()
+        manager.register(task)
+
+        with pytest.raises(TaskNameDuplicateError):
+            manager.register(task2)
+
+    def test_register_task_by_name(self):
+        manager = ScheduleManager()
+        manager.register_task(name="test", job=lambda *args, **kwargs: None)
+
+        assert "test" in manager._tasks
+        assert isinstance(manager._tasks["test"], Task)
+        assert manager._tasks["test"].manager is manager
+
+    def test_register_task_without_giving_name(self):
+        manager = ScheduleManager()
+        manager.register_task(job=lambda *args, **kwargs: None)
+        task_name = list(manager._tasks.keys())[0]
+
+        assert task_name.startswith("Task-")
+
+    def test_register_task_by_name_duplicate_name(self):
+        manager = ScheduleManager()
+        manager.register_task(name="test", job=lambda *args, **kwargs: None)
+
+        with pytest.raises(TaskNameDuplicateError):
+            manager.register_task(name="test",
+                                  job=lambda *args, **kwargs: None)
+
+    def test_property_count(self):
+        manager = ScheduleManager()
+        manager.register_task(name="test", job=lambda *args, **kwargs: None)
+        manager.register_task(name="test2", job=lambda *args, **kwargs: None)
+        manager.register_task(name="test3", job=lambda *args, **kwargs: None)
+
+        assert manager.count == len(manager._tasks)
+
+    def test_unregister_task_by_name(self):
+        task1 = Task(name="test_task1", job=lambda *args, **kwargs: None)
+        task2 = Task(name="test_task2", job=lambda *args, **kwargs: None)
+        task3 = Task(name="test_task3", job=lambda *args, **kwargs: None)
+        manager = ScheduleManager()
+        manager.register(task1)
+        manager.register(task2)
+        manager.register(task3)
+
+        assert manager.count == 3
+        manager.unregister(name="test_task2")
+        assert manager.count == 2
+        assert "test_task1" in manager._tasks
+        assert task1.manager is manager
+        assert "test_task2" not in manager._tasks
+        assert task2.manager is None
+        assert "test_task3" in manager._tasks
+        assert task3.manager is manager
+
+    def test_unregister_task_by_tag(self):
+        task1 = Task(name="test_task1", job=lambda *args, **kwargs: None)
+        task2 = Task(name="test_task2", job=lambda *args, **kwargs: None)
+        task3 = Task(name="test_task3", job=lambda *args, **kwargs: None)
+        task4 = Task(name="test_task4", job=lambda *args, **kwargs: None)
+        manager = ScheduleManager()
+        manager.register(task1)
+        manager.register(task2)
+        manager.register(task3)
+        manager.register(task4)
+        task1.add_tag(1)
+        task2.add_tag(2)
+        task3.add_tag(3)
+        task4.add_tag(2)
+
+        assert manager.count == 4
+        manager.unregister(tag=2)
+        assert manager.count == 2
+        assert "test_task1" in manager._tasks
+        assert task1.manager is manager
+        assert "test_task2" not in manager._tasks
+        assert task2.manager is None
+        assert "test_task3" in manager._tasks
+        assert task3.manager is manager
+        assert "test_task4" not in manager._tasks
+        assert task4.manager is None
+
+    def test_unregister_task_by_tags(self):
+        task1 = Task(name="test_task1", job=lambda *args, **kwargs: None)
+        task2 = Task(name="test_task2", job=lambda *args, **kwargs: None)
+        task3 = Task(name="test_task3", job=lambda *args, **kwargs: None)
+        task4 = Task(name="test_task4", job=lambda *args, **kwargs: None)
+        task5 = Task(name="test_task5", job=lambda *args, **kwargs: None)
+        manager = ScheduleManager()
+        manager.register(task1)
+        manager.register(task2)
+        manager.register(task3)
+        manager.register(task4)
+        manager.register(task5)
+        task1.add_tag(1)
+        task2.add_tag(2)
+        task3.add_tag(3)
+        task4.add_tag(2)
+        task5.add_tag("tag")
+
+        assert manager.count == 5
+        manager.unregister(tag=[2, "tag"])
+        assert manager.count == 2
+        assert "test_task1" in manager._tasks
+        assert task1.manager is manager
+        assert "test_task2" not in manager._tasks
+        assert task2.manager is None
+        assert "test_task3" in manager._tasks
+        assert task3.manager is manager
+        assert "test_task4" not in manager._tasks
+        assert task4.manager is None
+        assert "test_task5" not in manager._tasks
+        assert task5.manager is None
+
+    def test_unregister_task_by_both_name_tags(self):
+        task1 = Task(name="test_task1", job=lambda *args, **kwargs: None)
+        task2 = Task(name="test_task2", job=lambda *args, **kwargs: None)
+        task3 = Task(name="test_task3", job=lambda *args, **kwargs: None)
+        task4 = Task(name="test_task4", job=lambda *args, **kwargs: None)
+        task5 = Task(name="test_task5", job=lambda *args, **kwargs: None)
+        task6 = Task(name="test_task6", job=lambda *args, **kwargs: None)
+        manager = ScheduleManager()
+        manager.register(task1)
+        manager.register(task2)
+        manager.register(task3)
+        manager.register(task4)
+        manager.register(task5)
+        manager.register(task6)
+        task1.add_tag(1)
+        task2.add_tag(2)
+        task3.add_tag(3)
+        task4.add_tag(2)
+        task5.add_tag("tag")
+
+        assert manager.count == 6
+        manager.unregister(name="test_task6", tag=[2, "tag"])
+        assert manager.count == 2
+        assert "test_task1" in manager._tasks
+        assert task1.manager is manager
+        assert "test_task2" not in manager._tasks
+        assert task2.manager is None
+        assert "test_task3" in manager._tasks
+        assert task3.manager is manager
+        assert "test_task4" not in manager._tasks
+        assert task4.manager is None
+        assert "test_task5" not in manager._tasks
+        assert task5.manager is None
+        assert "test_task6" not in manager._tasks
+        assert task6.manager is None
+
+    def test_get_task(self):
+        task1 = Task(name="test_task1", job=lambda *args, **kwargs: None)
+        task2 = Task(name="test_task2", job=lambda *args, **kwargs: None)
+        task3 = Task(name="test_task3", job=lambda *args, **kwargs: None)
+        manager = ScheduleManager()
+        manager.register(task1)
+        manager.register(task2)
+        manager.register(task3)
+        task1.add_tag(1)
+        task2.add_tag(2)
+        task3.add_tag(3)
+
+        assert manager.task("test_task3") is task3
+
+    def test_get_unregistered_task(self):
+        task1 = Task(name="test_task1", job=lambda *args, **kwargs: None)
+        task2 = Task(name="test_task2", job=lambda *args, **kwargs: None)
+        task3 = Task(name="test_task3", job=lambda *args, **kwargs: None)
+        manager = ScheduleManager()
+        manager.register(task1)
+        manager.register(task2)
+        manager.register(task3)
+        task1.add_tag(1)
+        task2.add_tag(2)
+        task3.add_tag(3)
+
+        with pytest.raises(TaskNotFoundError):
+            manager.task("test")
+
+    def test_get_tasks(self):
+        task1 = Task(name="test_task1", job=lambda *args, **kwargs: None)
+        task2 = Task(name="test_task2", job=lambda *args, **kwargs: None)
+        task3 = Task(name="test_task3", job=lambda *args, **kwargs: None)
+        task4 = Task(name="test_task4", job=lambda *args, **kwargs: None)
+        manager = ScheduleManager()
+        manager.register(task1)
+        manager.register(task2)
+        manager.register(task3)
+        manager.register(task4)
+        task1.add_tag(1)
+        task2.add_tag(2)
+        task3.add_tag(3)
+        task4.add_tag(2)
+        task_list = manager.tasks(2)
+
+        assert len(task_list._tasks) == 2
+        assert task1 not in task_list
+        assert task2 in task_list
+        assert task3 not in task_list
+        assert task4 in task_list
+
+    def test_get_tasks_by_tags(self):
+        task1 = Task(name="test_task1", job=lambda *args, **kwargs: None)
+        task2 = Task(name="test_task2", job=lambda *args, **kwargs: None)
+        task3 = Task(name="test_task3", job=lambda *args, **kwargs: None)
+        task4 = Task(name="test_task4", job=lambda *args, **kwargs: None)
+        manager = ScheduleManager()
+        manager.register(task1)
         manager.register(task2)
         manager.register(task3)
         manager.register(task4)
@@ -3378,6 +4340,350 @@ class TestScheduleManager:
             assert manager.task("test")._periodic == task._periodic
             assert manager.task("test")._delay == timedelta(seconds=40)
 
+    def test_batch_tasks(self):
+        calls = list()
+
+        def test_func(batch):
+            """Job used for testing."""
+            calls.append(batch)
+            return len(batch)
+
+        manager = ScheduleManager()
+        scheduled = datetime.now().replace(microsecond=0)
+        tasks = list()
+        for index in range(5):
+            task = manager.register_task(job=test_func, args=(index,),
+                                         batch=True)
+            task.period(60)
+            task._next_run = scheduled
+            tasks.append(task)
+        alone = manager.register_task(job=test_func, args=("alone",),
+                                      batch=True).period(60)
+
+        for task in tasks:
+            task.start()
+        time.sleep(0.5)
+        alone.start()
+        time.sleep(0.5)
+
+        assert len(calls) == 2
+        assert sorted(calls[0]) == [(index,) for index in range(5)]
+        assert calls[1] == [("alone",)]
+        assert [task.last_result.value for task in tasks] == [5] * 5
+        assert sum(task.stats["batched"] for task in tasks) == 4
+
+        for task in tasks + [alone]:
+            task.stop()
+
+    def test_batch_task_alone(self):
+        calls = list()
+
+        manager = ScheduleManager()
+        task = manager.register_task(job=calls.append, args=("alone",),
+                                     batch=True)
+        # No other batch task is due, so the run does not wait.
+        task.BATCH_WINDOW = 5
+        task.period(60).start()
+        time.sleep(0.5)
+
+        assert calls == [[("alone",)]]
+        task.stop()
+
+    def test_batch_task_failed(self):
+
+        def test_func(batch):
+            """Job used for testing."""
+            raise ValueError(len(batch))
+
+        manager = ScheduleManager()
+        scheduled = datetime.now()
+        tasks = [manager.register_task(job=test_func, args=(index,),
+                                       batch=True).period(60)
+                 for index in range(2)]
+        for task in tasks:
+            task._next_run = scheduled
+        for task in tasks:
+            task.start()
+        time.sleep(0.5)
+
+        for task in tasks:
+            assert task.stats["failed"] == 1
+            assert task.last_result.exception.args == (2,)
+            task.stop()
+
+    def test_batch_argument(self):
+        with pytest.raises(OperationFailError):
+            Task(job=print, kwargs={"end": ""}, batch=True)
+
+        with pytest.raises(OperationFailError):
+            Task(job=print, executor="process", batch=True)
+
+    def test_rate_limit(self):
+        calls = list()
+
+        def test_func():
+            """Job used for testing."""
+            calls.append(time.monotonic())
+
+        manager = ScheduleManager()
+        manager.set_rate_limit("api", rate=5, burst=2)
+        tasks = list()
+        for _ in range(4):
+            task = manager.register_task(job=test_func).period(60)
+            task.add_tag("api")
+            tasks.append(task)
+        free = manager.register_task(job=int).period(60)
+        free.add_tag("other")
+
+        start = time.monotonic()
+        for task in tasks + [free]:
+            task.start()
+        time.sleep(1)
+
+        # 2 runs at once, then a run every 0.2 seconds.
+        assert len(calls) == 4
+        assert sorted(calls)[-1] - start >= 0.35
+        assert sum(task.stats["throttled"] for task in tasks) == 2
+        throttled = sorted(task.last_result.throttled for task in tasks)
+        assert throttled[:2] == [timedelta(0)] * 2
+        assert timedelta(seconds=0.1) < throttled[3] < timedelta(seconds=1)
+        assert free.stats["throttled"] == 0
+
+        for task in tasks + [free]:
+            task.stop()
+
+    def test_rate_limit_removed(self):
+        manager = ScheduleManager()
+        manager.set_rate_limit("api", rate=1)
+        task = manager.register_task(job=int).add_tag("api")
+        task.add_tag(["unhashable"])
+
+        assert manager._reserve(task)[0] == 0
+        assert 0.9 < manager._reserve(task)[0] <= 1
+        manager.set_rate_limit("api")
+        assert manager._reserve(task) == (0, [])
+
+        with pytest.raises(OperationFailError):
+            manager.set_rate_limit("api", rate=0)
+        with pytest.raises(OperationFailError):
+            manager.set_rate_limit("api", rate=1, burst=0)
+
+    def test_rate_limit_stop(self):
+        manager = ScheduleManager()
+        manager.set_rate_limit("api", rate=0.1)
+        manager._reserve(Task(job=int).add_tag("api"))
+        task = manager.register_task(job=int).period(60).add_tag("api")
+        task.start()
+        time.sleep(0.2)
+        task.stop()
+        task.join(3)
+
+        assert not task.is_alive()
+        assert task.last_result is None
+
+        # Token of the abandoned run is refunded.
+        assert manager._reserve(task)[0] <= 10
+
+    def test_load_shedding(self):
+        policy = LoadSheddingPolicy(lag_threshold=1, smoothing=1,
+                                    min_priority=5)
+        manager = ScheduleManager(shedding=policy)
+        events = list()
+        changes = list()
+        manager.on("shed", events.append)
+        manager.on("shedding_started", changes.append)
+        manager.on("shedding_stopped", changes.append)
+
+        sheddable = manager.register_task(job=int).add_tag("sheddable")
+        low = manager.register_task(job=int, priority=5)
+        normal = manager.register_task(job=int)
+
+        time_now = datetime.now()
+        for task in (sheddable, low, normal):
+            task._next_run = time_now - timedelta(seconds=2)
+
+        assert not normal._shed(time_now)
+        assert policy.active
+        assert policy.lag == 2
+        assert [sheddable._shed(time_now) for _ in range(4)] == [
+            True, False, True, False]
+        assert low._shed(time_now)
+
+        assert sheddable.stats["shed"] == 2
+        assert low.stats["shed"] == 1
+        assert normal.stats["shed"] == 0
+        manager._events.join(5)
+        assert [event.task for event in events] == [sheddable, sheddable,
+                                                    low]
+        assert events[0].scheduled == time_now - timedelta(seconds=2)
+
+        low._next_run = time_now
+        assert not low._shed(time_now)
+        assert not policy.active
+
+        manager._events.join(5)
+        assert [(event.name, event.task) for event in changes] == [
+            ("shedding_started", normal), ("shedding_stopped", low)]
+
+    def test_load_shedding_run(self):
+        manager = ScheduleManager(
+            shedding=LoadSheddingPolicy(lag_threshold=1, smoothing=1,
+                                        min_priority=1))
+        task = manager.register_task(job=int, priority=1).period(60)
+        task._next_run = datetime.now() - timedelta(seconds=5)
+        task.start()
+        time.sleep(0.3)
+
+        assert task.stats["shed"] == 1
+        assert task.last_result is None
+        assert task.next_run > datetime.now()
+
+        task.stop()
+
+    def test_upcoming(self):
+        manager = ScheduleManager()
+        fast = manager.register_task(job=int, name="fast").period(20)
+        slow = manager.register_task(job=int, name="slow").period(45)
+        manager.register_task(job=int, name="pending").period(10)
+
+        time_now = datetime.now()
+        fast._next_run = time_now + timedelta(seconds=10)
+        slow._next_run = time_now + timedelta(seconds=5)
+        fast._start = slow._start = True
+
+        runs = [(run - time_now, task.name)
+                for run, task in manager.upcoming(until=60)]
+        assert runs == [(timedelta(seconds=5), "slow"),
+                        (timedelta(seconds=10), "fast"),
+                        (timedelta(seconds=30), "fast"),
+                        (timedelta(seconds=50), "fast"),
+                        (timedelta(seconds=50), "slow")]
+
+        runs = manager.upcoming()
+        assert [task.name for _, task in itertools.islice(runs, 7)] == [
+            "slow", "fast", "fast", "fast", "slow", "fast", "fast"]
+
+        until = time_now + timedelta(seconds=10)
+        assert len(list(manager.upcoming(until=until))) == 2
+
+        with pytest.raises(TimeFormatError):
+            manager.upcoming(until="1 hour")
+
+    def test_snapshot(self):
+        manager = ScheduleManager()
+        task1 = manager.register_task(name="task1",
+                                      job=lambda *args, **kwargs: None)
+        task2 = manager.register_task(name="task2",
+                                      job=lambda *args, **kwargs: None)
+        task1.add_tag("tag")
+
+        # Queries share the snapshot until the next change.
+        tasks = manager.all_tasks._tasks
+        assert tasks == (task1, task2)
+        assert manager.all_tasks._tasks is tasks
+        assert manager.tasks("tag")._tasks is manager.tasks("tag")._tasks
+        assert list(manager) == ["task1", "task2"]
+
+        task2.add_tag("tag")
+        assert manager.tasks("tag")._tasks == (task1, task2)
+
+        task1.remove_tag("tag")
+        assert manager.tasks("tag")._tasks == (task2,)
+
+        manager.unregister("task2")
+        assert manager.all_tasks._tasks == (task1,)
+        assert manager.tasks("tag").count == 0
+
+        task3 = manager.register_task(name="task3",
+                                      job=lambda *args, **kwargs: None)
+        task3.set_tags([["unhashable"], "tag"])
+        assert manager.all_tasks._tasks == (task1, task3)
+        assert manager.tasks([["unhashable"]])._tasks == [task3]
+        assert (manager.tasks(["tag", ["unhashable"]]) + manager.all_tasks
+                ).count == 3
+
+    def test_concurrent_mutations(self):
+        manager = ScheduleManager()
+        errors = list()
+        stop = threading.Event()
+
+        def register_worker(index):
+            """Register tasks which unregister themselves when finished."""
+            count = 0
+            while not stop.is_set():
+                count += 1
+                try:
+                    task = manager.register_task(
+                        name="task-{}-{}".format(index, count),
+                        job=lambda *args, **kwargs: None)
+                    task.add_tag("tag-{}".format(count % 3))
+                    if count % 2:
+                        task.period(60).nonperiodic(1).start()
+                    else:
+                        manager.unregister(name=task.name)
+                except Exception as error:    # pylint: disable=W0703
+                    errors.append(error)
+
+        def unregister_worker():
+            """Unregister tasks by tag."""
+            while not stop.is_set():
+                try:
+                    manager.unregister(tag=["tag-0"])
+                except Exception as error:    # pylint: disable=W0703
+                    errors.append(error)
+
+        def query_worker():
+            """Query tasks."""
+            while not stop.is_set():
+                try:
+                    manager.all_tasks.count
+                    manager.running_tasks.count
+                    manager.pending_tasks.count
+                    manager.tasks(["tag-1", "tag-2"]).count
+                    list(manager)
+                    repr(manager)
+                except Exception as error:    # pylint: disable=W0703
+                    errors.append(error)
+
+        threads = [threading.Thread(target=register_worker, args=(index,))
+                   for index in range(4)]
+        threads.append(threading.Thread(target=unregister_worker))
+        threads.extend(threading.Thread(target=query_worker)
+                       for _ in range(4))
+        for thread in threads:
+            thread.start()
+
+        time.sleep(2)
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+
+        # Finished tasks unregister themselves.
+        time.sleep(2)
+        assert manager.running_tasks.count == 0
+        for task in manager.all_tasks:
+            assert task.manager is manager
+            assert not task.is_running
+
+    def test_pause_keeps_name(self):
+        manager = ScheduleManager()
+        task = manager.register_task(name="test",
+                                     job=lambda *args, **kwargs: None)
+        task.period(60).start()
+        task.pause()
+
+        # Name is never free while the paused task is registered again.
+        for _ in range(200):
+            with pytest.raises(TaskNameDuplicateError):
+                manager.register_task(name="test",
+                                      job=lambda *args, **kwargs: None)
+            time.sleep(0.01)
+
+        assert manager.task("test") is not task
+        assert not manager.task("test").is_running
+
 
 class TestTaskGroup:
     """Test TaskGroup object."""
@@ -3705,6 +5011,994 @@ class TestTaskGroup:
         assert task2 in task_list1
 
 
+def persisted_job(*args, **kwargs):
+    """Importable job used for testing persistence."""
+
+
+class TestEventBus:
+    """Test task events."""
+
+    def test_on_unknown_event(self):
+        manager = ScheduleManager()
+
+        with pytest.raises(OperationFailError):
+            manager.on("run", print)
+
+    def test_drop_oldest(self):
+        task = Task(job=lambda *args, **kwargs: None)
+        bus = EventBus(maxsize=2)
+        for name in ("start", "paused", "stopped"):
+            bus.emit(TaskEvent(name, task))
+
+        assert bus.dropped == 1
+        assert [event.name for event in bus._queue] == ["paused", "stopped"]
+
+        events = list()
+        for name in EVENTS:
+            bus.on(name, events.append)
+        bus.emit(TaskEvent("start", task))
+
+        assert bus.join(timeout=1)
+        assert [event.name for event in events][-1] == "start"
+
+        bus.off("stopped", events.append)
+        assert not bus.listened("stopped")
+        assert bus.listened("paused")
+
+        bus.close()
+
+    def test_run_events(self, monitor_handler):
+
+        def test_func():
+            """Job used for testing."""
+            Monitor.monitor += 1
+            if Monitor.monitor == 2:
+                raise ValueError("Job failed.")
+
+        def failed_listener(event):
+            """Broken listener."""
+            raise KeyError(event.name)
+
+        events = list()
+        manager = ScheduleManager()
+        for name in EVENTS:
+            manager.on(name, events.append)
+        manager.on("run_started", failed_listener)
+
+        task = manager.register_task(name="task", job=test_func).period(1)
+        task.start()
+        time.sleep(1.5)
+        task.pause()
+        time.sleep(1)
+
+        task = manager.task("task")
+        task.start()
+        time.sleep(0.5)
+        task.stop()
+        time.sleep(1)
+        manager.register_task(name="other", job=test_func)
+        manager.unregister("other")
+
+        assert manager._events.join(timeout=1)
+        names = [event.name for event in events]
+        assert names == ["start",
+                         "run_started", "run_succeeded",
+                         "run_started", "run_failed",
+                         "paused",
+                         "start",
+                         "run_started", "run_succeeded",
+                         "stopped",
+                         "unregistered",
+                         "unregistered"]
+
+        failed = events[4]
+        assert failed.task.name == "task"
+        assert failed.attempt == 1
+        assert isinstance(failed.result.exception, ValueError)
+        assert failed.scheduled == failed.result.scheduled
+
+    def test_skipped_event(self):
+        events = list()
+        manager = ScheduleManager()
+        manager.on("skipped", events.append)
+
+        task = manager.register_task(job=lambda *args, **kwargs: None,
+                                     misfire_policy="skip")
+        task.period(60)
+        task._next_run = datetime.now() - timedelta(seconds=150)
+        task.start()
+        time.sleep(0.5)
+
+        assert manager._events.join(timeout=1)
+        assert [event.count for event in events] == [3]
+
+        task.stop()
+
+    def test_slow_listener(self, monitor_handler):
+
+        def test_func():
+            """Job used for testing."""
+            Monitor.monitor += 1
+
+        manager = ScheduleManager()
+        manager.on("run_started", lambda event: time.sleep(5))
+
+        task = manager.register_task(job=test_func).period(1)
+        task.start()
+        time.sleep(2.5)
+
+        assert Monitor.monitor == 3
+
+        task.stop()
+
+
+class ListTracer:
+    """Tracer keeping spans in a list."""
+
+    def __init__(self):
+        self.spans = list()
+
+    @contextlib.contextmanager
+    def span(self, task, run):
+        """Span around a run."""
+        try:
+            yield {"traceparent": task.name}
+        finally:
+            self.spans.append((task.name, run.attempt, run.exception))
+
+
+class TestTracing:
+    """Test tracing of runs."""
+
+    def test_tracer_without_opentelemetry(self, mocker):
+        mocker.patch.dict(sys.modules, {"opentelemetry": None})
+
+        with pytest.raises(OperationFailError):
+            OpenTelemetryTracer()
+
+    def test_trace_context(self):
+        contexts = list()
+
+        def test_func(trace_context):
+            """Job used for testing."""
+            contexts.append(trace_context)
+            if len(contexts) == 2:
+                raise ValueError("Job failed.")
+
+        tracer = ListTracer()
+        manager = ScheduleManager(tracer=tracer)
+        task = manager.register_task(name="task", job=test_func).period(1)
+        task.start()
+        time.sleep(1.5)
+        task.stop()
+
+        assert contexts == [{"traceparent": "task"}] * 2
+        assert tracer.spans[0] == ("task", 1, None)
+        assert isinstance(tracer.spans[1][2], ValueError)
+
+    def test_trace_context_disabled(self):
+        contexts = list()
+
+        def test_func(trace_context):
+            """Job used for testing."""
+            contexts.append(trace_context)
+
+        task = Task(job=test_func).period(60)
+        task.start()
+        time.sleep(0.5)
+        task.stop()
+
+        assert contexts == [None]
+
+    def test_opentelemetry_span(self):
+        sdk_trace = pytest.importorskip("opentelemetry.sdk.trace")
+        export = pytest.importorskip("opentelemetry.sdk.trace.export")
+        memory = pytest.importorskip(
+            "opentelemetry.sdk.trace.export.in_memory_span_exporter")
+
+        exporter = memory.InMemorySpanExporter()
+        provider = sdk_trace.TracerProvider()
+        provider.add_span_processor(export.SimpleSpanProcessor(exporter))
+
+        contexts = list()
+
+        def test_func(trace_context):
+            """Job used for testing."""
+            contexts.append(trace_context)
+            if len(contexts) == 2:
+                raise ValueError("Job failed.")
+
+        manager = ScheduleManager(
+            tracer=OpenTelemetryTracer(tracer_provider=provider))
+        task = manager.register_task(name="task", job=test_func)
+        task.add_tag("tag").period(1)
+        task.start()
+        time.sleep(1.5)
+        task.stop()
+
+        spans = exporter.get_finished_spans()
+        assert len(spans) == 2
+        assert spans[0].attributes["schedule.task.name"] == "task"
+        assert tuple(spans[0].attributes["schedule.task.tags"]) == ("tag",)
+        assert spans[0].attributes["schedule.run.outcome"] == "succeeded"
+        assert spans[0].attributes["schedule.run.lateness"] >= 0
+        assert spans[1].attributes["schedule.run.outcome"] == "failed"
+        assert not spans[1].status.is_ok
+        assert "traceparent" in contexts[0]
+
+
+class TestPriorityThreadPoolExecutor:
+
+    def test_priority(self):
+        release = threading.Event()
+        order = list()
+        scheduled = datetime.now()
+
+        with PriorityThreadPoolExecutor(max_workers=1, aging=60) as executor:
+            executor.submit(release.wait, 10)
+            futures = [
+                executor.submit_run(5, scheduled, order.append, "low"),
+                executor.submit_run(0, scheduled, order.append, "high"),
+                executor.submit_run(0, scheduled - timedelta(seconds=1),
+                                    order.append, "early"),
+                executor.submit_run(1, scheduled - timedelta(seconds=120),
+                                    order.append, "aged"),
+            ]
+            release.set()
+
+            for future in futures:
+                future.result(timeout=5)
+
+        assert order == ["aged", "early", "high", "low"]
+
+    def test_lateness(self):
+        scheduled = datetime.now() - timedelta(seconds=2)
+
+        with PriorityThreadPoolExecutor() as executor:
+            executor.submit_run(1, scheduled, int).result(timeout=5)
+            executor.submit_run(1, scheduled, int).result(timeout=5)
+            assert executor.submit(int, "3").result(timeout=5) == 3
+
+        lateness = executor.lateness
+        assert lateness[1]["runs"] == 2
+        assert 2 <= lateness[1]["mean"] <= lateness[1]["max"] < 3
+        assert lateness[0]["runs"] == 1
+        assert lateness[0]["max"] < 1
+
+    def test_exception_and_shutdown(self):
+        release = threading.Event()
+        executor = PriorityThreadPoolExecutor(max_workers=1)
+
+        with pytest.raises(ValueError):
+            executor.submit(int, "x").result(timeout=5)
+
+        executor.submit(release.wait, 10)
+        queued = executor.submit(int)
+        executor.shutdown(wait=False, cancel_futures=True)
+        release.set()
+
+        assert queued.cancelled()
+        with pytest.raises(RuntimeError):
+            executor.submit(int)
+
+    def test_argument(self):
+        with pytest.raises(OperationFailError):
+            PriorityThreadPoolExecutor(max_workers=0)
+
+        with pytest.raises(OperationFailError):
+            PriorityThreadPoolExecutor(aging=0)
+
+    def test_task_priority(self):
+        release = threading.Event()
+        order = list()
+
+        with PriorityThreadPoolExecutor(max_workers=1) as executor:
+            executor.submit(release.wait, 10)
+
+            scheduled = datetime.now()
+            tasks = list()
+            for priority in (3, 1, 2):
+                task = Task(job=order.append, args=(priority,),
+                            executor=executor, priority=priority)
+                task.period(60)
+                task._next_run = scheduled
+                tasks.append(task)
+                task.start()
+            time.sleep(0.5)
+
+            release.set()
+            time.sleep(0.5)
+            assert order == [1, 2, 3]
+            assert executor.lateness[1]["runs"] == 1
+
+            for task in tasks:
+                assert task.priority in (1, 2, 3)
+                task.stop()
+
+
+class TestAdminServer:
+    """Test admin HTTP API."""
+
+    @staticmethod
+    def request(server, path, method="GET", token=None):
+        """Send a request and return status and JSON body."""
+        url = "http://{}:{}{}".format(*server.address, path)
+        request = urllib.request.Request(url, method=method)
+        if token is not None:
+            request.add_header("Authorization", "Bearer {}".format(token))
+
+        try:
+            with urllib.request.urlopen(request, timeout=5) as response:
+                return response.status, json.loads(response.read())
+        except urllib.error.HTTPError as error:
+            return error.code, json.loads(error.read())
+
+    def test_query(self):
+        manager = ScheduleManager()
+        task = manager.register_task(name="report", job=int, priority=2)
+        task.period(60).add_tag("daily").start()
+        manager.register_task(name="idle", job=int).add_tag("adhoc")
+        time.sleep(0.3)
+
+        server = AdminServer(manager, port=0).start()
+        try:
+            status, body = self.request(server, "/tasks")
+            assert status == 200
+            assert [item["name"] for item in body] == ["report", "idle"]
+            assert body[0]["running"]
+            assert body[0]["priority"] == 2
+            assert body[0]["next_run"] == task.next_run.isoformat()
+
+            status, body = self.request(server, "/tasks?tag=adhoc")
+            assert [item["name"] for item in body] == ["idle"]
+
+            status, body = self.request(server, "/tasks/report")
+            assert status == 200
+            assert body["schedule"] == "every"
+            assert body["stats"] == task.stats
+            assert body["last_result"]["succeeded"]
+            assert len(body["upcoming"]) == 5
+
+            status, body = self.request(server, "/tags")
+            assert body == {"daily": ["report"], "adhoc": ["idle"]}
+
+            status, body = self.request(server, "/metrics")
+            assert body["tasks"] == 2
+            assert body["running"] == 1
+            assert body["stats"]["failed"] == 0
+            assert body["shedding"] is None
+
+            status, body = self.request(server, "/tasks/missing")
+            assert status == 404
+            assert "missing" in body["error"]
+
+            status, _ = self.request(server, "/unknown")
+            assert status == 404
+        finally:
+            server.close()
+            task.stop()
+
+    def test_control(self):
+        calls = list()
+        manager = ScheduleManager()
+        task = manager.register_task(name="task", job=calls.append,
+                                     args=(1,)).period(60)
+        task.start()
+        time.sleep(0.3)
+
+        server = AdminServer(manager, port=0).start()
+        try:
+            status, body = self.request(server, "/tasks/task/run", "POST")
+            assert status == 200
+            time.sleep(1.2)
+            assert len(calls) == 2
+            assert task.next_run > datetime.now()
+
+            status, _ = self.request(server, "/tasks/task/resume", "POST")
+            assert status == 409
+
+            manager.register_task(name="pending", job=int).period(60)
+            status, _ = self.request(server, "/tasks/pending/resume",
+                                     "POST")
+            assert status == 409
+            assert not manager.task("pending").is_running
+
+            status, body = self.request(server, "/tasks/task/pause", "POST")
+            assert (status, body["action"]) == (200, "pause")
+            task.join()
+            assert not manager.task("task").is_running
+
+            status, _ = self.request(server, "/tasks/task/run", "POST")
+            assert status == 409
+
+            status, _ = self.request(server, "/tasks/task/resume", "POST")
+            assert status == 200
+            assert manager.task("task").is_running
+
+            status, _ = self.request(server, "/tasks/task/stop", "POST")
+            assert status == 200
+
+            status, _ = self.request(server, "/tasks/task/stop")
+            assert status == 404
+        finally:
+            server.close()
+
+    def test_token(self):
+        server = AdminServer(ScheduleManager(), port=0, token="secret")
+        server.start()
+        try:
+            assert self.request(server, "/tasks")[0] == 401
+            assert self.request(server, "/tasks", token="wrong")[0] == 401
+            assert self.request(server, "/tasks", token="secret") == (200,
+                                                                      [])
+        finally:
+            server.close()
+
+
+class TestFileStateStore:
+    """Test FileStateStore object."""
+
+    def test_restore_tasks(self, tmp_path):
+        path = str(tmp_path / "state.json")
+
+        store = FileStateStore(path)
+        manager = ScheduleManager(store=store)
+        task1 = manager.register_task(job=persisted_job, name="task1",
+                                      args=(1, "a"), kwargs={"key": 2},
+                                      misfire_policy="skip")
+        task1.period(3600).add_tag("tag").start()
+        task2 = manager.register_task(job=persisted_job, name="task2",
+                                      retry=RetryPolicy(retry_on=(KeyError,)))
+        task2.period_week_at("12:30:00", week_day="Friday").nonperiodic(2)
+        task3 = manager.register_task(job=persisted_job, name="task3")
+        manager.unregister(name="task3")
+        time.sleep(0.5)
+        next_run = task1.next_run
+
+        store.close()
+        task1.stop()
+
+        manager2 = ScheduleManager(store=FileStateStore(path))
+        try:
+            assert manager2.count == 2
+            assert "task3" not in manager2
+
+            task = manager2.task("task1")
+            assert task.is_running
+            assert task.next_run == next_run
+            assert task._args == (1, "a")
+            assert task._kwargs == {"key": 2}
+            assert task.tag == ["tag"]
+            assert task.misfire_policy == "skip"
+            assert task._periodic == timedelta(hours=1)
+
+            task = manager2.task("task2")
+            assert not task.is_running
+            assert task._periodic_unit == "week"
+            assert task._at_time == [12, 30, 0]
+            assert task._at_week_day == 4
+            assert task._nonperiod_count == 2
+            assert task._retry.retry_on == (KeyError,)
+        finally:
+            manager2.running_tasks.stop()
+
+    def test_restore_run_state(self, tmp_path):
+        path = str(tmp_path / "state.json")
+
+        store = FileStateStore(path, fsync_every=0, compact_every=0)
+        manager = ScheduleManager(store=store)
+        task = manager.register_task(job=persisted_job, name="task")
+        task.period(1).nonperiodic(5).start()
+        time.sleep(1.5)
+        task.pause()
+        time.sleep(1.5)
+        store.close()
+
+        with open(path + ".journal", encoding="utf-8") as file:
+            events = [json.loads(line)["event"] for line in file
+                      if json.loads(line)["event"] != "update"]
+        assert events == ["register", "start", "run", "run",
+                          "pause", "unregister", "register"]
+
+        manager2 = ScheduleManager(store=FileStateStore(path))
+        task = manager2.task("task")
+        assert not task.is_running
+        assert task._nonperiod_count == 3
+
+    def test_restore_ignore_incomplete_record(self, tmp_path):
+        path = str(tmp_path / "state.json")
+
+        store = FileStateStore(path)
+        manager = ScheduleManager(store=store)
+        manager.register_task(job=persisted_job, name="task1").period(60)
+        store.compact()
+        manager.register_task(job=persisted_job, name="task2").period(60)
+        store.close()
+
+        with open(path + ".journal", "a", encoding="utf-8") as file:
+            file.write('{"event":"unregister","na')
+
+        manager2 = ScheduleManager(store=FileStateStore(path))
+        assert sorted(manager2) == ["task1", "task2"]
+
+    def test_restore_task_registered_by_compaction(self, tmp_path):
+        path = str(tmp_path / "state.json")
+
+        store = FileStateStore(path, compact_every=1)
+        manager = ScheduleManager(store=store)
+        manager.register_task(job=persisted_job, name="task1")
+        manager.register(Task(job=persisted_job, name="task2"))
+        store.close()
+
+        manager2 = ScheduleManager(store=FileStateStore(path))
+        assert sorted(manager2) == ["task1", "task2"]
+
+    def test_register_while_compacting(self, tmp_path):
+        path = str(tmp_path / "state.json")
+
+        store = FileStateStore(path, fsync_every=0, compact_every=1)
+        manager = ScheduleManager(store=store)
+        for index in range(4):
+            manager.register_task(job=persisted_job,
+                                  name="running{}".format(index))
+        manager.all_tasks.period(0.01).start()
+
+        def register():
+            """Register tasks while running tasks record runs."""
+            for index in range(50):
+                manager.register_task(job=persisted_job,
+                                      name="task{}".format(index))
+
+        thread = threading.Thread(target=register, daemon=True)
+        thread.start()
+        thread.join(10)
+        manager.running_tasks.stop()
+
+        assert not thread.is_alive()
+        assert all("task{}".format(index) in manager for index in range(50))
+        store.close()
+
+    def test_register_not_importable_job(self, tmp_path):
+        store = FileStateStore(str(tmp_path / "state.json"))
+        manager = ScheduleManager(store=store)
+
+        with pytest.raises(OperationFailError):
+            manager.register_task(job=lambda: None, name="task")
+        assert "task" not in manager
+
+        with pytest.raises(OperationFailError):
+            manager.register_task(job=persisted_job, args=(object(),))
+        assert manager.count == 0
+
+        manager.register(Task(job=print, name="task"))
+        assert "task" in manager
+
+    def test_restore_dependency(self, tmp_path):
+        path = str(tmp_path / "state.json")
+
+        store = FileStateStore(path)
+        manager = ScheduleManager(store=store)
+        manager.register_task(job=persisted_job, name="upstream").period(60)
+        manager.register_task(job=persisted_job,
+                              name="downstream").after("upstream")
+        store.close()
+
+        manager2 = ScheduleManager(store=FileStateStore(path))
+        assert manager2.task("downstream").upstream == ("upstream",)
+        assert manager2._view().downstream("upstream") == (
+            manager2.task("downstream"),)
+
+    def test_restore_timezone(self, tmp_path):
+        path = str(tmp_path / "state.json")
+
+        store = FileStateStore(path)
+        manager = ScheduleManager(store=store)
+        manager.register_task(job=persisted_job, name="task").period_day_at(
+            "08:00:00", tz="Asia/Tokyo")
+        store.close()
+
+        manager2 = ScheduleManager(store=FileStateStore(path))
+        assert manager2.task("task").tz.key == "Asia/Tokyo"
+
+
+class TestSQLiteJobStore:
+    """Test SQLiteJobStore object."""
+
+    def test_add_and_load_due_tasks(self, tmp_path):
+        store = SQLiteJobStore(str(tmp_path / "tasks.db"), window=30,
+                               interval=0.1)
+        store.add(Task(job=persisted_job, name="every").period(3600))
+        store.add(Task(job=persisted_job, name="soon")
+                  .period(3600).delay(10))
+        store.add(Task(job=persisted_job, name="later")
+                  .period(3600).delay(600))
+        store.add(Task(job=persisted_job, name="tagged")
+                  .period_day_at((datetime.now() + timedelta(hours=2))
+                                 .strftime("%H:%M:%S"))
+                  .add_tag("tag"))
+
+        with pytest.raises(OperationFailError):
+            store.add(Task(job=persisted_job))
+        with pytest.raises(OperationFailError):
+            store.add(Task(job=lambda: None).period(60))
+
+        assert store.count == 4
+
+        manager = ScheduleManager(store=store)
+        try:
+            time.sleep(1.5)
+
+            assert "soon" in manager
+            assert manager.task("soon").is_running
+            assert "later" not in manager
+            assert "tagged" not in manager
+
+            # Next run of the task is beyond the window after the first run.
+            assert "every" not in manager
+            assert store.count == 4
+        finally:
+            store.close()
+            manager.running_tasks.stop()
+
+    def test_unload_and_reload(self, tmp_path):
+        path = str(tmp_path / "tasks.db")
+        store = SQLiteJobStore(path, window=1, interval=0.1)
+        store.add(Task(job=persisted_job, name="task").period(3))
+
+        manager = ScheduleManager(store=store)
+        try:
+            time.sleep(1.6)
+            assert "task" not in manager
+
+            time.sleep(1.2)
+            assert "task" in manager
+        finally:
+            store.close()
+            manager.running_tasks.stop()
+
+        with sqlite3.connect(path) as db:
+            next_run = db.execute("SELECT next_run FROM tasks").fetchone()[0]
+        assert next_run > datetime.now().strftime("%Y-%m-%dT%H:%M:%S.%f")
+
+    def test_remove_finished_and_stopped_tasks(self, tmp_path):
+        store = SQLiteJobStore(str(tmp_path / "tasks.db"), interval=0.1)
+        store.add(Task(job=persisted_job, name="once")
+                  .period(60).nonperiodic(1))
+        store.add(Task(job=persisted_job, name="task").period(10))
+
+        manager = ScheduleManager(store=store)
+        try:
+            time.sleep(1.5)
+            assert "once" not in manager
+            assert store.count == 1
+
+            store.remove("task")
+            time.sleep(1.5)
+            assert "task" not in manager
+            assert store.count == 0
+
+            manager.register_task(job=persisted_job, name="direct")
+            assert store.count == 1
+            manager.unregister(name="direct")
+            assert store.count == 0
+        finally:
+            store.close()
+            manager.running_tasks.stop()
+
+
+@pytest.fixture
+def sharded_manager():
+    manager = ShardedScheduleManager(shards=2)
+    yield manager
+    manager.close()
+
+
+class TestShardedScheduleManager:
+    """Test ShardedScheduleManager object."""
+
+    def test_hash_ring(self):
+        ring = _HashRing(4)
+        shards = [ring.shard("Task-{}".format(i)) for i in range(1000)]
+
+        assert shards == [_HashRing(4).shard("Task-{}".format(i))
+                          for i in range(1000)]
+        for shard in range(4):
+            assert 150 < shards.count(shard) < 350
+
+        # Adding a shard only moves tasks to the new shard.
+        ring5 = _HashRing(5)
+        for i, shard in enumerate(shards):
+            assert ring5.shard("Task-{}".format(i)) in (shard, 4)
+
+    def test_worker_token(self):
+        worker = _Worker()
+        token = worker.register_task({"job": persisted_job, "name": "task"})
+        assert worker.get_task("task") == token
+
+        worker.unregister("task", None)
+        gc.collect()
+        with pytest.raises(TaskNotFoundError):
+            worker.task(token)
+
+        # Tokens of released tasks are never reused.
+        token2 = worker.register_task({"job": persisted_job, "name": "task"})
+        assert token2 != token
+        with pytest.raises(TaskNotFoundError):
+            worker.task(token)
+
+    def test_register_task(self, sharded_manager):
+        for i in range(10):
+            task = sharded_manager.register_task(job=persisted_job,
+                                                 name="task{}".format(i))
+            task.period(60).add_tag(i % 2)
+
+        assert sharded_manager.count == 10
+        assert "task3" in sharded_manager
+        assert "task10" not in sharded_manager
+        assert sorted(sharded_manager) == ["task{}".format(i)
+                                           for i in range(10)]
+        assert {sharded_manager.shard_of(name)
+                for name in sharded_manager} == {0, 1}
+
+        with pytest.raises(TaskNameDuplicateError):
+            sharded_manager.register_task(job=persisted_job, name="task0")
+
+        with pytest.raises(TaskNotFoundError):
+            sharded_manager.task("task10")
+
+        task = sharded_manager.task("task1")
+        assert task == sharded_manager.task("task1")
+        assert task.tag == [1]
+        assert task.manager is sharded_manager
+        assert not task.is_running
+
+    def test_task_group(self, sharded_manager):
+        for i in range(6):
+            sharded_manager.register_task(job=persisted_job,
+                                          name="task{}".format(i),
+                                          misfire_policy="skip")
+
+        group = sharded_manager.tasks("task")
+        assert group.count == 0
+
+        sharded_manager.all_tasks.period(60).add_tag("all")
+        group = sharded_manager.tasks("all")
+        assert group.count == 6
+
+        group.start()
+        assert sharded_manager.running_tasks.count == 6
+        assert sharded_manager.task("task2").next_run is not None
+        assert sharded_manager.task("task2").misfire_policy == "skip"
+
+        group = sharded_manager.running_tasks
+        group.pause()
+        assert group.count == 6
+        assert sharded_manager.pending_tasks.count == 6
+        assert sharded_manager.task("task2").tag == ["all"]
+
+        sharded_manager.unregister(tag="all")
+        assert sharded_manager.count == 0
+
+    def test_remote_task_interface(self, sharded_manager):
+        tasks = dict()
+        for i in range(10):
+            name = "task{}".format(i)
+            tasks.setdefault(sharded_manager.shard_of(name), list()).append(
+                sharded_manager.register_task(job=persisted_job, name=name))
+        upstream, downstream = tasks[0][:2]
+        other = tasks[1][0]
+
+        assert downstream.after(upstream) is downstream
+        assert downstream.upstream == (upstream.name,)
+        with pytest.raises(OperationFailError):
+            downstream.after(other)
+        with pytest.raises(OperationFailError):
+            downstream.run_now()
+
+        upstream.period(60).nonperiodic(150).delay(60).start()
+        try:
+            run_times = list(upstream.upcoming())
+            assert len(run_times) == 150
+            assert run_times[0] == upstream.next_run
+            assert all(later - earlier == timedelta(seconds=60)
+                       for earlier, later in zip(run_times, run_times[1:]))
+            assert list(upstream.upcoming(3)) == run_times[:3]
+            assert upstream.tz is None
+
+            assert upstream.run_now() <= datetime.now()
+        finally:
+            upstream.stop()
+
+
+class TestFileLease:
+    """Test FileLease object."""
+
+    def test_acquire_and_release(self, tmp_path):
+        path = str(tmp_path / "lease")
+        lease1 = FileLease(path)
+        lease2 = FileLease(path)
+
+        try:
+            assert lease1.acquire()
+            assert lease1.acquire()
+            assert lease1.is_leader
+            assert not lease2.acquire()
+            assert not lease2.is_leader
+
+            lease1.release()
+            assert not lease1.is_leader
+            assert lease2.acquire()
+            assert not lease1.acquire()
+        finally:
+            lease1.close()
+            lease2.close()
+
+    def test_failover(self, tmp_path):
+        path = str(tmp_path / "lease")
+        lease1 = FileLease(path, heartbeat=0.1)
+        lease2 = FileLease(path, heartbeat=0.1)
+
+        try:
+            lease1.start()
+            lease2.start()
+            assert lease1.is_leader
+            assert not lease2.is_leader
+
+            lease1.close()
+            time.sleep(0.3)
+            assert lease2.is_leader
+            assert not lease1.acquire()
+        finally:
+            lease1.close()
+            lease2.close()
+
+    def test_standby_manager(self, tmp_path):
+        path = str(tmp_path / "lease")
+        counter = {"leader": 0, "standby": 0}
+
+        def test_func(key):
+            """Job used for testing."""
+            counter[key] += 1
+
+        lease1 = FileLease(path, heartbeat=0.1)
+        lease2 = FileLease(path, heartbeat=0.1)
+        manager1 = ScheduleManager(lease=lease1)
+        manager2 = ScheduleManager(lease=lease2)
+        assert manager1.is_leader
+        assert not manager2.is_leader
+        assert ScheduleManager().is_leader
+
+        task1 = manager1.register_task(job=test_func, args=("leader",))
+        task2 = manager2.register_task(job=test_func, args=("standby",))
+        task1.period(1).start()
+        task2.period(1).start()
+
+        try:
+            time.sleep(1.5)
+            assert counter == {"leader": 2, "standby": 0}
+            assert task2.stats["standby"] == 2
+            assert task2.next_run > datetime.now()
+
+            lease1.close()
+            time.sleep(1)
+            assert manager2.is_leader
+            assert counter["standby"] >= 1
+        finally:
+            task1.stop()
+            task2.stop()
+            lease2.close()
+
+
+class TestClaimStore:
+    """Test claim stores."""
+
+    def test_run_key(self):
+        task = Task(name="task", job=lambda *args, **kwargs: None)
+        scheduled = datetime(this_year, 1, 2, 3, 4, 5, 678)
+
+        assert task.run_key(scheduled) == (
+            "task@{}-01-02T03:04:05.000678".format(this_year))
+        assert task.run_key(scheduled.replace(microsecond=0)) == (
+            "task@{}-01-02T03:04:05".format(this_year))
+
+    def test_memory_claim_store(self):
+        store = MemoryClaimStore()
+
+        assert store.claim("task@1")
+        assert not store.claim("task@1")
+        assert store.claim("task@2")
+
+        store.purge(time.time() + 1)
+        assert store.claim("task@1")
+
+    def test_sqlite_claim_store(self, tmp_path):
+        path = str(tmp_path / "claims.db")
+        store1 = SQLiteClaimStore(path)
+        store2 = SQLiteClaimStore(path)
+
+        assert store1.claim("task@1")
+        assert not store2.claim("task@1")
+        assert store2.claim("task@2")
+
+        results = list()
+        threads = [threading.Thread(
+            target=lambda: results.append(store1.claim("task@3")))
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert results.count(True) == 1
+
+        store1.purge(time.time() + 1)
+        assert store2.claim("task@1")
+
+    def test_file_claim_store(self, tmp_path):
+        directory = str(tmp_path / "claims")
+        store1 = FileClaimStore(directory)
+        store2 = FileClaimStore(directory)
+
+        assert store1.claim("task@1")
+        assert not store2.claim("task@1")
+        assert store2.claim("task/2")
+
+        store2.purge(time.time() + 1)
+        assert store1.claim("task@1")
+
+    def test_expired_claims_are_purged(self, mocker):
+        store = MemoryClaimStore(ttl=10)
+        assert store.claim("task@1")
+
+        mocker.patch('time.time', return_value=time.time() + 20)
+        assert store.claim("task@2")
+        assert list(store._claims) == ["task@2"]
+
+    def test_dedup_runs(self, monitor_handler):
+
+        def test_func():
+            """Job used for testing."""
+            Monitor.monitor += 1
+
+        claims = MemoryClaimStore()
+        at_time = (datetime.now() + timedelta(seconds=2)).strftime(
+            "%H:%M:%S")
+
+        # Managers start independently, so their start times differ.
+        tasks = list()
+        for _ in range(2):
+            manager = ScheduleManager(claims=claims)
+            task = manager.register_task(name="task", job=test_func)
+            task.period_day_at(at_time).start()
+            tasks.append(task)
+            time.sleep(0.05)
+
+        try:
+            time.sleep(3)
+            assert tasks[0].next_run == tasks[1].next_run
+            assert Monitor.monitor == 1
+            assert sum(task.stats["deduplicated"] for task in tasks) == 1
+        finally:
+            for task in tasks:
+                task.stop()
+
+    def test_dedup_sub_second_runs(self, monitor_handler):
+
+        def test_func():
+            """Job used for testing."""
+            Monitor.monitor += 1
+
+        manager = ScheduleManager(claims=MemoryClaimStore())
+        task = manager.register_task(name="task", job=test_func)
+        task.period(0.1).start()
+
+        try:
+            time.sleep(1.05)
+            assert Monitor.monitor >= 5
+            assert task.stats["deduplicated"] == 0
+        finally:
+            task.stop()
+
+
 class TestOther:
     """Test something else."""
 